@@ -7,6 +7,7 @@ import time
 import tensorflow as tf
 
 import rlcard
+from rlcard.agents.dqn_actor_learner import ActorAgent, ActorLearner
 from rlcard.agents.dqn_agent import DQNAgent
 from rlcard.agents.random_agent import RandomAgent
 from rlcard.utils.logger import Logger
@@ -24,6 +25,8 @@ evaluate_num = 1000
 episode_num = 100000
 # Train against
 train_against = 'random'  # or 'same'
+# Number of processes playing the training games, the learner training the agent at the same time
+num_actors = max(1, os.cpu_count() - 1)
 
 # Set the the number of steps for collecting normalization statistics
 # and intial memory size
@@ -68,6 +71,7 @@ param_file.write('episode_num: {}'.format(episode_num) + '\n')
 param_file.write('train_against: {}'.format(train_against) + '\n')
 param_file.write('memory_init_size: {}'.format(memory_init_size) + '\n')
 param_file.write('norm_step: {}'.format(norm_step) + '\n')
+param_file.write('num_actors: {}'.format(num_actors) + '\n')
 param_file.flush()
 param_file.close()
 
@@ -88,17 +92,14 @@ with tf.compat.v1.Session() as sess:
     sess.run(tf.compat.v1.global_variables_initializer())
 
     saver = tf.compat.v1.train.Saver(max_to_keep=None)
-    if train_against == 'random':
-        env.set_agents([agent] + [random_agent] * (env.player_num - 1))
-    else:
-        env.set_agents([agent] + [agent] * (env.player_num - 1))
-
-    eval_env.set_agents([agent] + [random_agent] * (env.player_num - 1))
-
-    # Count the number of steps
-    step_counter = 0
-
+    # The training games are played by the actors, with the last weights published by the agent
+    actor_learner = ActorLearner(agent, num_actors=num_actors, train_against=train_against)
+    actor_learner.start()
 
+    # The evaluation games are played in worker processes, which must not use the TensorFlow session: the agent
+    # evaluated there runs the network with NumPy, with the weights published by the learner
+    eval_agent = ActorAgent(agent.action_num, agent.epsilons)
+    eval_env.set_agents([eval_agent] + [random_agent] * (env.player_num - 1))
 
     total_game_played = 0
     seconds = time.time()
@@ -115,11 +116,14 @@ with tf.compat.v1.Session() as sess:
 
             saver.save(sess, model_path)
 
-            # Eval against random
+            # Eval against random, with the current weights of the agent
+            actor_learner.publish()
+            eval_agent.sync(actor_learner.shared_weights)
             reward_random = 0
             reward_random_list = []
             taking_list = []
-            for eval_episode in range(evaluate_num):
+            # Evaluation games are played in parallel, on all the CPUs
+            for eval_episode, (_, payoffs) in enumerate(eval_env.run_multi(evaluate_num, is_training=False)):
                 print('\rEPISODE {} - Eval Random {} over {} - Number of game played {} - {}'.format(episode,
                                                                                                      eval_episode,
                                                                                                      evaluate_num,
@@ -128,15 +132,15 @@ with tf.compat.v1.Session() as sess:
                                                                                                          seconds,
                                                                                                          time.time())),
                       end='')
-                _, payoffs = eval_env.run(is_training=False)
                 total_game_played += 1
                 reward_random_list.append(payoffs[0])
                 reward_random += payoffs[0]
-                taking_list.append(eval_env.game.players[0].taking)
+                # The taking player wins or loses three times more than each of the other players
+                taking_list.append(abs(payoffs[0]) > abs(payoffs[1]))
 
             logger_random.log('\n########## Evaluation Against Random - Episode {} ##########'.format(episode))
             logger_random.log(
-                'Timestep: {} Average reward against random is {}'.format(env.timestep,
+                'Timestep: {} Average reward against random is {}'.format(actor_learner.timestep,
                                                                           float(reward_random) / evaluate_num))
 
             # Add point to logger
@@ -153,20 +157,11 @@ with tf.compat.v1.Session() as sess:
                                                                                                 time.time())),
               end='')
 
-        # Generate data from the environment
-        trajectories, _ = env.run(is_training=True)
-        total_game_played += 1
-
-        # Feed transitions into agent memory, and train the agent
-        for ts in trajectories[0]:
-            agent.feed(ts)
-            step_counter += 1
+        # Feed the transitions of the next game played by the actors into agent memory, and train the agent
+        for _ in actor_learner.run(1):
+            total_game_played += 1
 
-            # Train the agent
-            train_count = step_counter - (memory_init_size + norm_step)
-            if train_count > 0:
-                loss = agent.train()
-                # print('\rINFO - Step {}, loss: {}'.format(step_counter, loss), end='')
+    actor_learner.stop()
 
     # Make the final plot
     logger_random.make_plot(save_path=figure_path_random + 'final_' + str(episode) + '.png')
@@ -0,0 +1,445 @@
+""" Actor-learner training of a DQN agent
+
+Actor processes play games with a NumPy copy of the Q network of the agent and send their transitions to the
+learner, the process owning the agent. The learner feeds and trains the agent, and publishes its weights in shared
+memory at a fixed cadence, so that the generation of the games and the training run at the same time.
+"""
+
+import multiprocessing
+from queue import Empty, Full
+
+import numpy as np
+
+import rlcard
+from rlcard.agents.numpy_estimator import NumpyEstimator
+from rlcard.agents.random_agent import RandomAgent
+from rlcard.agents.shared_replay_memory import SharedReplayMemory
+from rlcard.utils.utils import remove_illegal, remove_illegal_batch, sample_actions
+
+
+class SharedWeights(object):
+    """ Parameters of a Q network and of its state normalizer in shared memory, written by the learner and read by
+        the actors
+    """
+
+    def __init__(self, weight_shapes, state_shape):
+        """ Allocate the shared memory
+
+        Args:
+            weight_shapes (list): shapes of the kernels and biases of the network, see DQNAgent.get_weights
+            state_shape (list): shape of the observations, for the mean and std of the normalizer
+        """
+        self.weight_shapes = [tuple(shape) for shape in weight_shapes]
+        self.state_shape = tuple(state_shape)
+        self.lock = multiprocessing.Lock()
+        self._weights = multiprocessing.RawArray('f', sum(int(np.prod(shape)) for shape in self.weight_shapes))
+        self._normalizer = multiprocessing.RawArray('d', 2 * int(np.prod(self.state_shape)))
+        # Version of the parameters, number of transitions fed to the learner and length of the normalizer
+        self._header = multiprocessing.RawArray('q', 3)
+
+    @property
+    def version(self):
+        """ Number of publications so far, 0 before the first one
+        """
+        return self._header[0]
+
+    def _views(self):
+        """ NumPy views over the shared memory (built on demand, since they cannot be sent to another process)
+
+        Returns:
+            weights (list): views of the kernels and biases
+            mean (numpy.array): view of the mean of the normalizer
+            std (numpy.array): view of the std of the normalizer
+        """
+        flat_weights = np.frombuffer(self._weights, dtype=np.float32)
+        weights = []
+        offset = 0
+        for shape in self.weight_shapes:
+            size = int(np.prod(shape))
+            weights.append(flat_weights[offset:offset + size].reshape(shape))
+            offset += size
+        mean, std = np.frombuffer(self._normalizer, dtype=np.float64).reshape((2,) + self.state_shape)
+        return weights, mean, std
+
+    def publish(self, weights, mean, std, normalizer_length, total_t):
+        """ Write new parameters
+
+        Args:
+            weights (list): kernels and biases of the network
+            mean (numpy.array): mean of the normalizer, ignored if normalizer_length is 0
+            std (numpy.array): std of the normalizer, ignored if normalizer_length is 0
+            normalizer_length (int): number of states seen by the normalizer
+            total_t (int): number of transitions fed to the agent, which drives the epsilon decay
+        """
+        shared_weights, shared_mean, shared_std = self._views()
+        with self.lock:
+            for shared_weight, weight in zip(shared_weights, weights):
+                shared_weight[...] = weight
+            if normalizer_length > 0:
+                shared_mean[...] = mean
+                shared_std[...] = std
+            self._header[1] = total_t
+            self._header[2] = normalizer_length
+            self._header[0] += 1
+
+    def read(self, version=0):
+        """ Copy the parameters if they changed
+
+        Args:
+            version (int): version of the parameters already known by the reader
+
+        Returns:
+            None if no newer version was published, else a tuple with the version, the weights, the mean and the std
+            of the normalizer (None if it has not seen any state yet), and the number of transitions fed to the agent
+        """
+        if self.version == version:
+            return None
+        shared_weights, shared_mean, shared_std = self._views()
+        with self.lock:
+            version, total_t, normalizer_length = self._header
+            weights = [shared_weight.copy() for shared_weight in shared_weights]
+            if normalizer_length > 0:
+                mean, std = shared_mean.copy(), shared_std.copy()
+            else:
+                mean, std = None, None
+        return version, weights, mean, std, total_t
+
+
+class ActorAgent(object):
+    """ Agent of the actor processes, following the policy of DQNAgent with the last published parameters
+    """
+
+    def __init__(self, action_num, epsilons, seed=None):
+        """ Initialize an ActorAgent object
+
+        Args:
+            action_num (int): the number of the actions
+            epsilons (numpy.array): the epsilon decay schedule of the learning agent
+            seed (int or numpy.random.SeedSequence): seed of the random generator of the agent
+        """
+        self.action_num = action_num
+        self.epsilons = epsilons
+        self.q_estimator = NumpyEstimator()
+        self.mean = None
+        self.std = None
+        self.total_t = 0
+        self.version = 0
+        self.np_random = np.random.default_rng(seed)
+
+    def sync(self, shared_weights):
+        """ Load the last published parameters
+
+        Args:
+            shared_weights (SharedWeights): the parameters published by the learner
+
+        Returns:
+            (boolean): True if new parameters were loaded
+        """
+        parameters = shared_weights.read(self.version)
+        if parameters is None:
+            return False
+        self.version, weights, self.mean, self.std, self.total_t = parameters
+        self.q_estimator.set_weights(weights)
+        return True
+
+    def normalize(self, s):
+        """ Normalize the state like the Normalizer of the learning agent
+
+        Args:
+            s (numpy.array): the input state
+
+        Returns:
+            (numpy.array): normalized state
+        """
+        if self.mean is None:
+            return s
+        return (s - self.mean) / (self.std + 1e-8)
+
+    def step(self, state):
+        """ Predict the action for genrating training data
+
+        Args:
+            state (dict): current state, with the observation and the legal actions
+
+        Returns:
+            action (int): an action id
+        """
+        A = self.predict(state['obs'])
+        A = remove_illegal(A, state['legal_actions'])
+        return self.np_random.choice(len(A), p=A)
+
+    def eval_step(self, state):
+        """ Predict the action for evaluation purpose.
+
+        Args:
+            state (dict): current state, with the observation and the legal actions
+
+        Returns:
+            action (int): an action id
+        """
+        q_values = self.q_estimator.predict(np.expand_dims(self.normalize(state['obs']), 0))[0]
+        probs = remove_illegal(np.exp(q_values), state['legal_actions'])
+        return np.argmax(probs)
+
+    def step_batch(self, obs, legal_masks):
+        """ Predict the actions of several states for generating training data, with one forward pass
+
+        Args:
+            obs (numpy.array): the stacked observations of the states
+            legal_masks (numpy.array): the boolean masks of their legal actions
+
+        Returns:
+            actions (numpy.array): the action ids
+        """
+        epsilon = self.epsilons[min(self.total_t, len(self.epsilons) - 1)]
+        q_values = self.q_estimator.predict(self.normalize(obs))
+        A = np.full(q_values.shape, epsilon / self.action_num)
+        A[np.arange(len(A)), np.argmax(q_values, axis=1)] += (1.0 - epsilon)
+        return sample_actions(remove_illegal_batch(A, legal_masks), self.np_random)
+
+    def eval_step_batch(self, obs, legal_masks):
+        """ Predict the actions of several states for evaluation purpose, with one forward pass
+
+        Args:
+            obs (numpy.array): the stacked observations of the states
+            legal_masks (numpy.array): the boolean masks of their legal actions
+
+        Returns:
+            actions (numpy.array): the best legal action ids
+        """
+        q_values = self.q_estimator.predict(self.normalize(obs))
+        return np.argmax(np.where(legal_masks, q_values, -np.inf), axis=1)
+
+    def predict(self, state):
+        """ Predict the epsilon-greedy action probabilities
+
+        Args:
+            state (numpy.array): current state
+
+        Returns:
+            (numpy.array): a 1-d array with the probability of each action
+        """
+        epsilon = self.epsilons[min(self.total_t, len(self.epsilons) - 1)]
+        A = np.ones(self.action_num, dtype=float) * epsilon / self.action_num
+        q_values = self.q_estimator.predict(np.expand_dims(self.normalize(state), 0))[0]
+        A[np.argmax(q_values)] += (1.0 - epsilon)
+        return A
+
+
+class ActorLearner(object):
+    """ Train a DQNAgent (TensorFlow or PyTorch) on games played by actor processes. The calling process is the
+        learner: it owns the agent, and trains it on the transitions received from the actors while they keep playing.
+
+        The actors never import the parameters of the agent through its framework: they read them from shared memory
+        and run the network with NumPy.
+    """
+
+    def __init__(self, agent, env_id='tarot', num_actors=None, train_against='same', publish_every=100,
+                 queue_size=64, shared_memory=False, seed=None):
+        """ Initialize an ActorLearner object
+
+        Args:
+            agent (DQNAgent): the agent to be trained, with its variables initialized
+            env_id (str): the environment played by the actors
+            num_actors (int): number of actor processes, the number of CPUs minus one (for the learner) if None
+            train_against (str): 'same' for self-play, all the transitions being used for training, or 'random' to
+              play against random agents, only the transitions of player 0 being used
+            publish_every (int): number of training steps between two publications of the weights
+            queue_size (int): maximum number of finished games waiting for the learner, the actors waiting when it
+              is reached
+            shared_memory (boolean): True to replace the replay memory of the agent with a SharedReplayMemory of the
+              same size, in which the actors save their transitions themselves once the normalizer is set, instead of
+              sending them to the learner. The memory is freed by agent.memory.unlink() once the training is over
+            seed (int or numpy.random.SeedSequence): seed of the actors, fresh entropy if None
+        """
+        if train_against not in ('same', 'random'):
+            raise ValueError("train_against should be 'same' or 'random', not {}".format(train_against))
+        if shared_memory and getattr(agent, 'prioritized_replay', False):
+            raise ValueError('The replay memory of an agent with prioritized replay cannot be shared')
+        if num_actors is None:
+            num_actors = max(1, multiprocessing.cpu_count() - 1)
+        self.agent = agent
+        self.env_id = env_id
+        self.num_actors = num_actors
+        self.train_against = train_against
+        self.publish_every = publish_every
+        self.queue_size = queue_size
+        self.shared_memory = shared_memory
+        self.seed = seed
+        env = rlcard.make(env_id)
+        self.state_shape = env.state_shape
+        self.state_dtype = env.init_game()[0]['obs'].dtype
+
+        # Number of transitions and of games received from the actors
+        self.timestep = 0
+        self.episode = 0
+
+        self.shared_weights = None
+        self.transition_queue = None
+        self.stop_event = None
+        self.actors = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """ Publish the current weights of the agent and start the actor processes
+        """
+        if self.actors:
+            return
+        weights = self.agent.get_weights()
+        self.shared_weights = SharedWeights([weight.shape for weight in weights], self.state_shape)
+        self.publish()
+        if self.shared_memory and not isinstance(self.agent.memory, SharedReplayMemory):
+            self.agent.memory = SharedReplayMemory(self.agent.memory.memory_size, self.agent.memory.batch_size,
+                                                   self.state_shape, self.state_dtype)
+        memory = self.agent.memory if self.shared_memory else None
+        self.transition_queue = multiprocessing.Queue(self.queue_size)
+        self.stop_event = multiprocessing.Event()
+        seed = self.seed if isinstance(self.seed, np.random.SeedSequence) else np.random.SeedSequence(self.seed)
+        for actor_seed in seed.spawn(self.num_actors):
+            actor = multiprocessing.Process(target=_run_actor,
+                                            args=(self.env_id, self.train_against, self.agent.action_num,
+                                                  self.agent.epsilons, self.agent.norm_step, self.shared_weights,
+                                                  memory, self.transition_queue, self.stop_event, actor_seed),
+                                            daemon=True)
+            actor.start()
+            self.actors.append(actor)
+
+    def stop(self):
+        """ Stop the actor processes, the games they are playing being lost
+        """
+        if not self.actors:
+            return
+        self.stop_event.set()
+        # An actor only exits once the games it queued are read, so the queue is drained while waiting for them
+        while any(actor.is_alive() for actor in self.actors):
+            try:
+                self.transition_queue.get(timeout=0.1)
+            except Empty:
+                pass
+        for actor in self.actors:
+            actor.join()
+        self.actors = []
+
+    def publish(self):
+        """ Publish the weights of the Q network and the statistics of the normalizer of the agent to the actors
+        """
+        normalizer = self.agent.normalizer
+        self.shared_weights.publish(self.agent.get_weights(), normalizer.mean, normalizer.std, normalizer.length,
+                                    self.agent.total_t)
+
+    def run(self, episode_num):
+        """ Train the agent on games played by the actors, starting them if needed
+
+        Args:
+            episode_num (int): number of games to train on
+
+        Returns:
+            iterator over the payoffs of the games, once the agent is trained on their transitions
+        """
+        self.start()
+        for _ in range(episode_num):
+            transitions, payoffs = self._get_game()
+            if isinstance(transitions, int):
+                # The actor saved the transitions in the shared replay memory
+                for _ in range(transitions):
+                    self.agent.total_t += 1
+                    self._train()
+            else:
+                for ts in transitions:
+                    self.feed(ts)
+            self.episode += 1
+            yield payoffs
+
+    def feed(self, ts):
+        """ Feed one transition to the agent, training it once its memory is initialized, like the single process
+            training loop: one training step for each transition
+
+        Args:
+            ts (list): a list of 5 elements that represent the transition
+        """
+        self.agent.feed(ts)
+        self._train()
+
+    def _train(self):
+        """ Train the agent after a new transition, and publish its parameters when needed
+        """
+        self.timestep += 1
+        if self.agent.total_t == self.agent.norm_step:
+            # The normalizer will not change any more
+            self.publish()
+        if self.agent.total_t > self.agent.norm_step + self.agent.replay_memory_init_size:
+            self.agent.train()
+            if self.agent.train_t % self.publish_every == 0:
+                self.publish()
+
+    def _get_game(self):
+        """ Wait for a game played by an actor
+
+        Returns:
+            transitions (list or int): transitions of the game to be used for training, or their number if they were
+              saved in the shared replay memory
+            payoffs (dict): payoffs of the game
+        """
+        while True:
+            try:
+                return self.transition_queue.get(timeout=1)
+            except Empty:
+                if not any(actor.is_alive() for actor in self.actors):
+                    raise RuntimeError('All the actor processes stopped')
+
+
+def _run_actor(env_id, train_against, action_num, epsilons, norm_step, shared_weights, memory, transition_queue,
+               stop_event, seed):
+    """ Loop of an actor process: play games with the last published weights and queue their transitions, until the
+        stop event is set
+
+    Args:
+        env_id (str): the environment to be played
+        train_against (str): 'same' or 'random', see ActorLearner
+        action_num (int): the number of the actions
+        epsilons (numpy.array): the epsilon decay schedule of the learning agent
+        norm_step (int): number of transitions used by the learner to set its normalizer
+        shared_weights (SharedWeights): the parameters published by the learner
+        memory (SharedReplayMemory): the replay memory of the learner if it is shared, else None
+        transition_queue (multiprocessing.Queue): queue of the (transitions, payoffs) of the games, transitions
+          being replaced by their number when they are saved in the memory
+        stop_event (multiprocessing.Event): set by the learner to stop the actors
+        seed (numpy.random.SeedSequence): seed of the environment and of the agents
+    """
+    env_seed, agent_seed, opponents_seed = seed.spawn(3)
+    env = rlcard.make(env_id)
+    env.seed(env_seed)
+    agent = ActorAgent(action_num, epsilons, seed=agent_seed)
+    if train_against == 'same':
+        env.set_agents([agent] * env.player_num)
+        learning_player_ids = range(env.player_num)
+    else:
+        env.set_agents([agent] + [RandomAgent(action_num, seed=opponent_seed)
+                                  for opponent_seed in opponents_seed.spawn(env.player_num - 1)])
+        learning_player_ids = [0]
+
+    while not stop_event.is_set():
+        agent.sync(shared_weights)
+        trajectories, payoffs = env.run(is_training=True)
+        # Only the observations are sent, the legal actions are not used for training
+        transitions = [[{'obs': state['obs']}, action, reward, {'obs': next_state['obs']}, done]
+                       for player_id in learning_player_ids
+                       for state, action, reward, next_state, done in trajectories[player_id]]
+        if memory is not None and agent.total_t >= norm_step:
+            # The normalizer of the learner is set, the next transitions go to the memory (see DQNAgent.feed)
+            states, actions, rewards, next_states, dones = zip(*transitions)
+            memory.save_batch(np.array([state['obs'] for state in states]), actions, rewards,
+                              np.array([next_state['obs'] for next_state in next_states]), dones)
+            transitions = len(transitions)
+        while not stop_event.is_set():
+            try:
+                transition_queue.put((transitions, payoffs), timeout=0.1)
+                break
+            except Full:
+                pass
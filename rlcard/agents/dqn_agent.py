@@ -24,13 +24,14 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import random
 from collections import namedtuple
 
 import numpy as np
 import tensorflow as tf
 
-from rlcard.utils.utils import remove_illegal
+# Memory, Normalizer, PrioritizedMemory and SumTree used to be defined here, and are still importable from here
+from rlcard.agents.replay_memory import Memory, Normalizer, PrioritizedMemory, SumTree  # noqa: F401
+from rlcard.utils.utils import remove_illegal, remove_illegal_batch, sample_actions
 
 Transition = namedtuple('Transition', ['state', 'action', 'reward', 'next_state', 'done'])
 
@@ -52,7 +53,11 @@ class DQNAgent(object):
                  state_shape=None,
                  norm_step=100,
                  mlp_layers=None,
-                 learning_rate=0.00005):
+                 learning_rate=0.00005,
+                 prioritized_replay=False,
+                 priority_alpha=0.6,
+                 priority_beta_start=0.4,
+                 priority_beta_steps=100000):
 
         """
         Q-Learning algorithm for off-policy TD control using Function Approximation.
@@ -78,6 +83,11 @@ class DQNAgent(object):
             norm_step (int): The number of the step used form noramlize state
             mlp_layers (list): The layer number and the dimension of each layer in MLP
             learning_rate (float): The learning rate of the DQN agent.
+            prioritized_replay (boolean): True to sample the transitions with a probability depending on their last
+              TD error (see PrioritizedMemory), instead of uniformly
+            priority_alpha (float): How much the priorities are used, 0 being uniform sampling
+            priority_beta_start (float): Initial exponent of the importance sampling weights, increased to 1
+            priority_beta_steps (int): Number of training steps to increase the exponent to 1 over
         """
         self.sess = sess
         self.scope = scope
@@ -109,7 +119,12 @@ class DQNAgent(object):
         self.normalizer = Normalizer()
 
         # Create replay memory
-        self.memory = Memory(replay_memory_size, batch_size)
+        self.prioritized_replay = prioritized_replay
+        if prioritized_replay:
+            self.memory = PrioritizedMemory(replay_memory_size, batch_size, alpha=priority_alpha,
+                                            beta_start=priority_beta_start, beta_steps=priority_beta_steps)
+        else:
+            self.memory = Memory(replay_memory_size, batch_size)
 
     def feed(self, ts):
         """ Store data in to replay buffer and train the agent. There are two stages.
@@ -155,6 +170,35 @@ class DQNAgent(object):
         best_action = np.argmax(probs)
         return best_action
 
+    def step_batch(self, obs, legal_masks):
+        """ Predict the actions of several states for generating training data, with one forward pass
+
+        Args:
+            obs (numpy.array): the stacked observations of the states
+            legal_masks (numpy.array): the boolean masks of their legal actions
+
+        Returns:
+            actions (numpy.array): the action ids
+        """
+        epsilon = self.epsilons[min(self.total_t, self.epsilon_decay_steps - 1)]
+        q_values = self.q_estimator.predict(self.sess, self.normalizer.normalize(obs))
+        A = np.full(q_values.shape, epsilon / self.action_num)
+        A[np.arange(len(A)), np.argmax(q_values, axis=1)] += (1.0 - epsilon)
+        return sample_actions(remove_illegal_batch(A, legal_masks))
+
+    def eval_step_batch(self, obs, legal_masks):
+        """ Predict the actions of several states for evaluation purpose, with one forward pass
+
+        Args:
+            obs (numpy.array): the stacked observations of the states
+            legal_masks (numpy.array): the boolean masks of their legal actions
+
+        Returns:
+            actions (numpy.array): the best legal action ids
+        """
+        q_values = self.q_estimator.predict(self.sess, self.normalizer.normalize(obs))
+        return np.argmax(np.where(legal_masks, q_values, -np.inf), axis=1)
+
     def predict(self, state: np.ndarray) -> np.ndarray:
         """ Predict the action probabilities
 
@@ -177,7 +221,13 @@ class DQNAgent(object):
         Returns:
             loss (float): The loss of the current batch.
         """
-        state_batch, action_batch, reward_batch, next_state_batch, done_batch = self.memory.sample()
+        if self.prioritized_replay:
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch, weight_batch, index_batch = \
+                self.memory.sample()
+        else:
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch = self.memory.sample()
+        state_batch = self.normalizer.normalize(state_batch)
+        next_state_batch = self.normalizer.normalize(next_state_batch)
         # Calculate q values and targets (Double DQN)
         q_values_next = self.q_estimator.predict(self.sess, next_state_batch)
         best_actions = np.argmax(q_values_next, axis=1)
@@ -188,7 +238,12 @@ class DQNAgent(object):
         # Perform gradient descent update
         state_batch = np.array(state_batch)
 
-        loss = self.q_estimator.update(self.sess, state_batch, action_batch, target_batch)
+        if self.prioritized_replay:
+            loss, td_errors = self.q_estimator.update_prioritized(self.sess, state_batch, action_batch, target_batch,
+                                                                  weight_batch)
+            self.memory.update_priorities(index_batch, td_errors)
+        else:
+            loss = self.q_estimator.update(self.sess, state_batch, action_batch, target_batch)
 
         # Update the target estimator
         if self.train_t % self.update_target_estimator_every == 0:
@@ -207,7 +262,8 @@ class DQNAgent(object):
         self.normalizer.append(state)
 
     def feed_memory(self, state, action, reward, next_state, done):
-        """ Feed transition to memory
+        """ Feed transition to memory. The states are stored as they are, the normalizer being applied to the
+            sampled batches
 
         Args:
             state (numpy.array): the current state
@@ -216,7 +272,15 @@ class DQNAgent(object):
             next_state (numpy.array): the next state after performing the action
             done (boolean): whether the episode is finished
         """
-        self.memory.save(self.normalizer.normalize(state), action, reward, self.normalizer.normalize(next_state), done)
+        self.memory.save(state, action, reward, next_state, done)
+
+    def get_weights(self):
+        """ Get the parameters of the Q network, to run it outside of TensorFlow (see NumpyEstimator)
+
+        Returns:
+            weights (list): kernel and bias of each fully connected layer, from the input to the output layer
+        """
+        return self.q_estimator.get_weights(self.sess)
 
     def copy_params_op(self, global_vars):
         """ Copys the variables of two estimator to others.
@@ -232,46 +296,6 @@ class DQNAgent(object):
         self.sess.run(update_ops)
 
 
-class Normalizer(object):
-    """ Normalizer class that tracks the running statistics for normalization
-    """
-
-    def __init__(self):
-        """ Initialize a Normalizer instance.
-        """
-        self.mean = None
-        self.std = None
-        self.state_memory = []
-        self.max_size = 1000
-        self.length = 0
-
-    def normalize(self, s):
-        """ Normalize the state with the running mean and std.
-
-        Args:
-            s (numpy.array): the input state
-
-        Returns:
-            a (int):  normalized state
-        """
-        if self.length == 0:
-            return s
-        return (s - self.mean) / (self.std + 1e-8)
-
-    def append(self, s):
-        """ Append a new state and update the running statistics
-
-        Args:
-            s (numpy.array): the input state
-        """
-        if len(self.state_memory) > self.max_size:
-            self.state_memory.pop(0)
-        self.state_memory.append(s)
-        self.mean = np.mean(self.state_memory, axis=0)
-        self.std = np.mean(self.state_memory, axis=0)
-        self.length = len(self.state_memory)
-
-
 class Estimator():
     """ Q-Value Estimator neural network.
         This network is used for both the Q-Network and the Target Network.
@@ -311,6 +335,8 @@ class Estimator():
         self.y_pl = tf.compat.v1.placeholder(shape=[None], dtype=tf.float32, name="y")
         # Integer id of which action was selected
         self.actions_pl = tf.compat.v1.placeholder(shape=[None], dtype=tf.int32, name="actions")
+        # Importance sampling weights of the transitions, for prioritized replay
+        self.weights_pl = tf.compat.v1.placeholder_with_default(tf.ones_like(self.y_pl), shape=[None], name="weights")
 
         batch_size = tf.shape(self.X_pl)[0]
 
@@ -325,8 +351,9 @@ class Estimator():
         self.action_predictions = tf.gather(tf.reshape(self.predictions, [-1]), gather_indices)
 
         # Calculate the loss
+        self.td_errors = self.y_pl - self.action_predictions
         self.losses = tf.math.squared_difference(self.y_pl, self.action_predictions)
-        self.loss = tf.reduce_mean(self.losses)
+        self.loss = tf.reduce_mean(self.weights_pl * self.losses)
 
     def predict(self, sess, s):
         """ Predicts action values.
@@ -341,6 +368,19 @@ class Estimator():
         """
         return sess.run(self.predictions, {self.X_pl: s})
 
+    def get_weights(self, sess):
+        """ Get the parameters of the network.
+
+        Args:
+          sess (tf.Session): Tensorflow Session object
+
+        Returns:
+          A list with the kernel of shape [input_size, output_size] and the bias of each fully connected layer,
+          from the input to the output layer.
+        """
+        # Variables are listed in creation order: the weights then the biases of each layer
+        return sess.run(tf.compat.v1.trainable_variables(scope=self.scope + '/'))
+
     def update(self, sess, s, a, y):
         """ Updates the estimator towards the given targets.
 
@@ -359,47 +399,24 @@ class Estimator():
             feed_dict)
         return loss
 
-
-class Memory(object):
-    """ Memory for saving transitions
-    """
-
-    def __init__(self, memory_size, batch_size):
-        """ Initialize
-        Args:
-            memory_size (int): the size of the memroy buffer
-        """
-        self.memory_size = memory_size
-        self.batch_size = batch_size
-        self.memory = []
-
-    def save(self, state, action, reward, next_state, done):
-        """ Save transition into memory
+    def update_prioritized(self, sess, s, a, y, weights):
+        """ Updates the estimator towards the given targets, with a loss weighted by importance sampling.
 
         Args:
-            state (numpy.array): the current state
-            action (int): the performed action ID
-            reward (float): the reward received
-            next_state (numpy.array): the next state after performing the action
-            done (boolean): whether the episode is finished
-        """
-        if len(self.memory) == self.memory_size:
-            self.memory.pop(0)
-        transition = Transition(state, action, reward, next_state, done)
-        self.memory.append(transition)
-
-    def sample(self):
-        """ Sample a minibatch from the replay memory
+          sess (tf.Session): Tensorflow Session object
+          s (list): State input of shape [batch_size, 4, 160, 160, 3]
+          a (list): Chosen actions of shape [batch_size]
+          y (list): Targets of shape [batch_size]
+          weights (list): Importance sampling weights of shape [batch_size]
 
         Returns:
-            state_batch (list): a batch of states
-            action_batch (list): a batch of actions
-            reward_batch (list): a batch of rewards
-            next_state_batch (list): a batch of states
-            done_batch (list): a batch of dones
+          The calculated loss on the batch, and the TD errors before the update.
         """
-        samples = random.sample(self.memory, self.batch_size)
-        return map(np.array, zip(*samples))
+        feed_dict = {self.X_pl: s, self.y_pl: y, self.actions_pl: a, self.weights_pl: weights}
+        _, _, loss, td_errors = sess.run(
+            [tf.compat.v1.train.get_global_step(), self.train_op, self.loss, self.td_errors],
+            feed_dict)
+        return loss, td_errors
 
 
 def copy_model_parameters(sess, estimator1, estimator2):
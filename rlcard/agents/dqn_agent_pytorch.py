@@ -31,8 +31,8 @@ import torch.nn as nn
 from collections import namedtuple
 from copy import deepcopy
 
-from rlcard.agents.dqn_agent import Memory, Normalizer
-from rlcard.utils.utils import remove_illegal
+from rlcard.agents.replay_memory import Memory, Normalizer, PrioritizedMemory
+from rlcard.utils.utils import remove_illegal, remove_illegal_batch, sample_actions
 
 Transition = namedtuple('Transition', ['state', 'action', 'reward', 'next_state', 'done'])
 
@@ -58,7 +58,11 @@ class DQNAgent(object):
                  norm_step=100,
                  mlp_layers=None,
                  learning_rate=0.00005,
-                 device=None):
+                 device=None,
+                 prioritized_replay=False,
+                 priority_alpha=0.6,
+                 priority_beta_start=0.4,
+                 priority_beta_steps=100000):
 
         '''
         Q-Learning algorithm for off-policy TD control using Function Approximation.
@@ -84,6 +88,11 @@ class DQNAgent(object):
             mlp_layers (list): The layer number and the dimension of each layer in MLP
             learning_rate (float): The learning rate of the DQN agent.
             device (torch.device): whether to use the cpu or gpu
+            prioritized_replay (boolean): True to sample the transitions with a probability depending on their last
+              TD error (see PrioritizedMemory), instead of uniformly
+            priority_alpha (float): How much the priorities are used, 0 being uniform sampling
+            priority_beta_start (float): Initial exponent of the importance sampling weights, increased to 1
+            priority_beta_steps (int): Number of training steps to increase the exponent to 1 over
         '''
         self.scope = scope
         self.replay_memory_init_size = replay_memory_init_size
@@ -120,7 +129,12 @@ class DQNAgent(object):
         self.normalizer = Normalizer()
 
         # Create replay memory
-        self.memory = Memory(replay_memory_size, batch_size)
+        self.prioritized_replay = prioritized_replay
+        if prioritized_replay:
+            self.memory = PrioritizedMemory(replay_memory_size, batch_size, alpha=priority_alpha,
+                                            beta_start=priority_beta_start, beta_steps=priority_beta_steps)
+        else:
+            self.memory = Memory(replay_memory_size, batch_size)
 
     def feed(self, ts):
         ''' Store data in to replay buffer and train the agent. There are two stages.
@@ -167,6 +181,35 @@ class DQNAgent(object):
         best_action = np.argmax(probs)
         return best_action
 
+    def step_batch(self, obs, legal_masks):
+        ''' Predict the actions of several states for generating training data, with one forward pass
+
+        Args:
+            obs (numpy.array): the stacked observations of the states
+            legal_masks (numpy.array): the boolean masks of their legal actions
+
+        Returns:
+            actions (numpy.array): the action ids
+        '''
+        epsilon = self.epsilons[min(self.total_t, self.epsilon_decay_steps - 1)]
+        q_values = self.q_estimator.predict_nograd(self.normalizer.normalize(obs))
+        A = np.full(q_values.shape, epsilon / self.action_num)
+        A[np.arange(len(A)), np.argmax(q_values, axis=1)] += (1.0 - epsilon)
+        return sample_actions(remove_illegal_batch(A, legal_masks))
+
+    def eval_step_batch(self, obs, legal_masks):
+        ''' Predict the actions of several states for evaluation purpose, with one forward pass
+
+        Args:
+            obs (numpy.array): the stacked observations of the states
+            legal_masks (numpy.array): the boolean masks of their legal actions
+
+        Returns:
+            actions (numpy.array): the best legal action ids
+        '''
+        q_values = self.q_estimator.predict_nograd(self.normalizer.normalize(obs))
+        return np.argmax(np.where(legal_masks, q_values, -np.inf), axis=1)
+
     def predict(self, state):
         ''' Predict the action probabilities but have them
             disconnected from the computation graph
@@ -190,7 +233,13 @@ class DQNAgent(object):
         Returns:
             loss (float): The loss of the current batch.
         '''
-        state_batch, action_batch, reward_batch, next_state_batch, done_batch = self.memory.sample()
+        if self.prioritized_replay:
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch, weight_batch, index_batch = \
+                self.memory.sample()
+        else:
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch = self.memory.sample()
+        state_batch = self.normalizer.normalize(state_batch)
+        next_state_batch = self.normalizer.normalize(next_state_batch)
 
         # Calculate best next actions using Q-network (Double DQN)
         q_values_next = self.q_estimator.predict_nograd(next_state_batch)
@@ -204,7 +253,12 @@ class DQNAgent(object):
         # Perform gradient descent update
         state_batch = np.array(state_batch)
 
-        loss = self.q_estimator.update(state_batch, action_batch, target_batch)
+        if self.prioritized_replay:
+            loss, td_errors = self.q_estimator.update_prioritized(state_batch, action_batch, target_batch,
+                                                                  weight_batch)
+            self.memory.update_priorities(index_batch, td_errors)
+        else:
+            loss = self.q_estimator.update(state_batch, action_batch, target_batch)
 
         # Update the target estimator
         if self.train_t % self.update_target_estimator_every == 0:
@@ -223,7 +277,8 @@ class DQNAgent(object):
         self.normalizer.append(state)
 
     def feed_memory(self, state, action, reward, next_state, done):
-        ''' Feed transition to memory
+        ''' Feed transition to memory. The states are stored as they are, the normalizer being applied to the
+            sampled batches
 
         Args:
             state (numpy.array): the current state
@@ -232,7 +287,21 @@ class DQNAgent(object):
             next_state (numpy.array): the next state after performing the action
             done (boolean): whether the episode is finished
         '''
-        self.memory.save(self.normalizer.normalize(state), action, reward, self.normalizer.normalize(next_state), done)
+        self.memory.save(state, action, reward, next_state, done)
+
+    def get_weights(self):
+        ''' Get the parameters of the Q network, to run it without PyTorch (see NumpyEstimator)
+
+        Returns:
+            weights (list): kernel of shape (input_size, output_size) and bias of each linear layer, from the input
+              to the output layer
+        '''
+        weights = []
+        for layer in self.q_estimator.qnet.fc_layers:
+            if isinstance(layer, nn.Linear):
+                weights.append(layer.weight.detach().cpu().numpy().T)
+                weights.append(layer.bias.detach().cpu().numpy())
+        return weights
 
 
 class Estimator(object):
@@ -331,6 +400,45 @@ class Estimator(object):
 
         return batch_loss
 
+    def update_prioritized(self, s, a, y, weights):
+        ''' Updates the estimator towards the given targets, with a loss
+            weighted by importance sampling
+
+        Args:
+          s (np.ndarray): (batch, state_shape) state representation
+          a (np.ndarray): (batch,) integer sampled actions
+          y (np.ndarray): (batch,) value of optimal actions according to Q-target
+          weights (np.ndarray): (batch,) importance sampling weights
+
+        Returns:
+          The calculated loss on the batch, and the TD errors before the update.
+        '''
+        self.optimizer.zero_grad()
+
+        self.qnet.train()
+
+        s = torch.from_numpy(s).float().to(self.device)
+        a = torch.from_numpy(a).long().to(self.device)
+        y = torch.from_numpy(y).float().to(self.device)
+        weights = torch.from_numpy(weights).float().to(self.device)
+
+        # (batch, state_shape) -> (batch, action_num)
+        q_as = self.qnet(s)
+
+        # (batch, action_num) -> (batch, )
+        Q = torch.gather(q_as, dim=-1, index=a.unsqueeze(-1)).squeeze(-1)
+
+        # update model
+        td_errors = y - Q
+        batch_loss = torch.mean(weights * td_errors ** 2)
+        batch_loss.backward()
+        self.optimizer.step()
+        batch_loss = batch_loss.item()
+
+        self.qnet.eval()
+
+        return batch_loss, td_errors.detach().cpu().numpy()
+
 
 class EstimatorNetwork(nn.Module):
     ''' The function approximation network for Estimator
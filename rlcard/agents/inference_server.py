@@ -0,0 +1,214 @@
+""" Central inference of an agent for the games played by other processes
+
+The process owning a DQNAgent (TensorFlow or PyTorch) serves its decisions to worker processes playing games. The
+workers write their observations and legal actions in shared memory and queue requests, the server gathers the
+requests received within a latency budget and answers all of them with one forward pass of the network, so that the
+workers need neither a copy of the network nor their own batch-1 predictions.
+"""
+
+import multiprocessing
+import threading
+import time
+from queue import Empty
+
+import numpy as np
+
+
+class InferenceServer(object):
+    """ Serve the actions of an agent to InferenceClient objects, typically used as agents by environments running
+        in other processes. The server runs in the process owning the agent, in a background thread (start) or in
+        the calling thread (serve).
+
+        The agent must provide step_batch and eval_step_batch, like DQNAgent and its PyTorch clone.
+    """
+
+    def __init__(self, agent, state_shape, num_clients, max_wait=0.002):
+        """ Initialize an InferenceServer object
+
+        Args:
+            agent (DQNAgent): the agent making the decisions
+            state_shape (list): the shape of the observations
+            num_clients (int): the number of clients, each one having at most one request at a time
+            max_wait (float): latency budget in seconds: the time the server waits for more requests after the first
+              one of a batch, unless all the clients are already waiting
+        """
+        self.agent = agent
+        self.action_num = agent.action_num
+        self.state_shape = tuple(state_shape)
+        self.num_clients = num_clients
+        self.max_wait = max_wait
+        self._obs = multiprocessing.RawArray('f', num_clients * int(np.prod(self.state_shape)))
+        self._legal_masks = multiprocessing.RawArray('B', num_clients * self.action_num)
+        self._actions = multiprocessing.RawArray('q', num_clients)
+        # Requests are (client index, is_training) tuples, the data being in the shared arrays
+        self._requests = multiprocessing.Queue()
+        self._replies = [multiprocessing.Semaphore(0) for _ in range(num_clients)]
+        self._stop_event = multiprocessing.Event()
+        self._thread = None
+
+        # Number of requests answered and of forward passes made
+        self.request_num = 0
+        self.batch_num = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def client(self, index):
+        """ Get the client of a given index, to be given to the worker process using it
+
+        Args:
+            index (int): the index of the client, between 0 and num_clients - 1
+
+        Returns:
+            (InferenceClient): the client
+        """
+        if not 0 <= index < self.num_clients:
+            raise ValueError('The client index should be between 0 and {}, got {}'.format(self.num_clients - 1, index))
+        return InferenceClient(index, self.state_shape, self.action_num, self._obs, self._legal_masks, self._actions,
+                               self._requests, self._replies[index], self._stop_event)
+
+    def start(self):
+        """ Serve the requests in a background thread
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.serve, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stop serving, the clients waiting for an action raising a RuntimeError
+        """
+        self._stop_event.set()
+        # Wake the server up if it is waiting for a request
+        self._requests.put(None)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def serve(self):
+        """ Answer the requests until stop is called
+        """
+        while not self._stop_event.is_set():
+            requests = self._get_batch()
+            if requests:
+                self._answer(requests)
+
+    def _get_batch(self):
+        """ Wait for a request, then for the next ones until the latency budget is spent or all the clients wait
+
+        Returns:
+            (list): the (client index, is_training) requests
+        """
+        request = self._requests.get()
+        if request is None:
+            return []
+        requests = [request]
+        deadline = time.monotonic() + self.max_wait
+        while len(requests) < self.num_clients:
+            try:
+                request = self._requests.get(timeout=max(0.0, deadline - time.monotonic()))
+            except Empty:
+                break
+            if request is None:
+                break
+            requests.append(request)
+        return requests
+
+    def _answer(self, requests):
+        """ Compute the actions of a batch of requests and wake their clients up
+
+        Args:
+            requests (list): the (client index, is_training) requests
+        """
+        obs = np.frombuffer(self._obs, dtype=np.float32).reshape((self.num_clients,) + self.state_shape)
+        legal_masks = np.frombuffer(self._legal_masks, dtype=np.bool_).reshape(self.num_clients, self.action_num)
+        actions = np.frombuffer(self._actions, dtype=np.int64)
+        for is_training in (True, False):
+            indexes = [index for index, training in requests if training == is_training]
+            if not indexes:
+                continue
+            step_batch = self.agent.step_batch if is_training else self.agent.eval_step_batch
+            actions[indexes] = step_batch(obs[indexes], legal_masks[indexes])
+            self.batch_num += 1
+        self.request_num += len(requests)
+        for index, _ in requests:
+            self._replies[index].release()
+
+
+class InferenceClient(object):
+    """ Agent asking an InferenceServer for its actions, usable by an environment in any process started after the
+        server was created
+    """
+
+    def __init__(self, index, state_shape, action_num, obs, legal_masks, actions, requests, reply, stop_event):
+        """ Initialize an InferenceClient object, see InferenceServer.client
+
+        Args:
+            index (int): the index of the client
+            state_shape (list): the shape of the observations
+            action_num (int): the number of the actions
+            obs (multiprocessing.RawArray): the observations of the clients
+            legal_masks (multiprocessing.RawArray): the legal action masks of the clients
+            actions (multiprocessing.RawArray): the actions computed by the server
+            requests (multiprocessing.Queue): the queue of the requests of the clients
+            reply (multiprocessing.Semaphore): released by the server once the action of the client is computed
+            stop_event (multiprocessing.Event): set when the server stops
+        """
+        self.index = index
+        self.state_shape = tuple(state_shape)
+        self.action_num = action_num
+        self._obs = obs
+        self._legal_masks = legal_masks
+        self._actions = actions
+        self._requests = requests
+        self._reply = reply
+        self._stop_event = stop_event
+
+    def step(self, state):
+        """ Predict the action for generating training data
+
+        Args:
+            state (dict): current state, with the observation and the legal actions
+
+        Returns:
+            action (int): an action id
+        """
+        return self._request(state, True)
+
+    def eval_step(self, state):
+        """ Predict the action for evaluation purpose.
+
+        Args:
+            state (dict): current state, with the observation and the legal actions
+
+        Returns:
+            action (int): an action id
+        """
+        return self._request(state, False)
+
+    def _request(self, state, is_training):
+        """ Send the state to the server and wait for its action
+
+        Args:
+            state (dict): current state, with the observation and the legal actions
+            is_training (boolean): True to get the action of step_batch, False for eval_step_batch
+
+        Returns:
+            action (int): an action id
+        """
+        state_size = int(np.prod(self.state_shape))
+        obs = np.frombuffer(self._obs, dtype=np.float32, count=state_size, offset=self.index * state_size * 4)
+        legal_mask = np.frombuffer(self._legal_masks, dtype=np.bool_, count=self.action_num,
+                                   offset=self.index * self.action_num)
+        obs[:] = np.ravel(state['obs'])
+        legal_mask[:] = False
+        legal_mask[state['legal_actions']] = True
+        self._requests.put((self.index, is_training))
+        while not self._reply.acquire(timeout=0.1):
+            if self._stop_event.is_set():
+                raise RuntimeError('The inference server stopped')
+        return int(self._actions[self.index])
@@ -0,0 +1,48 @@
+""" Q-Value estimator running the forward pass of the DQN networks with NumPy only
+"""
+
+import numpy as np
+
+
+class NumpyEstimator(object):
+    """ Forward pass of the MLP of rlcard.agents.dqn_agent.Estimator (and of its PyTorch clone): fully connected
+        layers with tanh activations, followed by a linear output layer. It does not depend on TensorFlow, so that
+        processes that only play games can share the weights of a network trained elsewhere.
+    """
+
+    def __init__(self, weights=None):
+        """ Initialize a NumpyEstimator object
+
+        Args:
+            weights (list): kernel of shape (input_size, output_size) and bias of each fully connected layer, from
+              the input to the output layer, as given by DQNAgent.get_weights
+        """
+        self.weights = []
+        if weights is not None:
+            self.set_weights(weights)
+
+    def set_weights(self, weights):
+        """ Replace the parameters of the network
+
+        Args:
+            weights (list): kernels and biases of the layers, see __init__
+        """
+        if len(weights) % 2 != 0:
+            raise ValueError('Weights should alternate kernels and biases, got {} arrays'.format(len(weights)))
+        self.weights = list(weights)
+
+    def predict(self, s):
+        """ Predicts action values.
+
+        Args:
+          s (numpy.array): State input of shape [batch_size] + state_shape
+
+        Returns:
+          numpy.array of shape [batch_size, action_num] containing the estimated action values.
+        """
+        fc = np.reshape(s, (len(s), -1))
+        for layer in range(0, len(self.weights), 2):
+            fc = fc @ self.weights[layer] + self.weights[layer + 1]
+            if layer < len(self.weights) - 2:
+                fc = np.tanh(fc)
+        return fc
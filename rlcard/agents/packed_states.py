@@ -0,0 +1,105 @@
+""" Compact storage of the states of a replay memory
+"""
+
+import numpy as np
+
+
+class PackedStates(object):
+    """ Array-like storage of states made of small non-negative integers, mostly 0 and 1, like the planes of the Tarot
+        observations. Each state is stored as one bit per cell, telling whether the cell is non-zero, plus the
+        position and value of its few cells above 1 (at most max_overflow of them). A Tarot observation takes 121
+        bytes instead of 3080 as float32.
+
+        States are written with packed_states[indexes] = states and read back as float32 arrays with
+        packed_states[indexes].
+    """
+
+    def __init__(self, size, state_shape, max_overflow=8, arrays=None):
+        """ Initialize a PackedStates object
+
+        Args:
+            size (int): the number of states that can be stored
+            state_shape (list): the shape of the states
+            max_overflow (int): the maximum number of cells above 1 in a state
+            arrays (tuple): arrays described by layouts to be used as storage, new ones are allocated if None
+        """
+        self.size = size
+        self.state_shape = tuple(state_shape)
+        self.state_size = int(np.prod(self.state_shape))
+        self.max_overflow = max_overflow
+        if arrays is None:
+            arrays = [np.zeros(shape, dtype=dtype) for dtype, shape in self.layouts(size, state_shape, max_overflow)]
+        self.bits, self.overflow_indexes, self.overflow_values = arrays
+
+    @staticmethod
+    def layouts(size, state_shape, max_overflow=8):
+        """ Types and shapes of the storage arrays
+
+        Args:
+            size (int): the number of states that can be stored
+            state_shape (list): the shape of the states
+            max_overflow (int): the maximum number of cells above 1 in a state
+
+        Returns:
+            (list): (dtype, shape) of the bits, of the indexes of the cells above 1 and of their values
+        """
+        state_size = int(np.prod(state_shape))
+        # Unused overflow slots hold the index state_size, which is past the last cell
+        index_dtype = np.uint16 if state_size < np.iinfo(np.uint16).max else np.uint32
+        return [(np.dtype(np.uint8), (size, (state_size + 7) // 8)),
+                (np.dtype(index_dtype), (size, max_overflow)),
+                (np.dtype(np.uint8), (size, max_overflow))]
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes + self.overflow_indexes.nbytes + self.overflow_values.nbytes
+
+    def __len__(self):
+        return self.size
+
+    def __setitem__(self, indexes, states):
+        """ Pack and store states
+
+        Args:
+            indexes (int or numpy.array): the index of one state, or the indexes of a batch of states
+            states (numpy.array): one state, or a batch of states
+        """
+        states = np.asarray(states)
+        if np.ndim(indexes) == 0:
+            indexes = [indexes]
+            states = states[np.newaxis]
+        if not np.issubdtype(states.dtype, np.integer):
+            raise ValueError('Only integer states can be packed, got {}'.format(states.dtype))
+        flat_states = states.reshape(len(states), self.state_size)
+        if flat_states.size and (flat_states.min() < 0 or flat_states.max() > np.iinfo(np.uint8).max):
+            raise ValueError('Packed states should be between 0 and 255')
+        rows, cells = np.nonzero(flat_states > 1)
+        counts = np.bincount(rows, minlength=len(flat_states))
+        if counts.size and counts.max() > self.max_overflow:
+            raise ValueError('A state has {} cells above 1, more than {}'.format(counts.max(), self.max_overflow))
+        # Rank of each cell above 1 among the ones of its state
+        slots = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        overflow_indexes = np.full((len(flat_states), self.max_overflow), self.state_size,
+                                   dtype=self.overflow_indexes.dtype)
+        overflow_values = np.zeros((len(flat_states), self.max_overflow), dtype=np.uint8)
+        overflow_indexes[rows, slots] = cells
+        overflow_values[rows, slots] = flat_states[rows, cells]
+        self.bits[indexes] = np.packbits(flat_states != 0, axis=1)
+        self.overflow_indexes[indexes] = overflow_indexes
+        self.overflow_values[indexes] = overflow_values
+
+    def __getitem__(self, indexes):
+        """ Unpack stored states
+
+        Args:
+            indexes (numpy.array): the indexes of a batch of states
+
+        Returns:
+            (numpy.array): the float32 states
+        """
+        bits = self.bits[indexes]
+        # One more column for the unused overflow slots
+        flat_states = np.zeros((len(bits), self.state_size + 1), dtype=np.float32)
+        flat_states[:, :self.state_size] = np.unpackbits(bits, axis=1, count=self.state_size)
+        flat_states[np.arange(len(bits))[:, np.newaxis], self.overflow_indexes[indexes]] = self.overflow_values[indexes]
+        return flat_states[:, :self.state_size].reshape((len(bits),) + self.state_shape)
@@ -5,16 +5,17 @@ class RandomAgent(object):
     """ A random agent. Random agents is for running toy examples on the card games
     """
 
-    def __init__(self, action_num):
+    def __init__(self, action_num, seed=None):
         """ Initilize the random agent
 
         Args:
             action_num (int): the size of the ouput action space
+            seed (int or numpy.random.SeedSequence): seed of the random generator of the agent
         """
         self.action_num = action_num
+        self.np_random = np.random.default_rng(seed)
 
-    @staticmethod
-    def step(state):
+    def step(self, state):
         """ Predict the action given the curent state in gerenerating training data.
 
         Args:
@@ -24,7 +25,7 @@ class RandomAgent(object):
             action (int): the action predicted (randomly chosen) by the random agent
         """
         # return np.random.randint(0, self.action_num)
-        return np.random.choice(state['legal_actions'])
+        return self.np_random.choice(state['legal_actions'])
 
     def eval_step(self, state):
         """ Predict the action given the curent state for evaluation.
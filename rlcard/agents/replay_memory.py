@@ -0,0 +1,352 @@
+""" Replay memories and state normalizer of the DQN agents
+
+They only depend on NumPy, so that they can be used by the PyTorch agent and by the processes running the networks
+with NumPy without importing TensorFlow.
+"""
+
+import random
+
+import numpy as np
+
+from rlcard.agents.packed_states import PackedStates
+
+
+class Normalizer(object):
+    """ Normalizer class that tracks the running statistics for normalization. The mean and the variance of all the
+        appended states are updated with Welford's online algorithm, in fixed memory, and the statistics of several
+        normalizers (for instance one per worker) can be merged
+    """
+
+    def __init__(self):
+        """ Initialize a Normalizer instance.
+        """
+        self.mean = None
+        self.std = None
+        # Sum of the squared differences to the mean
+        self.m2 = None
+        self.length = 0
+
+    def normalize(self, s):
+        """ Normalize the state with the running mean and std.
+
+        Args:
+            s (numpy.array): the input state
+
+        Returns:
+            a (int):  normalized state
+        """
+        if self.length == 0:
+            return s
+        return (s - self.mean) / (self.std + 1e-8)
+
+    def append(self, s):
+        """ Append a new state and update the running statistics
+
+        Args:
+            s (numpy.array): the input state
+        """
+        s = np.asarray(s, dtype=float)
+        if self.length == 0:
+            self.mean = np.zeros_like(s)
+            self.m2 = np.zeros_like(s)
+        self.length += 1
+        delta = s - self.mean
+        self.mean += delta / self.length
+        self.m2 += delta * (s - self.mean)
+        self._update_std()
+
+    def append_batch(self, states):
+        """ Append several states and update the running statistics
+
+        Args:
+            states (numpy.array): the input states, stacked along the first axis
+        """
+        states = np.asarray(states, dtype=float)
+        if len(states) == 0:
+            return
+        batch = Normalizer()
+        batch.length = len(states)
+        batch.mean = states.mean(axis=0)
+        batch.m2 = np.square(states - batch.mean).sum(axis=0)
+        self.merge(batch)
+
+    def merge(self, other):
+        """ Add the statistics of the states appended to another normalizer
+
+        Args:
+            other (Normalizer): the other normalizer
+        """
+        if other.length == 0:
+            return
+        if self.length == 0:
+            self.mean = other.mean.copy()
+            self.m2 = other.m2.copy()
+            self.length = other.length
+        else:
+            length = self.length + other.length
+            delta = other.mean - self.mean
+            self.mean = self.mean + delta * other.length / length
+            self.m2 = self.m2 + other.m2 + np.square(delta) * self.length * other.length / length
+            self.length = length
+        self._update_std()
+
+    def _update_std(self):
+        """ Compute the standard deviation from the sum of the squared differences
+        """
+        std = np.sqrt(self.m2 / self.length)
+        # The cells that never varied are only centered, instead of being divided by 1e-8
+        self.std = np.where(std > 0, std, 1.0)
+
+
+class Memory(object):
+    """ Memory for saving transitions, in preallocated arrays used as a ring buffer: once the memory is full, the
+        oldest transitions are overwritten. Integer states, like the Tarot observations, are bit-packed (see
+        PackedStates), other states are stored as float32
+    """
+
+    def __init__(self, memory_size, batch_size):
+        """ Initialize
+        Args:
+            memory_size (int): the size of the memroy buffer
+            batch_size (int): the size of the sampled batches
+        """
+        self.memory_size = memory_size
+        self.batch_size = batch_size
+
+        # The arrays are allocated at the first save, once the shape and the type of the states are known
+        self.states = None
+        self.actions = None
+        self.rewards = None
+        self.next_states = None
+        self.dones = None
+
+        # Index of the next transition to be written and number of transitions in the memory
+        self.position = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _allocate(self, state_shape, state_dtype):
+        """ Allocate the arrays of the memory
+
+        Args:
+            state_shape (tuple): the shape of the states
+            state_dtype (numpy.dtype): the type of the states
+        """
+        if np.issubdtype(state_dtype, np.integer):
+            self.states = PackedStates(self.memory_size, state_shape)
+            self.next_states = PackedStates(self.memory_size, state_shape)
+        else:
+            self.states = np.zeros((self.memory_size,) + state_shape, dtype=np.float32)
+            self.next_states = np.zeros((self.memory_size,) + state_shape, dtype=np.float32)
+        self.actions = np.zeros(self.memory_size, dtype=np.int64)
+        self.rewards = np.zeros(self.memory_size, dtype=np.float32)
+        self.dones = np.zeros(self.memory_size, dtype=bool)
+
+    def save(self, state, action, reward, next_state, done):
+        """ Save transition into memory
+
+        Args:
+            state (numpy.array): the current state
+            action (int): the performed action ID
+            reward (float): the reward received
+            next_state (numpy.array): the next state after performing the action
+            done (boolean): whether the episode is finished
+        """
+        if self.states is None:
+            self._allocate(np.shape(state), np.asarray(state).dtype)
+        self.states[self.position] = state
+        self.actions[self.position] = action
+        self.rewards[self.position] = reward
+        self.next_states[self.position] = next_state
+        self.dones[self.position] = done
+        self.position = (self.position + 1) % self.memory_size
+        self.size = min(self.size + 1, self.memory_size)
+
+    def save_batch(self, states, actions, rewards, next_states, dones):
+        """ Save several transitions into memory, for instance a whole trajectory
+
+        Args:
+            states (numpy.array): the current states, one per transition
+            actions (numpy.array): the performed action IDs
+            rewards (numpy.array): the rewards received
+            next_states (numpy.array): the next states after performing the actions
+            dones (numpy.array): whether the episode is finished after each transition
+        """
+        num = len(actions)
+        if num == 0:
+            return
+        if self.states is None:
+            self._allocate(np.shape(states)[1:], np.asarray(states).dtype)
+        # Only the last transitions are kept if there are more than the memory can hold
+        kept = slice(max(0, num - self.memory_size), num)
+        indexes = (self.position + np.arange(num)[kept]) % self.memory_size
+        self.states[indexes] = np.asarray(states)[kept]
+        self.actions[indexes] = np.asarray(actions)[kept]
+        self.rewards[indexes] = np.asarray(rewards)[kept]
+        self.next_states[indexes] = np.asarray(next_states)[kept]
+        self.dones[indexes] = np.asarray(dones)[kept]
+        self.position = (self.position + num) % self.memory_size
+        self.size = min(self.size + num, self.memory_size)
+
+    def sample(self):
+        """ Sample a minibatch from the replay memory
+
+        Returns:
+            state_batch (numpy.array): a batch of states
+            action_batch (numpy.array): a batch of actions
+            reward_batch (numpy.array): a batch of rewards
+            next_state_batch (numpy.array): a batch of states
+            done_batch (numpy.array): a batch of dones
+        """
+        indexes = random.sample(range(self.size), self.batch_size)
+        return (self.states[indexes], self.actions[indexes], self.rewards[indexes], self.next_states[indexes],
+                self.dones[indexes])
+
+
+class PrioritizedMemory(Memory):
+    """ Memory sampling each transition with a probability proportional to its priority, the absolute value of its
+        last TD error to the power alpha. New transitions get the highest priority seen so far, so that they are
+        sampled at least once. Importance sampling weights correct the bias of the sampling in the loss.
+    """
+
+    def __init__(self, memory_size, batch_size, alpha=0.6, beta_start=0.4, beta_steps=100000, epsilon=1e-6):
+        """ Initialize
+        Args:
+            memory_size (int): the size of the memroy buffer
+            batch_size (int): the size of the sampled batches
+            alpha (float): the exponent of the TD errors in the priorities, 0 being uniform sampling
+            beta_start (float): the initial exponent of the importance sampling weights
+            beta_steps (int): the number of samples to increase the exponent to 1 over
+            epsilon (float): added to the TD errors, so that every transition can be sampled
+        """
+        super(PrioritizedMemory, self).__init__(memory_size, batch_size)
+        self.alpha = alpha
+        self.betas = np.linspace(beta_start, 1.0, beta_steps)
+        self.epsilon = epsilon
+        self.sample_t = 0
+        self.max_priority = 1.0
+        self.tree = SumTree(memory_size)
+
+    def save(self, state, action, reward, next_state, done):
+        """ Save transition into memory, with the highest priority
+
+        Args:
+            state (numpy.array): the current state
+            action (int): the performed action ID
+            reward (float): the reward received
+            next_state (numpy.array): the next state after performing the action
+            done (boolean): whether the episode is finished
+        """
+        index = self.position
+        super(PrioritizedMemory, self).save(state, action, reward, next_state, done)
+        self.tree.update([index], self.max_priority ** self.alpha)
+
+    def save_batch(self, states, actions, rewards, next_states, dones):
+        """ Save several transitions into memory, with the highest priority
+
+        Args:
+            states (numpy.array): the current states, one per transition
+            actions (numpy.array): the performed action IDs
+            rewards (numpy.array): the rewards received
+            next_states (numpy.array): the next states after performing the actions
+            dones (numpy.array): whether the episode is finished after each transition
+        """
+        num = len(actions)
+        indexes = (self.position + np.arange(max(0, num - self.memory_size), num)) % self.memory_size
+        super(PrioritizedMemory, self).save_batch(states, actions, rewards, next_states, dones)
+        self.tree.update(indexes, self.max_priority ** self.alpha)
+
+    def sample(self):
+        """ Sample a minibatch from the replay memory, one transition being drawn in each of batch_size segments of
+            equal total priority
+
+        Returns:
+            state_batch (numpy.array): a batch of states
+            action_batch (numpy.array): a batch of actions
+            reward_batch (numpy.array): a batch of rewards
+            next_state_batch (numpy.array): a batch of states
+            done_batch (numpy.array): a batch of dones
+            weight_batch (numpy.array): the importance sampling weights of the transitions, the highest being 1
+            index_batch (numpy.array): the indexes of the transitions, for update_priorities
+        """
+        segment = self.tree.total / self.batch_size
+        values = (np.arange(self.batch_size) + np.random.random_sample(self.batch_size)) * segment
+        indexes = np.minimum(self.tree.find(values), self.size - 1)
+        probabilities = self.tree[indexes] / self.tree.total
+        beta = self.betas[min(self.sample_t, len(self.betas) - 1)]
+        self.sample_t += 1
+        weights = (self.size * probabilities) ** -beta
+        # Normalized by the highest weight of the batch rather than of the whole memory
+        weights /= weights.max()
+        return (self.states[indexes], self.actions[indexes], self.rewards[indexes], self.next_states[indexes],
+                self.dones[indexes], weights.astype(np.float32), indexes)
+
+    def update_priorities(self, indexes, td_errors):
+        """ Set the priorities of sampled transitions from their new TD errors
+
+        Args:
+            indexes (numpy.array): the indexes of the transitions, as returned by sample
+            td_errors (numpy.array): their TD errors
+        """
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, priorities.max())
+        self.tree.update(indexes, priorities ** self.alpha)
+
+
+class SumTree(object):
+    """ Binary tree stored in an array, each node holding the sum of the values of its two children, so that the
+        leaves can be updated and drawn proportionally to their values in O(log n)
+    """
+
+    def __init__(self, capacity):
+        """ Initialize
+        Args:
+            capacity (int): the number of leaves
+        """
+        self.capacity = capacity
+        # The tree is complete: the root is at index 1, the children of node i are at 2 * i and 2 * i + 1, and the
+        # leaves are the last num_leaves nodes
+        self.depth = int(np.ceil(np.log2(max(capacity, 1))))
+        self.num_leaves = 2 ** self.depth
+        self.tree = np.zeros(2 * self.num_leaves)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def __getitem__(self, indexes):
+        return self.tree[np.asarray(indexes) + self.num_leaves]
+
+    def update(self, indexes, values):
+        """ Set the values of leaves and update their ancestors
+
+        Args:
+            indexes (numpy.array): the indexes of the leaves
+            values (numpy.array or float): their new values
+        """
+        nodes = np.asarray(indexes) + self.num_leaves
+        self.tree[nodes] = values
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values):
+        """ Find the leaves where the cumulative sums of the values of the leaves reach the given values
+
+        Args:
+            values (numpy.array): values between 0 and total
+
+        Returns:
+            (numpy.array): the indexes of the leaves
+        """
+        values = np.array(values, dtype=float)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            # Rounding errors must not lead to an empty subtree
+            go_right = (values >= self.tree[left]) & (self.tree[left + 1] > 0)
+            values -= np.where(go_right, self.tree[left], 0)
+            nodes = left + go_right
+        return nodes - self.num_leaves
@@ -0,0 +1,174 @@
+""" Replay memory in shared memory, filled by several processes
+"""
+
+import multiprocessing
+import random
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from rlcard.agents.packed_states import PackedStates
+
+
+class SharedReplayMemory(object):
+    """ Replay memory whose transitions are stored in preallocated arrays in one shared memory block. Any process
+        given the memory (as an argument of multiprocessing.Process) can save transitions or sample batches, the
+        arrays being read and written in place without pickling. The oldest transitions are overwritten once the
+        memory is full. Integer states are bit-packed (see PackedStates), other states are stored as float32.
+
+        The process creating the memory owns the block: it must call unlink once all the processes are done with it.
+    """
+
+    def __init__(self, memory_size, batch_size, state_shape, state_dtype=np.float32):
+        """ Allocate the memory
+
+        Args:
+            memory_size (int): the size of the memory buffer
+            batch_size (int): the size of the sampled batches
+            state_shape (list): the shape of the states
+            state_dtype (numpy.dtype): the type of the saved states
+        """
+        self.memory_size = memory_size
+        self.batch_size = batch_size
+        self.state_shape = tuple(state_shape)
+        self.state_dtype = np.dtype(state_dtype)
+        self.lock = multiprocessing.Lock()
+        self._shm = shared_memory.SharedMemory(create=True, size=self._block_size())
+        self._owner = True
+        self._set_arrays()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ['_shm', 'states', 'next_states'] + [name for name, _, _ in self._layouts()]:
+            state.pop(key, None)
+        state['name'] = self._shm.name
+        return state
+
+    def __setstate__(self, state):
+        name = state.pop('name')
+        self.__dict__.update(state)
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = False
+        self._set_arrays()
+
+    def _layouts(self):
+        """ Type and shape of each array of the block
+
+        Returns:
+            (list): (name, dtype, shape) of the arrays, in their order in the block
+        """
+        layouts = [('_header', np.dtype(np.int64), (2,))]
+        for states_name in ('states', 'next_states'):
+            if self._packed():
+                layouts += [('_{}_{}'.format(states_name, index), dtype, shape) for index, (dtype, shape)
+                            in enumerate(PackedStates.layouts(self.memory_size, self.state_shape))]
+            else:
+                layouts.append((states_name, np.dtype(np.float32), (self.memory_size,) + self.state_shape))
+        return layouts + [('rewards', np.dtype(np.float32), (self.memory_size,)),
+                ('actions', np.dtype(np.int64), (self.memory_size,)),
+                ('dones', np.dtype(np.bool_), (self.memory_size,))]
+
+    def _packed(self):
+        """ Tell whether the states are bit-packed
+
+        Returns:
+            (boolean): True for integer states
+        """
+        return np.issubdtype(self.state_dtype, np.integer)
+
+    def _block_size(self):
+        """ Size of the shared memory block
+
+        Returns:
+            (int): number of bytes of all the arrays
+        """
+        return sum(dtype.itemsize * int(np.prod(shape)) for _, dtype, shape in self._layouts())
+
+    def _set_arrays(self):
+        """ Create the array views over the shared memory block
+        """
+        offset = 0
+        for name, dtype, shape in self._layouts():
+            array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=offset)
+            setattr(self, name, array)
+            offset += array.nbytes
+        if self._packed():
+            for states_name in ('states', 'next_states'):
+                arrays = [getattr(self, '_{}_{}'.format(states_name, index)) for index in range(3)]
+                setattr(self, states_name, PackedStates(self.memory_size, self.state_shape, arrays=arrays))
+
+    def __len__(self):
+        return int(self._header[1])
+
+    def save(self, state, action, reward, next_state, done):
+        """ Save transition into memory
+
+        Args:
+            state (numpy.array): the current state
+            action (int): the performed action ID
+            reward (float): the reward received
+            next_state (numpy.array): the next state after performing the action
+            done (boolean): whether the episode is finished
+        """
+        with self.lock:
+            position, size = self._header
+            self.states[position] = state
+            self.actions[position] = action
+            self.rewards[position] = reward
+            self.next_states[position] = next_state
+            self.dones[position] = done
+            self._header[0] = (position + 1) % self.memory_size
+            self._header[1] = min(size + 1, self.memory_size)
+
+    def save_batch(self, states, actions, rewards, next_states, dones):
+        """ Save several transitions into memory, for instance a whole trajectory
+
+        Args:
+            states (numpy.array): the current states, one per transition
+            actions (numpy.array): the performed action IDs
+            rewards (numpy.array): the rewards received
+            next_states (numpy.array): the next states after performing the actions
+            dones (numpy.array): whether the episode is finished after each transition
+        """
+        num = len(actions)
+        # Only the last transitions are kept if there are more than the memory can hold
+        kept = slice(max(0, num - self.memory_size), num)
+        with self.lock:
+            position, size = self._header
+            indexes = (position + np.arange(num)[kept]) % self.memory_size
+            self.states[indexes] = np.asarray(states)[kept]
+            self.actions[indexes] = np.asarray(actions)[kept]
+            self.rewards[indexes] = np.asarray(rewards)[kept]
+            self.next_states[indexes] = np.asarray(next_states)[kept]
+            self.dones[indexes] = np.asarray(dones)[kept]
+            self._header[0] = (position + num) % self.memory_size
+            self._header[1] = min(size + num, self.memory_size)
+
+    def sample(self):
+        """ Sample a minibatch from the replay memory
+
+        Returns:
+            state_batch (numpy.array): a batch of states
+            action_batch (numpy.array): a batch of actions
+            reward_batch (numpy.array): a batch of rewards
+            next_state_batch (numpy.array): a batch of states
+            done_batch (numpy.array): a batch of dones
+        """
+        with self.lock:
+            indexes = random.sample(range(self._header[1]), self.batch_size)
+            return (self.states[indexes], self.actions[indexes], self.rewards[indexes], self.next_states[indexes],
+                    self.dones[indexes])
+
+    def close(self):
+        """ Detach the memory from the current process
+        """
+        for name in ['states', 'next_states'] + [name for name, _, _ in self._layouts()]:
+            setattr(self, name, None)
+        self._shm.close()
+
+    def unlink(self):
+        """ Free the shared memory block, called by the process which created it
+        """
+        self.close()
+        if self._owner:
+            self._shm.unlink()
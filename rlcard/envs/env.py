@@ -1,25 +1,30 @@
+import multiprocessing
 import random
 import time
-from typing import Union, List
+from typing import TYPE_CHECKING, Iterator, List, Tuple, Union
 
 import numpy as np
 
 # TODO - WARNING - Some changes done compared to initial environment
-from rlcard.agents.dqn_agent import DQNAgent
 from rlcard.agents.random_agent import RandomAgent
 from rlcard.games.tarot.alpha_and_omega.card import TarotCard
 from rlcard.games.tarot.bid.bid import TarotBid
 from rlcard.games.tarot.global_game import GlobalGame
 from rlcard.utils.utils import reorganize
 
+if TYPE_CHECKING:
+    # Only imported for the type hints, so that the environments do not import TensorFlow
+    from rlcard.agents.dqn_agent import DQNAgent
+
 
 class Env(object):
 
-    def __init__(self, game: GlobalGame, allow_step_back=False):
+    def __init__(self, game: GlobalGame, allow_step_back=False, seed: int = None):
         """
         Initialize
         :param game: GlobalGame object
-        :param allow_step_back: UNUSED
+        :param allow_step_back: True if the game keeps an undo log so that step_back can be used
+        :param seed: seed of the random generators of the environment and its game (see Env.seed)
         """
         self.state_shape = None
         self.name = None
@@ -41,6 +46,22 @@ class Env(object):
 
         self.model = None
 
+        # Random generator of the environment, the game having its own one
+        self.np_random = None
+        self.seed(seed)
+
+    def seed(self, seed: int = None) -> None:
+        """
+        Set independent random streams for the game (deal and starting player) and for the environment (fallback
+        when an illegal action is chosen), both derived from one SeedSequence
+        :param seed: int or SeedSequence, fresh entropy if None
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        game_seed, env_seed = seed.spawn(2)
+        self.game.seed(game_seed)
+        self.np_random = np.random.default_rng(env_seed)
+
     def init_game(self) -> (np.ndarray, int):
         """
         Start a new game
@@ -68,7 +89,7 @@ class Env(object):
             return self.single_agent_step(action)
 
         self.timestep += 1
-        next_state, player_id = self.game.step(self.decode_action(action))
+        next_state, player_id = self.game.step(self.decode_action_id(action))
 
         return self.extract_state(next_state), player_id
 
@@ -83,7 +104,7 @@ class Env(object):
         """
         reward = 0.
         self.timestep += 1
-        state, player_id = self.game.step(self.decode_action(action))
+        state, player_id = self.game.step(self.decode_action_id(action))
         while not self.game.is_over() and not player_id == self.active_player:
             self.timestep += 1
             if self.model[self.game.current_game_part].use_raw:
@@ -147,12 +168,12 @@ class Env(object):
 
     def step_back(self) -> (np.ndarray, int):
         """
-        Take one step backward.
+        Take one step backward, in O(1) thanks to the undo log of the game
         :return: (tuple): Tuple containing:
 
                 (numpy.array): The previous state
                 (int): The ID of the previous player
-        Note: Error will be raised if step back from the root node.
+        Note: False is returned if step back from the root node.
         """
         if not self.allow_step_back:
             raise Exception('Step back is off. To use step_back, please set allow_step_back=True in rlcard.make')
@@ -190,7 +211,7 @@ class Env(object):
         """
         return self.extract_state(self.game.get_state(player_id))
 
-    def set_agents(self, agents: List[Union[RandomAgent, DQNAgent]]) -> None:
+    def set_agents(self, agents: List[Union[RandomAgent, 'DQNAgent']]) -> None:
         """
         Set the agents that will interact with the environment
         :param agents: List of Agent classes
@@ -205,9 +226,9 @@ class Env(object):
         """
         Run a complete game, either for evaluation or training RL agent.
         :param is_training: (boolean): True if for training purpose.
-        :param seed: (int): A seed for running the game. For single-process program,
+        :param seed: (int): A seed for running the game, given to Env.seed. For single-process program,
               the seed should be set to None. For multi-process program, the
-              seed should be asigned for reproducibility.
+              seed should be asigned for reproducibility. The agents keep their own random generators.
         :return: (tuple) Tuple containing:
 
                 (list): A list of trajectories generated from the environment.
@@ -220,8 +241,7 @@ class Env(object):
             raise ValueError('Run in single agent mode or human mode is not allowed.')
 
         if seed is not None:
-            np.random.seed(seed)
-            random.seed(seed)
+            self.seed(seed)
 
         trajectories = [[] for _ in range(self.player_num)]
         state, player_id = self.init_game()
@@ -263,19 +283,43 @@ class Env(object):
 
         return trajectories, payoffs
 
-    def run_multi(self, task_num: int, result: List, is_training: bool = False, seed: int = None) -> None:
+    def run_multi(self, task_num: int, num_workers: int = None, is_training: bool = False,
+                  seed: int = None) -> Iterator[Tuple[List[List[list]], dict]]:
         """
-        UNUSED function for now - must depend on the agents used ?
-        :param task_num:
-        :param result:
-        :param is_training:
-        :param seed:
-        :return:
+        Run several complete games in parallel, each worker process having its own copy of the environment and of
+        its agents. Each game gets its own seed, spawned from the given one and used for the environment (see
+        Env.seed) and for the random generators of the agents, so that the results do not depend on the worker
+        running the game.
+        :param task_num: (int): number of games to be played
+        :param num_workers: (int): number of worker processes, the number of CPUs if None
+        :param is_training: (boolean): True if for training purpose.
+        :param seed: (int): A seed for all the games, fresh entropy if None
+        :return: iterator over the (trajectories, payoffs) tuples returned by Env.run, in the order in which the
+            games end
+
+        Note: The agents are copied in the workers, so they must be picklable when processes are not forked, and
+              training them through the trajectories only affects the agents of the main process.
         """
-        if seed is not None:
-            np.random.seed(seed)
-        for _ in range(task_num):
-            result.append(self.run(is_training=is_training))
+        if self.single_agent_mode or self.human_mode:
+            raise ValueError('Run in single agent mode or human mode is not allowed.')
+
+        # The games are played by a generator, so that the checks above are done by the call itself
+        return self._run_multi(task_num, num_workers, is_training, seed)
+
+    def _run_multi(self, task_num: int, num_workers: int, is_training: bool,
+                   seed: int) -> Iterator[Tuple[List[List[list]], dict]]:
+        """
+        Play the games of Env.run_multi
+        :param task_num: (int): number of games to be played
+        :param num_workers: (int): number of worker processes, the number of CPUs if None
+        :param is_training: (boolean): True if for training purpose.
+        :param seed: (int): A seed for all the games, fresh entropy if None
+        :return: iterator over the (trajectories, payoffs) tuples returned by Env.run
+        """
+        task_seeds = np.random.SeedSequence(seed).spawn(task_num)
+        with multiprocessing.Pool(num_workers, initializer=_init_worker, initargs=(self,)) as pool:
+            for result in pool.imap_unordered(_run_worker_task, [(is_training, task_seed) for task_seed in task_seeds]):
+                yield result
 
     def set_mode(self, active_player: int = 0, single_agent_mode: bool = False, human_mode: bool = False) -> None:
         """
@@ -356,9 +400,47 @@ class Env(object):
         """
         raise NotImplementedError
 
+    def decode_action_id(self, action_id: int) -> int:
+        """
+        Check the selected action id against the legal actions of the current game part
+        :param action_id: chosen ID from the model
+        :return: int - chosen action id if legal, a random id in the avaiable ones otherwise
+        """
+        raise NotImplementedError
+
     def get_legal_actions(self) -> List[int]:
         """
         transform legal actions from game to the action_space legal actions
         :return: legal_ids, a list of int with all legal_ids for action for agents
         """
         raise NotImplementedError
+
+
+# Environment of a worker process of Env.run_multi
+_worker_env = None
+
+
+def _init_worker(env: Env) -> None:
+    """
+    Keep the copy of the environment, and of its agents, given to a worker process of Env.run_multi
+    :param env: the environment
+    """
+    global _worker_env
+    _worker_env = env
+
+
+def _run_worker_task(task: Tuple[bool, np.random.SeedSequence]) -> Tuple[List[List[list]], dict]:
+    """
+    Run one game in a worker process of Env.run_multi
+    :param task: (is_training, seed) tuple, the seed being used for the environment and the agents
+    :return: the (trajectories, payoffs) tuple of Env.run
+    """
+    is_training, seed = task
+    env_seed, agents_seed = seed.spawn(2)
+    # Agents have their own generator, or draw from the global ones of the worker
+    for agent, agent_seed in zip(_worker_env.agents, agents_seed.spawn(len(_worker_env.agents))):
+        if hasattr(agent, 'np_random'):
+            agent.np_random = np.random.default_rng(agent_seed)
+    np.random.seed(agents_seed.generate_state(4))
+    random.seed(int(agents_seed.generate_state(1)[0]))
+    return _worker_env.run(is_training=is_training, seed=env_seed)
@@ -18,12 +18,13 @@ class EnvSpec(object):
         mod_name, class_name = entry_point.split(':')
         self._entry_point = getattr(importlib.import_module(mod_name), class_name)
 
-    def make(self) -> Env:
+    def make(self, allow_step_back: bool = False) -> Env:
         """
         Instantiates an instance of the environment
+        :param allow_step_back: (boolean): True if the environment should allow step_back
         :return: (Env): an instance of the environemnt
         """
-        env = self._entry_point()
+        env = self._entry_point(allow_step_back=allow_step_back)
         return env
 
 
@@ -49,15 +50,16 @@ class EnvRegistry(object):
             raise ValueError('Cannot re-register env_id: {}'.format(env_id))
         self.env_specs[env_id] = EnvSpec(env_id, entry_point)
 
-    def make(self, env_id: str) -> Env:
+    def make(self, env_id: str, allow_step_back: bool = False) -> Env:
         """
         Create an environment instance
         :param env_id: (string): the name of the environment
+        :param allow_step_back: (boolean): True if the environment should allow step_back
         :return: Env instance
         """
         if env_id not in self.env_specs:
             raise ValueError('Cannot find env_id: {}'.format(env_id))
-        return self.env_specs[env_id].make()
+        return self.env_specs[env_id].make(allow_step_back)
 
 
 # Have a global registry
@@ -74,10 +76,11 @@ def register(env_id: str, entry_point: str) -> None:
     return registry.register(env_id, entry_point)
 
 
-def make(env_id: str) -> Env:
+def make(env_id: str, allow_step_back: bool = False) -> Env:
     """
     Create an environment instance
     :param env_id: (string): the name of the environment
+    :param allow_step_back: (boolean): True if the environment should allow step_back
     :return: Env instance
     """
-    return registry.make(env_id)
+    return registry.make(env_id, allow_step_back)
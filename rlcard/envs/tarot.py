@@ -4,19 +4,17 @@ import numpy as np
 
 from rlcard import models
 from rlcard.envs.env import Env
-from rlcard.games.tarot.alpha_and_omega.card import TarotCard
-from rlcard.games.tarot.bid.bid import TarotBid
+from rlcard.games.tarot.alpha_and_omega.card import CARDS, TarotCard
+from rlcard.games.tarot.bid.bid import BIDS, TarotBid
 from rlcard.games.tarot.global_game import GlobalGame as Game
-from rlcard.games.tarot.utils import ACTION_SPACE, ACTION_LIST, BID_SPACE, BID_LIST, encode_info
-from rlcard.games.tarot.utils import encode_hand, encode_target, encode_bid, get_TarotCard_from_str, \
-    get_TarotBid_from_str
+from rlcard.games.tarot.utils import encode_hand, encode_mask, encode_target, encode_bid, encode_info, mask2ids
 
 
 class TarotEnv(Env):
 
-    def __init__(self):
+    def __init__(self, allow_step_back: bool = False, seed: int = None):
         # defining a self.game instance of GlobalGame
-        super().__init__(Game())
+        super().__init__(Game(allow_step_back), allow_step_back, seed)
         self.state_shape = [7, 5, 22]
 
     def print_state(self, player_id: int) -> None:
@@ -41,7 +39,7 @@ class TarotEnv(Env):
             print('')
             print('========== Actions You Can Choose ============')
             for i, bid in enumerate(state['legal_actions']):
-                print(str(BID_SPACE[bid.get_str()]) + ': ', end='')
+                print(str(bid.id) + ': ', end='')
                 print(bid.get_str() + ', ', end='')
                 if i < len(state['legal_actions']) - 1:
                     print(' ', end='')
@@ -61,7 +59,7 @@ class TarotEnv(Env):
                 print('')
                 print('============ Cards You Can Choose ============')
                 for i, action in enumerate(state['legal_actions']):
-                    print(str(ACTION_SPACE[action.get_str()]) + ': ', end='')
+                    print(str(action.id) + ': ', end='')
                     TarotCard.print_cards(action.get_str())
                     if i < len(state['legal_actions']) - 1:
                         print(', ', end='')
@@ -88,7 +86,7 @@ class TarotEnv(Env):
             print('')
             print('========== Actions You Can Choose ============')
             for i, action in enumerate(state['legal_actions']):
-                print(str(ACTION_SPACE[action.get_str()]) + ': ', end='')
+                print(str(action.id) + ': ', end='')
                 TarotCard.print_cards(action.get_str())
                 if i < len(state['legal_actions']) - 1:
                     print(', ', end='')
@@ -145,31 +143,38 @@ class TarotEnv(Env):
         obs = np.zeros((7, 5, 22), dtype=int)
         legal_action_id = self.get_legal_actions()
         extracted_state = {'legal_actions': legal_action_id}
+        extracted_state['obs'] = self.encode_obs(state, obs)
+        return extracted_state
+
+    def encode_obs(self, state: dict, obs: np.ndarray) -> np.ndarray:
+        """
+        Encode the state of the current game part into an observation
+        :param state: a dictionary with given information regarding the current game part
+        :param obs: (7, 5, 22) ndarray filled with zeros, in which the observation is written
+        :return: obs
+        """
         if self.game.current_game_part == 'BID':
             obs[0][0][0] = 0
             encode_hand(obs, state['hand'], index_to_encode=1)
             encode_bid(obs, state['current_personal_bid'], index_to_encode='2-0')
             encode_bid(obs, state['other_bids'], index_to_encode='2-1')
-            extracted_state['obs'] = obs
         elif self.game.current_game_part == 'DOG':
             obs[0][0][0] = 1
             encode_hand(obs, state['all_cards'], index_to_encode=1)
             encode_bid(obs, state['taking_bid_order'], index_to_encode='2-0')
             encode_hand(obs, state['new_dog'], index_to_encode=3)
             encode_hand(obs, state['others_hand'], index_to_encode=4)
-            extracted_state['obs'] = obs
         elif self.game.current_game_part == 'MAIN':
             obs[0][0][0] = 2
-            encode_hand(obs, state['hand'], index_to_encode=1)
+            encode_mask(obs, state['hand_mask'], index_to_encode=1)
             encode_target(obs, state['target'], index_to_encode=2)
-            encode_hand(obs, state['pot_cards'], index_to_encode=3)
-            encode_hand(obs, state['played_cards'], index_to_encode=4)
-            encode_hand(obs, state['others_hand'], index_to_encode=5)
+            encode_mask(obs, state['pot_mask'], index_to_encode=3)
+            encode_mask(obs, state['played_mask'], index_to_encode=4)
+            encode_mask(obs, state['others_mask'], index_to_encode=5)
             encode_info(obs, state['cuts_color'], state['has_trumps'], state['max_trump'], index_to_encode=6)
-            extracted_state['obs'] = obs
         else:
             raise ValueError
-        return extracted_state
+        return obs
 
     def get_payoffs(self) -> dict:
         """
@@ -185,36 +190,32 @@ class TarotEnv(Env):
         :return: TarotCard OR TarotBid - chosen action id or a random action in the avaiable ones
         :return:
         """
-        legal_ids = self.get_legal_actions()
+        action_id = self.decode_action_id(action_id)
         if self.game.current_game_part == 'BID':
-            if action_id in legal_ids:
-                return get_TarotBid_from_str(BID_LIST[action_id])
-            else:
-                return get_TarotBid_from_str(BID_LIST[np.random.choice(legal_ids)])
-        elif self.game.current_game_part in ['DOG', 'MAIN']:
-            if action_id in legal_ids:
-                return get_TarotCard_from_str(ACTION_LIST[action_id])
-            else:
-                return get_TarotCard_from_str(ACTION_LIST[np.random.choice(legal_ids)])
+            return BIDS[action_id]
         else:
+            return CARDS[action_id]
+
+    def decode_action_id(self, action_id: int) -> int:
+        """
+        Check the selected action id against the legal actions of the current game part
+        :param action_id: chosen ID from the model
+        :return: int - chosen action id if legal, a random id in the avaiable ones otherwise
+        """
+        if self.game.current_game_part not in ['BID', 'DOG', 'MAIN']:
             raise ValueError
+        legal_mask = self.game.get_legal_actions_mask()
+        action_id = int(action_id)
+        if 0 <= action_id and (legal_mask >> action_id) & 1:
+            return action_id
+        else:
+            return int(self.np_random.choice(mask2ids(legal_mask)))
 
     def get_legal_actions(self) -> List[int]:
         """
         transform legal actions from game to the action_space legal actions
         :return: legal_ids, a list of int with all legal_ids for action for agents
         """
-        legal_actions = self.game.get_legal_actions()
-        if self.game.current_game_part == 'BID':
-            legal_ids = [BID_SPACE[bid.get_str()] for bid in legal_actions]
-            # TODO REMOVE IF UNRELEVANT - Adding a bias in the bid selection
-            number_of_legal_actions = len(legal_ids)
-            biased_legal_ids = []
-            for index, bid_id in enumerate(legal_ids):
-                biased_legal_ids = biased_legal_ids + [bid_id] * 2 ** (number_of_legal_actions - index - 1)
-            return legal_ids
-        elif self.game.current_game_part in ['DOG', 'MAIN']:
-            legal_ids = [ACTION_SPACE[action.get_str()] for action in legal_actions]
-            return legal_ids
-        else:
+        if self.game.current_game_part not in ['BID', 'DOG', 'MAIN']:
             raise ValueError
+        return mask2ids(self.game.get_legal_actions_mask())
@@ -0,0 +1,155 @@
+from typing import Iterator, List, Tuple, Union
+
+import numpy as np
+
+from rlcard.envs.tarot import TarotEnv
+from rlcard.games.tarot.utils import mask2array
+from rlcard.utils.utils import reorganize
+
+
+class VecTarotEnv(object):
+    """
+    Several TarotEnv stepped in lockstep, so that the agents can choose the actions of all the games with one batched
+    prediction. Observations and legal actions are stacked, and a finished game is automatically replaced by a new one.
+    The returned arrays are reused: they are overwritten by the next step.
+    """
+
+    def __init__(self, num_envs: int, seed: Union[int, np.random.SeedSequence] = None):
+        """
+        Initialize
+        :param num_envs: number of games played together
+        :param seed: seed of the environments, each one getting its own stream spawned from it (see Env.seed)
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.num_envs = num_envs
+        self.envs = [TarotEnv(seed=env_seed) for env_seed in seed.spawn(num_envs)]
+        self.state_shape = self.envs[0].state_shape
+        self.player_num = self.envs[0].player_num
+        self.action_num = self.envs[0].action_num
+
+        # A counter for the timesteps, over all the games
+        self.timestep = 0
+
+        # Stacked states of the games, overwritten at each step
+        self.obs = np.zeros([num_envs] + self.state_shape, dtype=int)
+        self.legal_masks = np.zeros((num_envs, self.action_num), dtype=bool)
+        self.player_ids = np.zeros(num_envs, dtype=int)
+        # Final states of all the players of the games that ended at the last step, None for the other environments
+        self.final_states = [None] * num_envs
+
+    def seed(self, seed: Union[int, np.random.SeedSequence] = None) -> None:
+        """
+        Set new random streams for all the environments
+        :param seed: int or SeedSequence, fresh entropy if None
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        for env, env_seed in zip(self.envs, seed.spawn(self.num_envs)):
+            env.seed(env_seed)
+
+    def reset(self) -> (np.ndarray, np.ndarray, np.ndarray):
+        """
+        Start a new game in every environment
+        :return: (tuple): Tuple containing:
+
+                (numpy.array): (N, 7, 5, 22) observations of the players to play
+                (numpy.array): (N, 78) boolean masks of their legal actions
+                (numpy.array): (N,) ids of the players to play
+        """
+        for index, env in enumerate(self.envs):
+            state, player_id = env.game.init_game()
+            self._set_state(index, state, player_id)
+        return self.obs, self.legal_masks, self.player_ids
+
+    def step(self, actions: Union[List[int], np.ndarray]) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray,
+                                                              np.ndarray):
+        """
+        Play one action in every game, starting a new game in the environments where the game is over
+        :param actions: (N,) action ids chosen by the current players, an illegal one being replaced by a random
+            legal action (see TarotEnv.decode_action_id)
+        :return: (tuple): Tuple containing:
+
+                (numpy.array): (N, 7, 5, 22) observations of the next players
+                (numpy.array): (N, 78) boolean masks of their legal actions
+                (numpy.array): (N,) ids of the next players
+                (numpy.array): (N,) booleans, True where the game just ended and a new one was started (the final
+                               states of its players being kept in final_states)
+                (numpy.array): (N, player_num) payoffs of the games that just ended, 0 for the others
+        """
+        dones = np.zeros(self.num_envs, dtype=bool)
+        payoffs = np.zeros((self.num_envs, self.player_num))
+        self.timestep += self.num_envs
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            state, player_id = env.game.step(env.decode_action_id(action))
+            self.final_states[index] = None
+            if env.game.is_over():
+                dones[index] = True
+                self.final_states[index] = [env.get_state(final_player_id)
+                                            for final_player_id in range(self.player_num)]
+                for payoff_player_id, payoff in env.get_payoffs().items():
+                    payoffs[index][payoff_player_id] = payoff
+                state, player_id = env.game.init_game()
+            self._set_state(index, state, player_id)
+        return self.obs, self.legal_masks, self.player_ids, dones, payoffs
+
+    def run(self, agent, num_games: int, is_training: bool = False) -> Iterator[Tuple[List[List[list]], dict]]:
+        """
+        Play complete games with one agent in all the seats, the decisions of all the environments being taken with
+        one batched prediction per step (see DQNAgent.step_batch)
+        :param agent: agent with step_batch and eval_step_batch methods, taking the stacked observations and legal
+            action masks
+        :param num_games: number of games to be played, the environments being reset first
+        :param is_training: True if for training purpose
+        :return: iterator over the (trajectories, payoffs) of the games, in the format of Env.run, in the order in
+            which the games end
+        """
+        obs, legal_masks, player_ids = self.reset()
+        trajectories = [[[] for _ in range(self.player_num)] for _ in range(self.num_envs)]
+        # Environments whose current game is one of the num_games games, the other ones only being stepped along
+        active = np.arange(self.num_envs) < num_games
+        num_started = int(active.sum())
+        for index in np.flatnonzero(active):
+            trajectories[index][player_ids[index]].append(self._get_state(index))
+
+        while active.any():
+            if is_training:
+                actions = agent.step_batch(obs, legal_masks)
+            else:
+                actions = agent.eval_step_batch(obs, legal_masks)
+            playing_ids = player_ids.copy()
+            obs, legal_masks, player_ids, dones, payoffs = self.step(actions)
+            for index in np.flatnonzero(active):
+                trajectories[index][playing_ids[index]].append(actions[index])
+                if dones[index]:
+                    for player_id in range(self.player_num):
+                        trajectories[index][player_id].append(self.final_states[index][player_id])
+                    game_payoffs = {player_id: payoffs[index][player_id] for player_id in range(self.player_num)}
+                    yield reorganize(trajectories[index], game_payoffs), game_payoffs
+                    trajectories[index] = [[] for _ in range(self.player_num)]
+                    if num_started == num_games:
+                        active[index] = False
+                        continue
+                    num_started += 1
+                trajectories[index][player_ids[index]].append(self._get_state(index))
+
+    def _get_state(self, index: int) -> dict:
+        """
+        Copy the state of the player to play in one environment, in the format of Env.get_state
+        :param index: index of the environment
+        :return: dictionary with the observation and the legal action ids
+        """
+        return {'obs': self.obs[index].copy(), 'legal_actions': np.flatnonzero(self.legal_masks[index]).tolist()}
+
+    def _set_state(self, index: int, state: dict, player_id: int) -> None:
+        """
+        Write the state of one environment in the stacked arrays
+        :param index: index of the environment
+        :param state: state of the game for the player to play
+        :param player_id: id of the player to play
+        """
+        env = self.envs[index]
+        self.obs[index] = 0
+        env.encode_obs(state, self.obs[index])
+        self.legal_masks[index] = mask2array(env.game.get_legal_actions_mask())
+        self.player_ids[index] = player_id
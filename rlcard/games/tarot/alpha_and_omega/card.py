@@ -1,4 +1,6 @@
 class TarotCard(object):
+    __slots__ = ('is_trump', 'color', 'color_value', 'trump_value', 'str', 'id')
+
     info = {'is_trump': [True, False],
             'color': ['SPADE', 'CLOVER', 'HEART', 'DIAMOND'],
             'color_value': range(1, 15),
@@ -18,6 +20,11 @@ class TarotCard(object):
         self.color_value = color_value
         self.trump_value = trump_value
         self.str = self.get_str()
+        # Card id, i.e. index in the action space: colors first (14 cards each), then trumps from 0 to 21
+        if self.is_trump:
+            self.id = 4 * 14 + trump_value
+        else:
+            self.id = 14 * TarotCard.info['color'].index(color) + color_value - 1
 
     def get_str(self) -> str:
         """
@@ -72,3 +79,9 @@ class TarotCard(object):
 
             if i < len(cards) - 1:
                 print(', ', end='')
+
+
+# Immutable table of the 78 cards of the game, indexed by card id. Every card handled by the engine is one of those
+CARDS = tuple([TarotCard(False, color=a_color, color_value=a_value)
+               for a_color in TarotCard.info['color'] for a_value in TarotCard.info['color_value']] +
+              [TarotCard(True, trump_value=a_value) for a_value in TarotCard.info['trump_value']])
@@ -1,32 +1,56 @@
-import random
+from typing import List
 
-from rlcard.games.tarot.utils import init_deck
-from rlcard.games.tarot.alpha_and_omega.player import TarotPlayer
+import numpy as np
+
+from rlcard.games.tarot.utils import NUM_CARDS
 
 
 class TarotDealer(object):
-    """ Initialize a tarot dealer class
+    """ Initialize a tarot dealer class. The cards are dealt as bitmasks (deal_masks), or as permutations of the card
+        ids for vectorized games (deal_permutations), without building any deck of TarotCard objects
     """
 
-    def __init__(self):
+    def __init__(self, np_random: np.random.Generator = None):
         """
         Initialize a TarotDealer object
+        :param np_random: random generator used to deal the cards (a new unseeded one if None)
         """
-        self.deck = init_deck()
-        self.shuffle()
+        self.np_random = np_random if np_random is not None else np.random.default_rng()
 
-    def shuffle(self) -> None:
+    def deal_permutations(self, num_games: int) -> np.ndarray:
         """
-        Shuffle the deck
+        Draw the deals of several games at once
+        :param num_games: number of deals
+        :return: (num_games, 78) int array, each row being a random permutation of the card ids
         """
-        random.shuffle(self.deck)
+        return self.np_random.permuted(np.broadcast_to(np.arange(NUM_CARDS), (num_games, NUM_CARDS)), axis=1)
 
-    def deal_cards(self, player: TarotPlayer, num: int) -> None:
+    def deal_masks(self, num_hands: int, num_cards_per_hand: int) -> List[int]:
         """
-        Deal some cards from deck to one player
-        :param player: The player whom to deal cards
-        :param num: Number of card to be given
+        Deal a whole game from one random permutation of the card ids, without building any deck
+        :param num_hands: number of players
+        :param num_cards_per_hand: number of cards given to each player, the remaining cards going to the dog
+        :return: bitmasks of the hands of the players, followed by the one of the dog
         """
-        player.hand = []
-        for _ in range(num):
-            player.hand.append(self.deck.pop())
+        hands = permutations2hands(self.np_random.permutation(NUM_CARDS), num_hands, num_cards_per_hand)
+        packed_hands = np.packbits(hands, axis=-1, bitorder='little')
+        return [int.from_bytes(packed_hand.tobytes(), 'little') for packed_hand in packed_hands]
+
+
+def permutations2hands(permutations: np.ndarray, num_hands: int, num_cards_per_hand: int) -> np.ndarray:
+    """
+    Split permutations of the card ids into hands: the first cards go to the first player and so on, the remaining
+    cards going to the dog
+    :param permutations: (78,) or (N, 78) array of permutations of the card ids
+    :param num_hands: number of players
+    :param num_cards_per_hand: number of cards given to each player
+    :return: (num_hands + 1, 78) or (N, num_hands + 1, 78) uint8 array, with 1 for each card in a hand (the dog last)
+    """
+    owners = np.repeat(np.arange(num_hands + 1), [num_cards_per_hand] * num_hands +
+                       [NUM_CARDS - num_hands * num_cards_per_hand])
+    hands = np.zeros(permutations.shape[:-1] + (num_hands + 1, NUM_CARDS), dtype=np.uint8)
+    if permutations.ndim == 1:
+        hands[owners, permutations] = 1
+    else:
+        hands[np.arange(len(permutations))[:, None], owners, permutations] = 1
+    return hands
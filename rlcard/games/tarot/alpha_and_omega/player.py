@@ -1,3 +1,9 @@
+from typing import List
+
+from rlcard.games.tarot.alpha_and_omega.card import TarotCard
+from rlcard.games.tarot.utils import cards2mask, mask2cards
+
+
 class TarotPlayer(object):
 
     def __init__(self, player_id: int):
@@ -6,12 +12,52 @@ class TarotPlayer(object):
         :param player_id: int
         """
         self.player_id = player_id
-        self.hand = []
+        # Bitmask of the cards in hand (see rlcard.games.tarot.utils)
+        self.hand_mask = 0
         self.points = 0
         self.bouts = 0
         self.bid = None
         self.taking = False
 
+    @property
+    def hand(self) -> List[TarotCard]:
+        """
+        :return: List of the TarotCards in hand, built from hand_mask
+        """
+        return mask2cards(self.hand_mask)
+
+    @hand.setter
+    def hand(self, cards: List[TarotCard]) -> None:
+        """
+        :param cards: List of TarotCards to be put in hand
+        """
+        self.hand_mask = cards2mask(cards)
+
+    def snapshot(self) -> dict:
+        """
+        Copy the state of the player
+        :return: (dict) attributes of the player
+        """
+        return self.__dict__.copy()
+
+    def restore(self, snapshot: dict) -> None:
+        """
+        Set the player back to the state of a snapshot
+        :param snapshot: (dict) from TarotPlayer.snapshot
+        """
+        self.__dict__.update(snapshot)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> 'TarotPlayer':
+        """
+        Build a player from a snapshot
+        :param snapshot: (dict) from TarotPlayer.snapshot
+        :return: the new player
+        """
+        player = cls.__new__(cls)
+        player.__dict__.update(snapshot)
+        return player
+
     def get_player_id(self) -> int:
         """ Return the id of the player
         """
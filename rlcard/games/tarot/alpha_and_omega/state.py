@@ -0,0 +1,112 @@
+from typing import Any, Callable, Dict
+
+# Default value of LazyState.pop telling that no default was given
+_NO_DEFAULT = object()
+
+
+class LazyState(dict):
+    """
+    State of a player, behaving like the usual state dictionary, but whose costly fields are only computed the first
+    time they are accessed. The factories must only rely on values captured when the state is built, so that the state
+    still describes the step at which it was created when the game has moved on.
+    """
+    __slots__ = ('_factories',)
+
+    def __init__(self, values: Dict[str, Any], factories: Dict[str, Callable[[], Any]]):
+        """
+        Initialize the state
+        :param values: fields already known
+        :param factories: for each lazy field, a function without argument computing its value
+        """
+        super().__init__(values)
+        self._factories = factories
+
+    def __missing__(self, key: str) -> Any:
+        factory = self._factories.pop(key)
+        value = factory()
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._factories.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if self._factories.pop(key, None) is None:
+            dict.__delitem__(self, key)
+
+    def __contains__(self, key: Any) -> bool:
+        return dict.__contains__(self, key) or key in self._factories
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key: str, default: Any = _NO_DEFAULT) -> Any:
+        if key in self:
+            value = self[key]
+            dict.__delitem__(self, key)
+            return value
+        if default is _NO_DEFAULT:
+            raise KeyError(key)
+        return default
+
+    def popitem(self) -> tuple:
+        return dict.popitem(self.materialize())
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self) -> None:
+        self._factories.clear()
+        dict.clear(self)
+
+    def materialize(self) -> 'LazyState':
+        """
+        Compute all the remaining lazy fields
+        :return: the state itself
+        """
+        for key in list(self._factories):
+            self[key]
+        return self
+
+    def __iter__(self):
+        return dict.__iter__(self.materialize())
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + len(self._factories)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyState):
+            other.materialize()
+        return dict.__eq__(self.materialize(), other)
+
+    def __ne__(self, other: Any) -> bool:
+        return not self == other
+
+    def __repr__(self) -> str:
+        return dict.__repr__(self.materialize())
+
+    def __reduce__(self):
+        return LazyState, (dict(self.materialize()), {})
+
+    def keys(self):
+        return dict.keys(self.materialize())
+
+    def values(self):
+        return dict.values(self.materialize())
+
+    def items(self):
+        return dict.items(self.materialize())
+
+    def copy(self) -> dict:
+        return dict(self.materialize())
+
+    __hash__ = None
@@ -1,4 +1,6 @@
 class TarotBid(object):
+    __slots__ = ('bid', 'str', 'id')
+
     order = {'PASSE': 0,
              'PETITE': 1,
              'POUSSE': 2,
@@ -16,6 +18,8 @@ class TarotBid(object):
     def __init__(self, bid: str):
         self.bid = bid
         self.str = bid
+        # Bid id, equal to the bid order
+        self.id = TarotBid.order[bid]
 
     def get_str(self) -> str:
         """
@@ -27,10 +31,14 @@ class TarotBid(object):
         """
         :return: bid order (from 0 to 5) - int
         """
-        return TarotBid.order[self.bid]
+        return self.id
 
     def get_bid_value(self) -> int:
         """
         :return: bid value (from 0 to 16)
         """
         return TarotBid.value[self.bid]
+
+
+# Immutable table of the 6 bids of the game, indexed by bid id
+BIDS = tuple(TarotBid(a_bid) for a_bid in sorted(TarotBid.order, key=TarotBid.order.get))
@@ -1,18 +1,23 @@
-from typing import List
+from typing import List, Union
+
+import numpy as np
 
 from rlcard.games.tarot.alpha_and_omega.dealer import TarotDealer as Dealer
 from rlcard.games.tarot.alpha_and_omega.player import TarotPlayer
 from rlcard.games.tarot.bid.bid import TarotBid
 from rlcard.games.tarot.bid.bid_round import BidRound
 from rlcard.games.tarot.dog.dog import TarotDog
-from rlcard.games.tarot.utils import get_nb_bouts
+from rlcard.games.tarot.utils import BOUTS_MASK, count_cards
 
 
 class BidGame(object):
 
     def __init__(self, players: List[TarotPlayer], num_players: int, starting_player: int, num_cards_per_player: int,
                  num_cards_dog: int,
-                 dog: TarotDog):
+                 dog: TarotDog, allow_step_back: bool = False, np_random: np.random.Generator = None):
+        self.allow_step_back = allow_step_back
+        # Random generator of the dealer
+        self.np_random = np_random
         self.num_players = num_players
         self.num_cards_per_player = num_cards_per_player
         self.num_cards_dog = num_cards_dog
@@ -31,6 +36,38 @@ class BidGame(object):
         self.taking_player_id = None
         self.taking_bid_order = None
 
+    def snapshot(self) -> dict:
+        """
+        Copy the state of the bid game, players and dog excepted as they are shared with the other game parts
+        :return: (dict) attributes of the bid game
+        """
+        snapshot = self.__dict__.copy()
+        snapshot['players'] = None
+        snapshot['dog'] = None
+        # Cards are already dealt, the dealer and its random generator are not needed anymore
+        snapshot['np_random'] = None
+        snapshot['dealer'] = None
+        if self.bid_round is not None:
+            snapshot['bid_round'] = self.bid_round.snapshot()
+        return snapshot
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, players: List[TarotPlayer], dog: TarotDog) -> 'BidGame':
+        """
+        Build a bid game from a snapshot
+        :param snapshot: (dict) from BidGame.snapshot
+        :param players: players of the game
+        :param dog: dog of the game
+        :return: the new bid game
+        """
+        bid_game = cls.__new__(cls)
+        bid_game.__dict__.update(snapshot)
+        bid_game.players = players
+        bid_game.dog = dog
+        if snapshot['bid_round'] is not None:
+            bid_game.bid_round = BidRound.from_snapshot(snapshot['bid_round'])
+        return bid_game
+
     def init_game(self) -> (dict, int):
         """
         Initialize players and state for bid game
@@ -41,25 +78,22 @@ class BidGame(object):
                 (int): Current bidder's id
         """
         # Initialize bid Round
-        self.bid_round = BidRound(self.num_players, self.starting_player)
-
-        # Deal 18 cards to each player to prepare for the game
-        self.dealer = Dealer()
-        for player in self.players:
-            player.hand = []
-            self.dealer.deal_cards(player, self.num_cards_per_player)
+        self.bid_round = BidRound(self.num_players, self.starting_player, self.allow_step_back)
 
-        # Deal 6 cards to the dog
-        self.dealer.deal_cards(self.dog, self.num_cards_dog)
+        # Deal 18 cards to each player and 6 cards to the dog to prepare for the game
+        self.dealer = Dealer(self.np_random)
+        hand_masks = self.dealer.deal_masks(self.num_players, self.num_cards_per_player)
+        for player, hand_mask in zip(self.players, hand_masks):
+            player.hand_mask = hand_mask
+        self.dog.hand_mask = hand_masks[-1]
 
         # Sanity check
-        if len(self.dealer.deck) != 0:
-            raise ValueError('Dealer should have 0 card in deck at that stage')
-        number_bouts = 0
+        if count_cards(self.dog.hand_mask) != self.num_cards_dog:
+            raise ValueError('Dog should have {} cards after the deal'.format(self.num_cards_dog))
+        dealt_mask = self.dog.hand_mask
         for player in self.players:
-            number_bouts += get_nb_bouts(player.hand)
-        number_bouts += get_nb_bouts(self.dog.hand)
-        if number_bouts != 3:
+            dealt_mask |= player.hand_mask
+        if count_cards(dealt_mask & BOUTS_MASK) != 3:
             raise ValueError("Given number of bouts should be 3")
 
         player_id = self.bid_round.current_player_id
@@ -67,10 +101,10 @@ class BidGame(object):
 
         return state, player_id
 
-    def step(self, played_bid: TarotBid) -> (dict, int):
+    def step(self, played_bid: Union[TarotBid, int]) -> (dict, int):
         """
         Get the next state
-        :param played_bid: a TarotBid object chosen to be saif by the current player
+        :param played_bid: a TarotBid object (or its id) chosen to be said by the current player
         :return:
         (tuple): Tuple containing:
 
@@ -90,6 +124,19 @@ class BidGame(object):
             self.bid_round.current_player_id = player_id
             return state, player_id
 
+    def step_back(self) -> bool:
+        """
+        Cancel the last played bid
+        :return: (bool) True if a bid has been cancelled
+        """
+        if not self.bid_round.step_back(self.players):
+            return False
+        self.bid_over = self.bid_round.is_over
+        if not self.bid_over:
+            self.taking_player_id = None
+            self.taking_bid_order = None
+        return True
+
     def get_state(self, player_id: int) -> dict:
         """
         Return player's state
@@ -106,6 +153,13 @@ class BidGame(object):
         """
         return self.bid_round.get_legal_actions(self.players, self.get_player_id())
 
+    def get_legal_actions_mask(self) -> int:
+        """
+        Return the legal actions for current player
+        :return: (int): bitmask of the legal bid ids
+        """
+        return self.bid_round.get_legal_actions_mask(self.players, self.get_player_id())
+
     def get_player_num(self) -> int:
         """
         Return the number of players in Tarot
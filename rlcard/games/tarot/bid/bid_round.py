@@ -1,17 +1,44 @@
-from typing import List
+from typing import List, Union
 
 from rlcard.games.tarot.alpha_and_omega.player import TarotPlayer
-from rlcard.games.tarot.bid.bid import TarotBid
-from rlcard.games.tarot.utils import cards2list, get_nb_bouts, get_hand_value
+from rlcard.games.tarot.alpha_and_omega.state import LazyState
+from rlcard.games.tarot.bid.bid import BIDS, TarotBid
+from rlcard.games.tarot.utils import get_nb_bouts, get_hand_value, mask2list
+
+PASSE_ID = TarotBid.order['PASSE']
+
+
+def get_legal_bids(hand_mask: int, max_bid_order: int) -> List[TarotBid]:
+    # TODO REMOVE CONSTRAINTS THAT FORCE ONLY PASSE OU PETITE
+    # TODO REMOVE CONSTRAINTS THAT FORCES TO TAKE ABOVE A CERTAIN HAND
+    """
+    Get legal bids for a given hand
+    :param hand_mask: bitmask of the cards in hand
+    :param max_bid_order: the maximal bid done up to now
+    :return: list of legals bids (TarotBid objects)
+    """
+    # legal_bids = BIDS[(max_bid_order + 1):] + [BIDS[0]]
+    # legal_bids = BIDS[(max_bid_order + 1):2] + [BIDS[0]]
+    # Force to take petite if hand value > XX and nb_bout > XX
+    points_in_hand = get_hand_value(hand_mask)
+    bouts_in_hand = get_nb_bouts(hand_mask)
+    if (points_in_hand >= 35 and bouts_in_hand >= 2) or (points_in_hand >= 30 and bouts_in_hand == 3):
+        legal_bids = list(BIDS[(max_bid_order + 1):2])  # + [BIDS[0]]
+    else:
+        # legal_bids = BIDS[(max_bid_order + 1):2] + [BIDS[0]]
+        legal_bids = [BIDS[0]]
+
+    return legal_bids
 
 
 class BidRound(object):
 
-    def __init__(self, num_players: int, starting_player: int):
+    def __init__(self, num_players: int, starting_player: int, allow_step_back: bool = False):
         """
         Initialize the bid round class
         :param num_players: (int) the number of players in game
         :param starting_player: (int) the starting player
+        :param allow_step_back: (bool) if True, keep an undo log of the played bids
         """
         self.current_player_id = starting_player
         self.num_players = num_players
@@ -20,29 +47,73 @@ class BidRound(object):
         self.is_over = False
         self.is_dead = False
         self.taking_player_id = None
-        self.all_bids = [TarotBid('PASSE'),
-                         TarotBid('PETITE'),
-                         TarotBid('POUSSE'),
-                         TarotBid('GARDE'),
-                         TarotBid('GARDE_SANS'),
-                         TarotBid('GARDE_CONTRE')]
+        self.all_bids = BIDS
         self.max_bid = self.all_bids[self.max_bid_order]
+        # Undo log: for each played bid, the snapshots of the round and the players before it
+        self.undo_log = [] if allow_step_back else None
+
+    def snapshot(self) -> dict:
+        """
+        Copy the state of the round
+        :return: (dict) attributes of the round
+        """
+        return self.__dict__.copy()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> 'BidRound':
+        """
+        Build a round from a snapshot
+        :param snapshot: (dict) from BidRound.snapshot
+        :return: the new round
+        """
+        bid_round = cls.__new__(cls)
+        bid_round.__dict__.update(snapshot)
+        if snapshot['undo_log'] is not None:
+            bid_round.undo_log = []
+        return bid_round
+
+    def restore(self, snapshot: dict) -> None:
+        """
+        Set the round back to the state of a snapshot, keeping the current undo log
+        :param snapshot: (dict) from BidRound.snapshot
+        """
+        undo_log = self.undo_log
+        self.__dict__.update(snapshot)
+        self.undo_log = undo_log
+
+    def step_back(self, players: List[TarotPlayer]) -> bool:
+        """
+        Cancel the last played bid
+        :param players: List of TarotPlayer competing
+        :return: (bool) True if a bid has been cancelled
+        """
+        if not self.undo_log:
+            return False
+        snapshot, player_snapshots = self.undo_log.pop()
+        self.restore(snapshot)
+        for player, player_snapshot in zip(players, player_snapshots):
+            player.restore(player_snapshot)
+        return True
 
-    def proceed_round(self, players: List[TarotPlayer], played_bid: TarotBid) -> int:
+    def proceed_round(self, players: List[TarotPlayer], played_bid: Union[TarotBid, int]) -> int:
         """
         proceed bid round with a player bid
         :param players: List of TarotPlayer competing
-        :param played_bid: the TarotBid object chosen by the current_player_id
+        :param played_bid: the TarotBid object (or its id) chosen by the current_player_id
         :return: the next player to speak
         """
+        if not isinstance(played_bid, TarotBid):
+            played_bid = self.all_bids[int(played_bid)]
+        if self.undo_log is not None:
+            self.undo_log.append((self.snapshot(), [player.snapshot() for player in players]))
         player = players[self.current_player_id]
         if player.bid is None:
             player.bid = played_bid
-        if played_bid.get_str() != "PASSE":
+        if played_bid.id != PASSE_ID:
             player.bid = played_bid
             self.taking_player_id = self.current_player_id
             player.taking = True
-        if played_bid.get_str() == "PASSE":
+        else:
             player.bid = played_bid
             player.taking = False
 
@@ -51,7 +122,7 @@ class BidRound(object):
 
         total_surrendered_players = 0
         for player_id in range(self.num_players):
-            if players[player_id].bid is not None and players[player_id].bid.get_str() == "PASSE":
+            if players[player_id].bid is not None and players[player_id].bid.id == PASSE_ID:
                 total_surrendered_players += 1
 
         # Maximal bid encountered
@@ -71,29 +142,26 @@ class BidRound(object):
         if players[potential_next].bid is None:
             return potential_next
         else:
-            while players[potential_next].bid.get_str() == 'PASSE':
+            while players[potential_next].bid.id == PASSE_ID:
                 potential_next = (potential_next + 1) % self.num_players
             return potential_next
 
+    def get_legal_actions_mask(self, players: List[TarotPlayer], player_id: int) -> int:
+        """
+        Get legal bids
+        :return: bitmask of the legal bid ids
+        """
+        legal_mask = 0
+        for bid in self.get_legal_actions(players, player_id):
+            legal_mask |= 1 << bid.id
+        return legal_mask
+
     def get_legal_actions(self, players: List[TarotPlayer], player_id: int) -> List[TarotBid]:
-        # TODO REMOVE CONSTRAINTS THAT FORCE ONLY PASSE OU PETITE
-        # TODO REMOVE CONSTRAINTS THAT FORCES TO TAKE ABOVE A CERTAIN HAND
         """
         Get legal bids
         :return: list of legals bids (TarotBid objects)
         """
-        # legal_bids = self.all_bids[(self.max_bid_order + 1):] + [self.all_bids[0]]
-        # legal_bids = self.all_bids[(self.max_bid_order + 1):2] + [self.all_bids[0]]
-        # Force to take petite if hand value > XX and nb_bout > XX
-        points_in_hand = get_hand_value(players[player_id].hand)
-        bouts_in_hand = get_nb_bouts(players[player_id].hand)
-        if (points_in_hand >= 35 and bouts_in_hand >= 2) or (points_in_hand >= 30 and bouts_in_hand == 3):
-            legal_bids = self.all_bids[(self.max_bid_order + 1):2]  # + [self.all_bids[0]]
-        else:
-            # legal_bids = self.all_bids[(self.max_bid_order + 1):2] + [self.all_bids[0]]
-            legal_bids = [self.all_bids[0]]
-
-        return legal_bids
+        return get_legal_bids(players[player_id].hand_mask, self.max_bid_order)
 
     def get_state(self, players: List[TarotPlayer], player_id) -> dict:
         """
@@ -107,14 +175,18 @@ class BidRound(object):
                 (TarotBid) - current_personal_bid: current bid from the player_id
                 (List[TarotBid]) - legal_actions: all legal bids that can be said by player_id
                 (List[TarotBid]) - other_bids: all the other bids from other players
+                (int) - hand_mask: bitmask of the cards in the player_id hand
+        hand and legal_actions are only computed when first accessed
         """
         player = players[player_id]
-        state = {'hand': cards2list(player.hand), 'max_bid': self.max_bid_order,
-                 'current_personal_bid': player.bid,
-                 'legal_actions': self.get_legal_actions(players, player_id)}
+        hand_mask = player.hand_mask
+        max_bid_order = self.max_bid_order
         other_bids = []
-        for player in players:
-            if player.player_id != player_id and player.bid is not None:
-                other_bids.append(player.bid)
-        state['other_bids'] = other_bids
+        for other_player in players:
+            if other_player.player_id != player_id and other_player.bid is not None:
+                other_bids.append(other_player.bid)
+        state = LazyState({'max_bid': max_bid_order, 'current_personal_bid': player.bid, 'other_bids': other_bids,
+                           'hand_mask': hand_mask},
+                          {'hand': lambda: mask2list(hand_mask),
+                           'legal_actions': lambda: get_legal_bids(hand_mask, max_bid_order)})
         return state
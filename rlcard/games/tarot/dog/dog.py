@@ -17,4 +17,4 @@ class TarotDog(TarotPlayer):
         Compute points in the dog using the function get_pot_value from utils
         :return: float number of points
         """
-        return get_pot_value(self.hand)
+        return get_pot_value(self.hand_mask)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Union
 
 from rlcard.games.tarot.alpha_and_omega.card import TarotCard
 from rlcard.games.tarot.alpha_and_omega.player import TarotPlayer
@@ -9,7 +9,8 @@ from rlcard.games.tarot.dog.dog_round import DogRound
 class DogGame(object):
 
     def __init__(self, players: List[TarotPlayer], taking_player_id: int,
-                 num_cards_per_player: int, num_cards_dog: int, dog: TarotDog, taking_bid_order: int):
+                 num_cards_per_player: int, num_cards_dog: int, dog: TarotDog, taking_bid_order: int,
+                 allow_step_back: bool = False):
         """
         Initialize a DogGame object
         :param players: (List[TarotPlayer]) list of TarotPlayer in the whole game
@@ -18,6 +19,7 @@ class DogGame(object):
         :param num_cards_dog: (int) number of cards in the dog
         :param dog: (TarotDog) dog object initialized in the begining
         :param taking_bid_order: (int) order of the taken bid (from 0 to 5)
+        :param allow_step_back: (bool) if True, the cards put in the dog can be cancelled with step_back
         """
         self.num_cards_per_player = num_cards_per_player
         self.num_cards_dog = num_cards_dog
@@ -26,12 +28,40 @@ class DogGame(object):
         self.taking_player = players[taking_player_id]
         self.current_player_id = taking_player_id
         # Initialize the dog round
-        self.dog_round = DogRound(self.taking_player, taking_player_id, dog, num_cards_dog, taking_bid_order)
+        self.dog_round = DogRound(self.taking_player, taking_player_id, dog, num_cards_dog, taking_bid_order,
+                                  allow_step_back)
         # Taking bid for the taking player
         self.taking_bid_order = taking_bid_order
         # Is over ?
         self.is_over = False
 
+    def snapshot(self) -> dict:
+        """
+        Copy the state of the dog game, players and dog excepted as they are shared with the other game parts
+        :return: (dict) attributes of the dog game
+        """
+        snapshot = self.__dict__.copy()
+        snapshot['players'] = None
+        snapshot['taking_player'] = None
+        snapshot['dog_round'] = self.dog_round.snapshot()
+        return snapshot
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, players: List[TarotPlayer], dog: TarotDog) -> 'DogGame':
+        """
+        Build a dog game from a snapshot
+        :param snapshot: (dict) from DogGame.snapshot
+        :param players: players of the game
+        :param dog: dog of the game
+        :return: the new dog game
+        """
+        dog_game = cls.__new__(cls)
+        dog_game.__dict__.update(snapshot)
+        dog_game.players = players
+        dog_game.taking_player = players[snapshot['dog_round']['taking_player_id']]
+        dog_game.dog_round = DogRound.from_snapshot(snapshot['dog_round'], players, dog)
+        return dog_game
+
     def init_game(self) -> (dict, int):
         """
         Initialize Status for Dog Round
@@ -45,10 +75,10 @@ class DogGame(object):
 
         return state, player_id
 
-    def step(self, played_dog_card: TarotCard) -> (dict, int):
+    def step(self, played_dog_card: Union[TarotCard, int]) -> (dict, int):
         """
         Get the next state
-        :param played_dog_card: (TarotCard) the card chosen to be put in the dog
+        :param played_dog_card: (TarotCard or int) the card (or its id) chosen to be put in the dog
         :return: (tuple): Tuple containing:
 
                 (dict): next player's state
@@ -62,6 +92,16 @@ class DogGame(object):
         state = self.get_state(player_id)
         return state, player_id
 
+    def step_back(self) -> bool:
+        """
+        Cancel the last card put in the dog
+        :return: (bool) True if a card has been cancelled
+        """
+        if not self.dog_round.step_back():
+            return False
+        self.is_over = self.dog_round.is_over
+        return True
+
     def get_state(self, player_id: int) -> dict:
         """
         Return player's state
@@ -78,6 +118,13 @@ class DogGame(object):
         """
         return self.dog_round.get_legal_actions()
 
+    def get_legal_actions_mask(self) -> int:
+        """
+        Return the legal actions for current player
+        :return: (int) - bitmask of the legal card ids to be put in the dog
+        """
+        return self.dog_round.get_legal_actions_mask()
+
     @staticmethod
     def get_action_num() -> int:
         """
@@ -1,15 +1,31 @@
-from typing import List
+from typing import List, Union
 
-from rlcard.games.tarot.alpha_and_omega.card import TarotCard
+from rlcard.games.tarot.alpha_and_omega.card import CARDS, TarotCard
 from rlcard.games.tarot.alpha_and_omega.player import TarotPlayer
+from rlcard.games.tarot.alpha_and_omega.state import LazyState
 from rlcard.games.tarot.dog.dog import TarotDog
-from rlcard.games.tarot.utils import cards2list
+from rlcard.games.tarot.utils import BOUTS_MASK, KINGS_MASK, TRUMP_MASK, cards2list, cards2mask, mask2cards, \
+    mask2list
+
+
+def get_legal_dog_mask(all_cards_mask: int) -> int:
+    """
+    Get the bitmask of all legal cards that can be put in the dog
+    :param all_cards_mask: bitmask of the cards in the hand of the taking player, with the dog
+    :return: bitmask of legal cards
+    """
+    # If without using king / trump, legal_actions > 0
+    legal_mask = all_cards_mask & ~TRUMP_MASK & ~KINGS_MASK
+    if not legal_mask:
+        legal_mask = all_cards_mask & TRUMP_MASK & ~BOUTS_MASK
+
+    return legal_mask
 
 
 class DogRound(object):
 
     def __init__(self, taking_player: TarotPlayer, taking_player_id: int, dog: TarotDog, num_cards_dog: int,
-                 taking_bid_order: int):
+                 taking_bid_order: int, allow_step_back: bool = False):
         """
         Initialize the DogRound class
         :param taking_player: (TarotPlayer) player that won the bid contest
@@ -17,63 +33,123 @@ class DogRound(object):
         :param dog: (TarotDog) dog initialized earlier
         :param num_cards_dog: (int)
         :param taking_bid_order: (in) from 0 to 5 representing the order of the winning bid
+        :param allow_step_back: (bool) if True, keep an undo log of the cards put in the dog
         """
         self.num_cards_dog = num_cards_dog
         self.taking_player = taking_player
         self.taking_player_id = taking_player_id
         self.taking_bid_order = taking_bid_order
+        # Bitmask of the cards in the hand of the taking player, possibly with the dog
         if self.taking_bid_order < 4:
-            self.all_cards = taking_player.hand + dog.hand
+            self.all_cards_mask = taking_player.hand_mask | dog.hand_mask
             self.new_dog = []
         else:
-            self.all_cards = taking_player.hand
+            self.all_cards_mask = taking_player.hand_mask
             self.new_dog = dog.hand
         self.dog = dog
         self.is_over = False
+        # Undo log: for each card put in the dog, the snapshots of the round and of the taking player before it
+        self.undo_log = [] if allow_step_back else None
+
+    def snapshot(self) -> dict:
+        """
+        Copy the state of the round, taking player and dog excepted as they are shared with the other game parts
+        :return: (dict) attributes of the round
+        """
+        snapshot = self.__dict__.copy()
+        snapshot['taking_player'] = None
+        snapshot['dog'] = None
+        snapshot['new_dog'] = self.new_dog[:]
+        return snapshot
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, players: List[TarotPlayer], dog: TarotDog) -> 'DogRound':
+        """
+        Build a round from a snapshot
+        :param snapshot: (dict) from DogRound.snapshot
+        :param players: players of the game
+        :param dog: dog of the game
+        :return: the new round
+        """
+        dog_round = cls.__new__(cls)
+        dog_round.__dict__.update(snapshot)
+        dog_round.taking_player = players[snapshot['taking_player_id']]
+        dog_round.dog = dog
+        dog_round.new_dog = snapshot['new_dog'][:]
+        if snapshot['undo_log'] is not None:
+            dog_round.undo_log = []
+        return dog_round
+
+    def restore(self, snapshot: dict) -> None:
+        """
+        Set the round back to the state of a snapshot, keeping the current undo log
+        :param snapshot: (dict) from DogRound.snapshot
+        """
+        taking_player, dog, undo_log = self.taking_player, self.dog, self.undo_log
+        self.__dict__.update(snapshot)
+        self.taking_player, self.dog, self.undo_log = taking_player, dog, undo_log
+        self.new_dog = snapshot['new_dog'][:]
+
+    def step_back(self) -> bool:
+        """
+        Cancel the last card put in the dog
+        :return: (bool) True if a card has been cancelled
+        """
+        if not self.undo_log:
+            return False
+        snapshot, player_snapshot = self.undo_log.pop()
+        self.restore(snapshot)
+        self.taking_player.restore(player_snapshot)
+        return True
 
-    def proceed_round(self, players: List[TarotPlayer], played_card: TarotCard) -> int:
+    def proceed_round(self, players: List[TarotPlayer], played_card: Union[TarotCard, int]) -> int:
         """
         Call other Classes's functions to keep one round running
-        :param played_card: (TarotCard) object with the chosen card to be played
+        :param played_card: (TarotCard or int) object with the chosen card to be played, or its id
         :param players: list of TarotPlayer object
         :return: (int) id of next player (mainly the same here)
         """
+        if not isinstance(played_card, TarotCard):
+            played_card = CARDS[int(played_card)]
+        if self.undo_log is not None:
+            self.undo_log.append((self.snapshot(), players[self.taking_player_id].snapshot()))
         # remove corresponding card
-        remove_index = None
-        for index, card in enumerate(self.all_cards):
-            if played_card.get_str() == card.get_str():
-                remove_index = index
-                break
-
-        self.new_dog.append(self.all_cards.pop(remove_index))
+        card_bit = 1 << played_card.id
+        if not self.all_cards_mask & card_bit:
+            raise ValueError('Card {} is not in the hand of the taking player'.format(played_card.get_str()))
+        self.all_cards_mask ^= card_bit
+        self.new_dog.append(played_card)
 
         # When dog_cards cards in the dogs
         if len(self.new_dog) == self.num_cards_dog:
-            players[self.taking_player_id].hand = self.all_cards
+            players[self.taking_player_id].hand_mask = self.all_cards_mask
             self.is_over = True
 
         return self.taking_player_id
 
-    def get_legal_actions(self) -> List[TarotCard]:
+    @property
+    def all_cards(self) -> List[TarotCard]:
         """
-        Get all legal cards that can be put in the dog
-        :return: list of legals TarotCard
+        :return: list of the TarotCards in the hand of the taking player, possibly with the dog
+        """
+        return mask2cards(self.all_cards_mask)
+
+    def get_legal_actions_mask(self) -> int:
+        """
+        Get the bitmask of all legal cards that can be put in the dog
+        :return: bitmask of legal cards
         """
         if self.taking_bid_order >= 4:
             # No dog to be done
             raise ValueError
-        legal_actions = []
-        hand = self.all_cards
-        # If without using king / trump, legal_actions > 0
-        for card in hand:
-            if not card.is_trump and card.color_value != 14:
-                legal_actions.append(card)
-        if len(legal_actions) == 0:
-            for card in hand:
-                if card.is_trump and card.trump_value not in [0, 1, 21]:
-                    legal_actions.append(card)
-
-        return legal_actions
+        return get_legal_dog_mask(self.all_cards_mask)
+
+    def get_legal_actions(self) -> List[TarotCard]:
+        """
+        Get all legal cards that can be put in the dog
+        :return: list of legals TarotCard
+        """
+        return mask2cards(self.get_legal_actions_mask())
 
     def get_state(self, players: List[TarotPlayer], player_id: int) -> dict:
         """
@@ -88,21 +164,33 @@ class DogRound(object):
                 (List[str]) - all_cards: List of all known str cards (eather hand if bid is GARDE_SANS ou CONTRE, or also containing the dog cards in the other way round)
                 (List[str]) - new_dog: List of the str cards in the new dog if he is known, None otherwise
                 (List[str]) - others_hand: List of the str cards that are not known
+                (int) - hand_mask, all_cards_mask, new_dog_mask, others_mask: bitmasks of the same card sets
+        legal_actions and the lists of str cards are only computed when first accessed
         """
-        state = {'taking_bid_order': self.taking_bid_order,
-                 'legal_actions': self.get_legal_actions(), 'hand': cards2list(self.taking_player.hand)}
-        # When dog is known
-        others_hand = []
+        hand_mask = self.taking_player.hand_mask
+        all_cards_mask = self.all_cards_mask
+        others_mask = 0
         for player in players:
             if player.player_id != player_id:
-                others_hand.extend(player.hand)
+                others_mask |= player.hand_mask
+        values = {'taking_bid_order': self.taking_bid_order, 'hand_mask': hand_mask, 'others_mask': others_mask}
+        factories = {'hand': lambda: mask2list(hand_mask)}
+        # When dog is known
         if self.taking_bid_order < 4:
-            state['all_cards'] = cards2list(self.all_cards)
-            state['new_dog'] = cards2list(self.new_dog)
+            new_dog = self.new_dog[:]
+            values['all_cards_mask'] = all_cards_mask
+            values['new_dog_mask'] = cards2mask(new_dog)
+            factories['all_cards'] = lambda: mask2list(all_cards_mask)
+            factories['new_dog'] = lambda: cards2list(new_dog)
+            factories['legal_actions'] = lambda: mask2cards(get_legal_dog_mask(all_cards_mask))
         # otherwise
         else:
-            state['all_cards'] = state['hand']
-            state['new_dog'] = None
-            others_hand.extend(self.dog.hand)
-        state['others_hand'] = cards2list(others_hand)
-        return state
+            values['all_cards_mask'] = hand_mask
+            values['new_dog_mask'] = 0
+            values['new_dog'] = None
+            factories['all_cards'] = factories['hand']
+            factories['legal_actions'] = self.get_legal_actions
+            others_mask |= self.dog.hand_mask
+            values['others_mask'] = others_mask
+        factories['others_hand'] = lambda: mask2list(others_mask)
+        return LazyState(values, factories)
@@ -1,6 +1,7 @@
-import random
 from typing import Union, List
 
+import numpy as np
+
 from rlcard.games.tarot.alpha_and_omega.card import TarotCard
 from rlcard.games.tarot.alpha_and_omega.player import TarotPlayer as Player
 from rlcard.games.tarot.bid.bid import TarotBid
@@ -12,15 +13,24 @@ from rlcard.games.tarot.main_game.main_game import MainGame
 
 class GlobalGame(object):
 
-    def __init__(self):
+    def __init__(self, allow_step_back: bool = False, seed: Union[int, np.random.SeedSequence] = None):
         """
         Initialize a global game object
+        :param allow_step_back: (bool) if True, the played actions can be cancelled with step_back
+        :param seed: seed of the random generator of the game (see GlobalGame.seed)
         """
+        self.allow_step_back = allow_step_back
+        # For each played action, the attributes of the game before it (see step_back)
+        self.history = []
         self.current_game_part = 'BID'
         self.num_players = 4
         self.num_cards_per_player = 18
         self.num_cards_dog = 6
-        self.starting_player = random.randint(0, self.num_players - 1)
+        # Random generator, possibly only kept as the state of its bit generator until it is needed (see np_random)
+        self._np_random = None
+        self._np_random_state = None
+        self.starting_player = None
+        self.seed(seed)
         self.payoffs = [0 for _ in range(self.num_players)]
         # Initialize a dealer that can deal cards
         self.dealer = None
@@ -45,14 +55,99 @@ class GlobalGame(object):
         self.main_over = False
         self.is_game_over = False
 
+    def seed(self, seed: Union[int, np.random.SeedSequence] = None) -> None:
+        """
+        Set a new random generator for the game, and draw the starting player with it
+        :param seed: int or SeedSequence used to build the generator (fresh entropy if None)
+        """
+        self.np_random = np.random.default_rng(seed)
+        self.starting_player = int(self.np_random.integers(self.num_players))
+
+    @property
+    def np_random(self) -> np.random.Generator:
+        """
+        :return: the random generator of the game, used to deal the cards
+        """
+        if self._np_random is None:
+            bit_generator = getattr(np.random, self._np_random_state['bit_generator'])()
+            bit_generator.state = self._np_random_state
+            self._np_random = np.random.Generator(bit_generator)
+        return self._np_random
+
+    @np_random.setter
+    def np_random(self, np_random: np.random.Generator) -> None:
+        self._np_random = np_random
+        self._np_random_state = None
+
+    def snapshot(self) -> dict:
+        """
+        Copy the full state of the game: players, dog, game parts and random generator, without deepcopy
+        :return: (dict) snapshot to be given to GlobalGame.restore or GlobalGame.from_snapshot
+        """
+        snapshot = self.__dict__.copy()
+        snapshot['history'] = None
+        # Building a generator is costly, only the state is kept until the generator is needed again
+        if self._np_random is not None:
+            snapshot['_np_random'] = None
+            snapshot['_np_random_state'] = self._np_random.bit_generator.state
+        snapshot['payoffs'] = self.payoffs[:]
+        snapshot['known_cards'] = self.known_cards[:]
+        if self.players is not None:
+            snapshot['players'] = [player.snapshot() for player in self.players]
+            snapshot['dog'] = self.dog.snapshot()
+        for game_part in ['bid_game', 'dog_game', 'main_game']:
+            if snapshot[game_part] is not None:
+                snapshot[game_part] = snapshot[game_part].snapshot()
+        return snapshot
+
+    def restore(self, snapshot: dict) -> None:
+        """
+        Set the game back to the state of a snapshot. The snapshot is left untouched and can be restored again.
+        The history of the game is not part of the snapshot: no step back is possible before the restored state
+        :param snapshot: (dict) from GlobalGame.snapshot
+        """
+        self.__dict__.update(snapshot)
+        self.history = []
+        self.payoffs = snapshot['payoffs'][:]
+        self.known_cards = snapshot['known_cards'][:]
+        if snapshot['players'] is not None:
+            self.players = [Player.from_snapshot(player) for player in snapshot['players']]
+            self.dog = TarotDog.from_snapshot(snapshot['dog'])
+        if snapshot['bid_game'] is not None:
+            self.bid_game = BidGame.from_snapshot(snapshot['bid_game'], self.players, self.dog)
+        if snapshot['dog_game'] is not None:
+            self.dog_game = DogGame.from_snapshot(snapshot['dog_game'], self.players, self.dog)
+        if snapshot['main_game'] is not None:
+            self.main_game = MainGame.from_snapshot(snapshot['main_game'], self.players)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> 'GlobalGame':
+        """
+        Build a game from a snapshot
+        :param snapshot: (dict) from GlobalGame.snapshot
+        :return: the new game
+        """
+        game = cls.__new__(cls)
+        game.restore(snapshot)
+        return game
+
+    def clone(self) -> 'GlobalGame':
+        """
+        Copy the game, so that both can be played independently. The clone starts without history
+        :return: the new game
+        """
+        return GlobalGame.from_snapshot(self.snapshot())
+
     def init_game(self, number_of_deals: int = 0) -> (dict, int):
         """
         Initialize players and state for bid game in a globalgame object
+        :param number_of_deals: number of deals already done, when all the players passed in the previous ones
         :return: (tuple): containing :
 
                 (dict): the current state
                 (int): next player id
         """
+        self.history = []
         self.current_game_part = 'BID'
         self.bid_over = False
         self.dog_over = False
@@ -63,7 +158,7 @@ class GlobalGame(object):
         self.dog = TarotDog()
         # Initialize bid Round
         self.bid_game = BidGame(self.players, self.num_players, self.starting_player, self.num_cards_per_player,
-                                self.num_cards_dog, self.dog)
+                                self.num_cards_dog, self.dog, self.allow_step_back, self.np_random)
 
         self.bid_game.init_game()
 
@@ -72,21 +167,31 @@ class GlobalGame(object):
 
         return state, player_id
 
-    def step(self, played_action: Union[TarotCard, TarotBid, None]) -> (dict, int):
+    def step(self, played_action: Union[TarotCard, TarotBid, int]) -> (dict, int):
         """
         Get the next state
-        :param played_action: chosen action to be played (TarotCard or TarotBid): A specific TarotCard or TarotBid
+        :param played_action: chosen action to be played (TarotCard or TarotBid): A specific TarotCard or TarotBid,
+        or directly its id (card id or bid id depending on the current game part)
         :return: Tuple containing:
 
-                (dict): next player's state
+                (dict): next player's state, its costly fields being computed on first access
                 (int): next plater's id
         """
+        if self.allow_step_back:
+            attributes = self.__dict__.copy()
+            # The generator keeps drawing after this step: its state is kept, so that a step back also rewinds it
+            if self._np_random is not None:
+                attributes['_np_random'] = None
+                attributes['_np_random_state'] = self._np_random.bit_generator.state
+            self.history.append(attributes)
         if self.current_game_part == 'BID':
             state, player_id = self.bid_game.step(played_action)
             if state is None:
-                self.number_of_deals += 1
-                return self.init_game(self.number_of_deals)
-            state = self.bid_game.get_state(player_id)
+                # New deal, keeping the history of the previous one
+                history = self.history
+                state, player_id = self.init_game(self.number_of_deals + 1)
+                self.history = history
+                return state, player_id
             self.bid_game.bid_round.current_player_id = player_id
             if self.bid_game.bid_over:
                 self.bid_over = True
@@ -96,7 +201,8 @@ class GlobalGame(object):
                     self.current_game_part = 'DOG'
                     player_id = self.taking_player_id
                     self.dog_game = DogGame(self.players, self.taking_player_id, self.num_cards_per_player,
-                                            self.num_cards_dog, self.dog, self.taking_bid_order)
+                                            self.num_cards_dog, self.dog, self.taking_bid_order,
+                                            self.allow_step_back)
                     self.dog_game.init_game()
                     state = self.dog_game.get_state(player_id)
                 else:
@@ -107,19 +213,18 @@ class GlobalGame(object):
                                             self.num_cards_dog, self.dog, self.taking_bid_order)
                     self.main_game = MainGame(self.num_players, self.num_cards_per_player, self.starting_player,
                                               self.players, self.bid_game.taking_player_id,
-                                              self.dog_game.dog_round.new_dog)
+                                              self.dog_game.dog_round.new_dog, self.allow_step_back)
                     self.main_game.init_game()
                     state = self.main_game.get_state(player_id)
         elif self.current_game_part == 'DOG':
             state, player_id = self.dog_game.step(played_action)
-            state = self.dog_game.get_state(player_id)
             if self.dog_game.is_over:
                 self.dog_over = True
                 self.current_game_part = 'MAIN'
                 player_id = self.starting_player
                 self.main_game = MainGame(self.num_players, self.num_cards_per_player, self.starting_player,
                                           self.players, self.bid_game.taking_player_id,
-                                          self.dog_game.dog_round.new_dog)
+                                          self.dog_game.dog_round.new_dog, self.allow_step_back)
                 self.main_game.init_game()
                 state = self.main_game.get_state(player_id)
         elif self.current_game_part == 'MAIN':
@@ -167,6 +272,18 @@ class GlobalGame(object):
         else:
             return self.main_game.get_legal_actions()
 
+    def get_legal_actions_mask(self) -> int:
+        """
+        Return the legal actions for current player
+        :return: (int): bitmask of the legal action ids
+        """
+        if self.current_game_part == 'BID':
+            return self.bid_game.get_legal_actions_mask()
+        elif self.current_game_part == 'DOG':
+            return self.dog_game.get_legal_actions_mask()
+        else:
+            return self.main_game.get_legal_actions_mask()
+
     def get_player_num(self) -> int:
         """
         Return the number of players in Tarot
@@ -204,5 +321,18 @@ class GlobalGame(object):
         """
         return self.is_game_over
 
-    def step_back(self):
-        pass
+    def step_back(self) -> bool:
+        """
+        Cancel the last played action, possibly going back to the previous game part or deal
+        :return: (bool) True if an action has been cancelled, False if there is no history (or step back is off)
+        """
+        if not self.history:
+            return False
+        # Game parts created by the last action are dropped, and the one that played it cancels its last action
+        self.__dict__.update(self.history.pop())
+        if self.current_game_part == 'BID':
+            return self.bid_game.step_back()
+        elif self.current_game_part == 'DOG':
+            return self.dog_game.step_back()
+        else:
+            return self.main_game.step_back()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Union
 
 from rlcard.games.tarot.alpha_and_omega.card import TarotCard
 from rlcard.games.tarot.alpha_and_omega.player import TarotPlayer
@@ -8,7 +8,7 @@ from rlcard.games.tarot.main_game.main_round import MainRound
 class MainGame(object):
 
     def __init__(self, num_players: int, num_cards_per_player: int, starting_player: int, players: List[TarotPlayer],
-                 taking_player_id: int, new_dog: List[TarotCard]):
+                 taking_player_id: int, new_dog: List[TarotCard], allow_step_back: bool = False):
         """
         Initialize a MainGame object
         :param num_players: Number of players
@@ -17,7 +17,9 @@ class MainGame(object):
         :param players: List of TarotPlayers
         :param taking_player_id: Id of the player that won the BID part
         :param new_dog: List of cards in the dog (None if BID is GARDE_SANS or GARDE_CONTRE)
+        :param allow_step_back: (bool) if True, the played cards can be cancelled with step_back
         """
+        self.allow_step_back = allow_step_back
         self.num_players = num_players
         self.num_cards_per_player = num_cards_per_player
         self.starting_player = starting_player
@@ -33,6 +35,34 @@ class MainGame(object):
         for player_id in range(num_players):
             self.payoffs[player_id] = 0
 
+    def snapshot(self) -> dict:
+        """
+        Copy the state of the main game, players excepted as they are shared with the other game parts
+        :return: (dict) attributes of the main game
+        """
+        snapshot = self.__dict__.copy()
+        snapshot['players'] = None
+        snapshot['payoffs'] = self.payoffs.copy()
+        if self.main_round is not None:
+            snapshot['main_round'] = self.main_round.snapshot()
+        return snapshot
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, players: List[TarotPlayer]) -> 'MainGame':
+        """
+        Build a main game from a snapshot
+        :param snapshot: (dict) from MainGame.snapshot
+        :param players: players of the game
+        :return: the new main game
+        """
+        main_game = cls.__new__(cls)
+        main_game.__dict__.update(snapshot)
+        main_game.players = players
+        main_game.payoffs = snapshot['payoffs'].copy()
+        if snapshot['main_round'] is not None:
+            main_game.main_round = MainRound.from_snapshot(snapshot['main_round'])
+        return main_game
+
     def init_game(self) -> (dict, int):
         """
         Initialize round and state for the game
@@ -46,16 +76,16 @@ class MainGame(object):
 
         # Initialize a Round
         self.main_round = MainRound(self.starting_player, self.num_players, self.num_cards_per_player, self.taking_bid,
-                                    self.new_dog)
+                                    self.new_dog, self.players, self.allow_step_back)
 
         player_id = self.main_round.current_player_id
         state = self.get_state(player_id)
         return state, player_id
 
-    def step(self, played_card: TarotCard) -> (dict, int):
+    def step(self, played_card: Union[TarotCard, int]) -> (dict, int):
         """
         Get the next state using a specified card
-        :param played_card: Chosen (TarotCard) to be played
+        :param played_card: Chosen (TarotCard) to be played, or its id
         :return: (tuple): Tuple containing:
 
                 (dict): next player's state
@@ -70,6 +100,16 @@ class MainGame(object):
         self.main_round.current_player_id = player_id
         return state, player_id
 
+    def step_back(self) -> bool:
+        """
+        Cancel the last played card
+        :return: (bool) True if a card has been cancelled
+        """
+        if not self.main_round.step_back(self.players):
+            return False
+        self.is_over = self.main_round.is_over
+        return True
+
     def get_state(self, player_id: int) -> dict:
         """
         Return player's state
@@ -120,6 +160,13 @@ class MainGame(object):
         """
         return self.main_round.get_legal_actions(self.players, self.main_round.current_player_id)
 
+    def get_legal_actions_mask(self) -> int:
+        """
+        Return the legal actions for current player
+        :return: (int) bitmask of the ids of all tarotcards that can be played
+        """
+        return self.main_round.get_legal_actions_mask(self.players, self.main_round.current_player_id)
+
     def get_player_num(self) -> int:
         """
         Return the number of players in Tarot
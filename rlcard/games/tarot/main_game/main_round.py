@@ -1,9 +1,11 @@
-from typing import List
+from typing import List, Union
 
-from rlcard.games.tarot.alpha_and_omega.card import TarotCard
+from rlcard.games.tarot.alpha_and_omega.card import CARDS, TarotCard
 from rlcard.games.tarot.alpha_and_omega.judger import TarotJudger
 from rlcard.games.tarot.alpha_and_omega.player import TarotPlayer
-from rlcard.games.tarot.utils import cards2list, get_end_pot_information
+from rlcard.games.tarot.alpha_and_omega.state import LazyState
+from rlcard.games.tarot.utils import COLOR_MASKS, EXCUSE_ID, TRUMP_MASK, TRUMPS_ABOVE_MASKS, \
+    cards2mask, mask2cards, mask2list, resolve_trick
 
 COLOR_MAP = {'SPADE': 0, 'CLOVER': 1, 'HEART': 2, 'DIAMOND': 3, 'TRUMP': 4}
 
@@ -11,7 +13,7 @@ COLOR_MAP = {'SPADE': 0, 'CLOVER': 1, 'HEART': 2, 'DIAMOND': 3, 'TRUMP': 4}
 class MainRound(object):
 
     def __init__(self, starting_player_id: int, num_players: int, num_card_per_player: int, taking_bid_order: int,
-                 new_dog: List[TarotCard]):
+                 new_dog: List[TarotCard], players: List[TarotPlayer], allow_step_back: bool = False):
         """
         Initialize the round class
         :param starting_player_id: (int) id of the starting player
@@ -19,34 +21,126 @@ class MainRound(object):
         :param num_card_per_player: (int)
         :param taking_bid_order: (int) from 0 to 5
         :param new_dog: (List[TarotCard]) from dog part of the game
+        :param players: (List[TarotPlayer]) list of the players, with their hands already dealt
+        :param allow_step_back: (bool) if True, keep an undo log of the played cards
         """
         self.target_card = None
+        self.led_suit = None
         self.highest_trump = -1
         self.current_player_id = starting_player_id
         self.num_players = num_players
         self.num_card_per_player = num_card_per_player
         self.direction = 1
         self.taking_bid_order = taking_bid_order
-        self.played_cards = []
-        self.pot_cards = dict()
+        # Played cards are kept in tuples, shared as is by the states and the snapshots of the round
+        self.played_cards = ()
+        self.played_card_strs = ()
+        self.played_mask = 0
+        self.pot_card_ids = [EXCUSE_ID] * num_players
+        self.pot_card_strs = ()
+        self.pot_mask = 0
         self.excuse_played = False
         self.excuse_player = None
         self.players_cut = [[0] * 4] * num_players
         self.has_trumps = [1] * num_players
         self.max_trump = [21] * num_players
         self.new_dog = new_dog
+        self.new_dog_mask = cards2mask(new_dog)
+        # Cards unknown to each player: hands of the other players, and the dog if it is not revealed
+        remaining_mask = 0
+        for player in players:
+            remaining_mask |= player.hand_mask
+        if self.taking_bid_order >= 4:
+            remaining_mask |= self.new_dog_mask
+        self.unknown_masks = [remaining_mask & ~player.hand_mask for player in players]
         self.is_pot_over = False
         self.is_over = False
         self.winner = None
+        # Last legal actions computed, as [(hand_mask, led_suit, highest_trump), legal_mask, legal_cards]
+        # legal_cards being None until the list of TarotCards is requested
+        self.legal_actions_cache = [None, 0, None]
+        # Undo log: for each played card, the snapshots of the round and the players before it
+        self.undo_log = [] if allow_step_back else None
+
+    def snapshot(self) -> dict:
+        """
+        Copy the state of the round
+        :return: (dict) attributes of the round
+        """
+        snapshot = self.__dict__.copy()
+        self._copy_lists(snapshot)
+        return snapshot
 
-    def proceed_round(self, players: List[TarotPlayer], played_card: TarotCard) -> int:
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> 'MainRound':
+        """
+        Build a round from a snapshot
+        :param snapshot: (dict) from MainRound.snapshot
+        :return: the new round
+        """
+        main_round = cls.__new__(cls)
+        main_round.__dict__.update(snapshot)
+        cls._copy_lists(main_round.__dict__)
+        if snapshot['undo_log'] is not None:
+            main_round.undo_log = []
+        return main_round
+
+    def restore(self, snapshot: dict) -> None:
+        """
+        Set the round back to the state of a snapshot, keeping the current undo log
+        :param snapshot: (dict) from MainRound.snapshot
+        """
+        undo_log = self.undo_log
+        self.__dict__.update(snapshot)
+        self._copy_lists(self.__dict__)
+        self.undo_log = undo_log
+
+    def step_back(self, players: List[TarotPlayer]) -> bool:
+        """
+        Cancel the last played card
+        :param players: (List[TarotPlayer]) list of the players
+        :return: (bool) True if a card has been cancelled
+        """
+        if not self.undo_log:
+            return False
+        snapshot, player_snapshots = self.undo_log.pop()
+        self.restore(snapshot)
+        for player, player_snapshot in zip(players, player_snapshots):
+            player.restore(player_snapshot)
+        return True
+
+    @staticmethod
+    def _copy_lists(attributes: dict) -> None:
+        """
+        Replace in place the lists modified while playing by copies of them
+        :param attributes: (dict) attributes of a round
+        """
+        attributes['pot_card_ids'] = attributes['pot_card_ids'][:]
+        attributes['has_trumps'] = attributes['has_trumps'][:]
+        attributes['max_trump'] = attributes['max_trump'][:]
+        attributes['unknown_masks'] = attributes['unknown_masks'][:]
+        # Rows of players_cut may be the same list, which is kept that way in the copy
+        players_cut = attributes['players_cut']
+        rows = {id(row): row[:] for row in players_cut}
+        attributes['players_cut'] = [rows[id(row)] for row in players_cut]
+
+    def proceed_round(self, players: List[TarotPlayer], played_card: Union[TarotCard, int]) -> int:
         """
         Call other Classes's functions to keep one round running
         :param players: (List[TarotPlayer]) list of the players
-        :param played_card: (TarotCard) card chosen to be played
+        :param played_card: (TarotCard) card chosen to be played, or its id
         :return:
         """
         player = players[self.current_player_id]
+        if isinstance(played_card, TarotCard):
+            card_id = played_card.id
+        else:
+            card_id = int(played_card)
+            played_card = CARDS[card_id]
+        card_bit = 1 << card_id
+        if self.undo_log is not None:
+            # Snapshots stay O(1): the tuples of played cards are shared and only small lists are copied
+            self.undo_log.append((self.snapshot(), [player.snapshot() for player in players]))
 
         # Printing values for debugging purpose # TODO REMOVE for training
         # print('================= Played card - ' + str(int(len(self.played_cards))) + ' =================')
@@ -54,25 +148,22 @@ class MainRound(object):
         # print('\r>> playing {} '.format(played_card.get_str()))
         # print('')
 
-        if played_card.get_str() == 'TRUMP-0':
+        if card_id == EXCUSE_ID:
             player.bouts += 1
             player.points += 4
             self.excuse_played = True
 
         # remove corresponding card
-        remove_index = None
-        for index, card in enumerate(player.hand):
-            if played_card.get_str() == card.get_str():
-                remove_index = index
-                break
-
-        _ = player.hand.pop(remove_index)
+        if not player.hand_mask & card_bit:
+            raise ValueError('Card {} is not in the hand of player {}'.format(played_card.get_str(),
+                                                                            self.current_player_id))
+        player.hand_mask ^= card_bit
 
         # When starting a new pot
-        if self.target_card is None and played_card.get_str() != 'TRUMP-0':
+        if self.target_card is None and card_id != EXCUSE_ID:
             self.highest_trump = -1
             self.target_card = played_card
-            self.pot_cards['target'] = played_card
+            self.led_suit = COLOR_MAP['TRUMP'] if played_card.is_trump else COLOR_MAP[played_card.color]
 
         # Checking if a player is cuting and updating info for state
         if self.target_card is not None:
@@ -87,10 +178,16 @@ class MainRound(object):
             self.max_trump[self.current_player_id] = min(self.highest_trump, self.max_trump[self.current_player_id])
 
         # Add in Played_card list
-        self.played_cards.append(played_card)
+        self.played_cards += (played_card,)
+        self.played_card_strs += (played_card.str,)
+        self.played_mask |= card_bit
+        for player_id in range(self.num_players):
+            self.unknown_masks[player_id] &= ~card_bit
 
         # Add in pot_card
-        self.pot_cards[self.current_player_id] = played_card
+        self.pot_card_ids[self.current_player_id] = card_id
+        self.pot_card_strs += (played_card.str,)
+        self.pot_mask |= card_bit
 
         # Keeping the highest trump of the pot
         if played_card.is_trump:
@@ -98,7 +195,7 @@ class MainRound(object):
 
         # When pot is over
         if len(self.played_cards) % self.num_players == 0:
-            winner_id, pot_value, nb_bout = get_end_pot_information(self.pot_cards)
+            winner_id, pot_value, nb_bout = resolve_trick(self.pot_card_ids, self.led_suit)
             if self.excuse_played:
                 players[winner_id].points += pot_value - 4
                 players[winner_id].bouts += nb_bout - 1
@@ -108,8 +205,11 @@ class MainRound(object):
 
             # Erasing info about excuse
             self.excuse_played = False
-            # Erasing target_card
+            # Erasing target_card and pot cards
             self.target_card = None
+            self.led_suit = None
+            self.pot_card_strs = ()
+            self.pot_mask = 0
 
             # Printing values for debugging purpose # TODO REMOVE for training
             # print('================= Winner - ' + str(int(len(self.played_cards) / 4)) + ' =================')
@@ -125,6 +225,15 @@ class MainRound(object):
 
         return (self.current_player_id + 1) % self.num_players
 
+    def get_legal_actions_mask(self, players: List[TarotPlayer], player_id: int) -> int:
+        """
+        Get the bitmask of all legal cards that can be played by current player with his hand and the target card
+        :param players: list of all players
+        :param player_id: current player
+        :return: bitmask of legal cards
+        """
+        return self._get_legal_actions_entry(players[player_id].hand_mask)[1]
+
     def get_legal_actions(self, players: List[TarotPlayer], player_id: int) -> List[TarotCard]:
         """
         Get all legal cards that can be played by current player with his hand and the target card
@@ -132,44 +241,46 @@ class MainRound(object):
         :param player_id: current player
         :return: list of legals TarotCard
         """
-        legal_actions = []
-        hand = players[player_id].hand
-        target = self.target_card
-        # If no target card (first player to speak)
-        if target is None:
-            return hand
-        # If there is a target
+        return self._get_legal_cards(self._get_legal_actions_entry(players[player_id].hand_mask))
+
+    def _get_legal_actions_entry(self, hand_mask: int) -> list:
+        """
+        Get the legal actions for a given hand, reusing the last computation while the hand, the target color and the
+        highest trump of the pot are unchanged
+        :param hand_mask: bitmask of the cards in hand
+        :return: [key, legal_mask, legal_cards] list, see legal_actions_cache
+        """
+        key = (hand_mask, self.led_suit, self.highest_trump)
+        if self.legal_actions_cache[0] == key:
+            return self.legal_actions_cache
+        # If no target card (first player to speak), everything can be played
+        if self.led_suit is None:
+            legal_mask = hand_mask
         else:
-            target_color_is_trump = target.is_trump
-            target_color = target.color
-            # If color is not trump
-            if not target_color_is_trump:
-                for card in hand:
-                    if card.color == target_color:
-                        legal_actions.append(card)
-                if len(legal_actions) == 0:
-                    for card in hand:
-                        if card.is_trump and card.trump_value > self.highest_trump:
-                            legal_actions.append(card)
-                if len(legal_actions) == 0:
-                    for card in hand:
-                        if card.is_trump:
-                            legal_actions.append(card)
-                if len(legal_actions) == 0:
-                    legal_actions = hand
-            # If asked is trump
-            else:
-                for card in hand:
-                    if card.is_trump and card.trump_value > self.highest_trump:
-                        legal_actions.append(card)
-                if len(legal_actions) == 0:
-                    for card in hand:
-                        if card.is_trump:
-                            legal_actions.append(card)
-                if len(legal_actions) == 0:
-                    legal_actions = hand
-
-        return legal_actions
+            legal_mask = 0
+            # If color is not trump, the color has to be followed
+            if self.led_suit != COLOR_MAP['TRUMP']:
+                legal_mask = hand_mask & COLOR_MASKS[self.led_suit]
+            # Otherwise overtrump, or undertrump, or play anything
+            if not legal_mask:
+                legal_mask = hand_mask & TRUMPS_ABOVE_MASKS[self.highest_trump + 1]
+            if not legal_mask:
+                legal_mask = hand_mask & TRUMP_MASK
+            if not legal_mask:
+                legal_mask = hand_mask
+        self.legal_actions_cache = [key, legal_mask, None]
+        return self.legal_actions_cache
+
+    @staticmethod
+    def _get_legal_cards(entry: list) -> List[TarotCard]:
+        """
+        Get a copy of the legal TarotCards of a legal actions entry, building them only once
+        :param entry: [key, legal_mask, legal_cards] list, see legal_actions_cache
+        :return: list of legals TarotCard
+        """
+        if entry[2] is None:
+            entry[2] = mask2cards(entry[1])
+        return list(entry[2])
 
     def get_state(self, players: List[TarotPlayer], player_id: int) -> dict:
         """
@@ -188,26 +299,24 @@ class MainRound(object):
                 (List[str]) - pot_cards: last few cards (str) played in the pot
                 (str) - target: str-tarotcard of the target card in this pot (potentially None)
                 (List[str]) - others_hand: list of str-tarotcards unknown
+                (int) - hand_mask, played_mask, pot_mask, others_mask: bitmasks of the same card sets
+        legal_actions and the lists of str cards are only computed when first accessed
         """
-        player = players[player_id]
-        number_of_played_cards = len(self.played_cards)
-        state = {'hand': cards2list(player.hand), 'played_cards': cards2list(self.played_cards),
-                 'pot_number': int(number_of_played_cards / 4),
-                 'legal_actions': self.get_legal_actions(players, player_id),
-                 'cuts_color': self.players_cut,
-                 'has_trumps': self.has_trumps,
-                 'max_trump': self.max_trump}
-        state['pot_cards'] = state['played_cards'][state['pot_number'] * 4:]
-        if self.target_card is not None:
-            state['target'] = self.target_card.get_str()
-        else:
-            state['target'] = None
-        others_hand = []
-        for player in players:
-            if player.player_id != player_id:
-                others_hand.extend(player.hand)
-        # Dog is also in the others_hand group
-        if self.taking_bid_order >= 4:
-            others_hand.extend(self.new_dog)
-        state['others_hand'] = cards2list(others_hand)
-        return state
+        hand_mask = players[player_id].hand_mask
+        others_mask = self.unknown_masks[player_id]
+        legal_actions_entry = self._get_legal_actions_entry(hand_mask)
+        played_card_strs = self.played_card_strs
+        pot_card_strs = self.pot_card_strs
+        values = {'pot_number': len(played_card_strs) // 4,
+                  'cuts_color': self.players_cut,
+                  'has_trumps': self.has_trumps,
+                  'max_trump': self.max_trump,
+                  'target': self.target_card.str if self.target_card is not None else None,
+                  'hand_mask': hand_mask, 'played_mask': self.played_mask, 'pot_mask': self.pot_mask,
+                  'others_mask': others_mask}
+        factories = {'hand': lambda: mask2list(hand_mask),
+                     'played_cards': lambda: list(played_card_strs),
+                     'pot_cards': lambda: list(pot_card_strs),
+                     'others_hand': lambda: mask2list(others_mask),
+                     'legal_actions': lambda: self._get_legal_cards(legal_actions_entry)}
+        return LazyState(values, factories)
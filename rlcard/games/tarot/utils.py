@@ -3,8 +3,8 @@ from typing import List, Union
 
 import numpy as np
 
-from rlcard.games.tarot.alpha_and_omega.card import TarotCard as Card, TarotCard
-from rlcard.games.tarot.bid.bid import TarotBid
+from rlcard.games.tarot.alpha_and_omega.card import CARDS, TarotCard as Card, TarotCard
+from rlcard.games.tarot.bid.bid import BIDS, TarotBid
 
 # a map of color to its index
 
@@ -16,41 +16,66 @@ VALUE_MAP = {'0': 0, '1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7,
 
 BID_SPACE = OrderedDict({'PASSE': 0, 'PETITE': 1, 'POUSSE': 2, 'GARDE': 3, 'GARDE_SANS': 4, 'GARDE_CONTRE': 5})
 BID_LIST = list(BID_SPACE.keys())
-all_bids = [TarotBid('PASSE'),
-            TarotBid('PETITE'),
-            TarotBid('POUSSE'),
-            TarotBid('GARDE'),
-            TarotBid('GARDE_SANS'),
-            TarotBid('GARDE_CONTRE')]
+all_bids = BIDS
 
 
 def init_deck() -> List[TarotCard]:
     """
     Generate tarot deck of 78 cards
-    :return: List of TarotCards
+    :return: List of the shared TarotCards, in card id order
     """
-    card_deck = []
-    card_info = Card.info
-    for color in card_info['color']:
-
-        # init number cards
-        for num in card_info['color_value']:
-            card_deck.append(Card(False, color=color, color_value=num))
-
-    # init trump cards
-    for num in card_info['trump_value']:
-        card_deck.append(Card(True, trump_value=num))
+    return list(CARDS)
 
-    return card_deck
 
-
-deck = init_deck()
 ACTION_DICT = dict()
-for index, a_card in enumerate(deck):
-    ACTION_DICT[a_card.str] = index
+for a_card in CARDS:
+    ACTION_DICT[a_card.str] = a_card.id
 ACTION_SPACE = OrderedDict(ACTION_DICT)
 ACTION_LIST = list(ACTION_SPACE.keys())
 
+# Bitmask representation of a set of cards: bit i is set when the card with action id i is in the set
+# (14 cards for each color SPADE, CLOVER, HEART and DIAMOND, then the 22 trumps from TRUMP-0 to TRUMP-21)
+NUM_CARDS = 78
+FULL_MASK = (1 << NUM_CARDS) - 1
+EXCUSE_ID = ACTION_SPACE['TRUMP-0']
+COLOR_MASKS = [((1 << 14) - 1) << (14 * color_index) for color_index in range(4)] + [((1 << 22) - 1) << EXCUSE_ID]
+TRUMP_MASK = COLOR_MASKS[COLOR_MAP['TRUMP']]
+BOUTS_MASK = (1 << EXCUSE_ID) | (1 << ACTION_SPACE['TRUMP-1']) | (1 << ACTION_SPACE['TRUMP-21'])
+KINGS_MASK = 0
+for a_color in Card.info['color']:
+    KINGS_MASK |= 1 << ACTION_SPACE[a_color + '-14']
+# TRUMPS_ABOVE_MASKS[highest_trump + 1] is the mask of the trumps strictly higher than highest_trump (-1 to 21)
+TRUMPS_ABOVE_MASKS = [TRUMP_MASK & ~((1 << (EXCUSE_ID + highest_trump + 1)) - 1) for highest_trump in range(-1, 22)]
+# Masks are decoded byte by byte: _BYTE_IDS[position][byte] gives the card ids of the bits set in that byte
+MASK_BYTES = (NUM_CARDS + 7) // 8
+_BYTE_IDS = [[tuple(8 * position + bit for bit in range(8) if byte >> bit & 1 and 8 * position + bit < NUM_CARDS)
+              for byte in range(256)] for position in range(MASK_BYTES)]
+_BYTE_CARDS = [[tuple(CARDS[card_id] for card_id in ids) for ids in byte_ids] for byte_ids in _BYTE_IDS]
+_BYTE_STRS = [[tuple(ACTION_LIST[card_id] for card_id in ids) for ids in byte_ids] for byte_ids in _BYTE_IDS]
+
+# Per card lookup arrays, indexed by card id
+CARD_POINTS = np.array([card.get_value() for card in CARDS], dtype=np.float64)
+CARD_IS_BOUT = np.array([card.is_bout() for card in CARDS], dtype=np.int8)
+CARD_SUIT = np.array([COLOR_MAP['TRUMP'] if card.is_trump else COLOR_MAP[card.color] for card in CARDS], dtype=np.int8)
+CARD_RANK = np.array([card.trump_value if card.is_trump else card.color_value for card in CARDS], dtype=np.int8)
+CARD_TRUMP_VALUE = np.array([card.trump_value if card.is_trump else -1 for card in CARDS], dtype=np.int8)
+for an_array in [CARD_POINTS, CARD_IS_BOUT, CARD_SUIT, CARD_RANK, CARD_TRUMP_VALUE]:
+    an_array.setflags(write=False)
+# Python list copies for the scalar code paths, where indexing a list is cheaper than indexing an array
+_CARD_POINTS = CARD_POINTS.tolist()
+_CARD_IS_BOUT = CARD_IS_BOUT.tolist()
+_CARD_SUIT = CARD_SUIT.tolist()
+
+# Rank of every card in a pot, given the suit index of the target card: the highest rank wins the pot.
+# Trumps beat everything, then the cards following the target color, while the excuse and the other colors never win
+TRICK_RANKS = np.zeros((5, NUM_CARDS), dtype=np.int8)
+for a_suit in range(5):
+    TRICK_RANKS[a_suit][CARD_SUIT == a_suit] = CARD_RANK[CARD_SUIT == a_suit]
+    TRICK_RANKS[a_suit][CARD_TRUMP_VALUE > 0] = 14 + CARD_TRUMP_VALUE[CARD_TRUMP_VALUE > 0]
+TRICK_RANKS[COLOR_MAP['TRUMP']][EXCUSE_ID] = 0
+TRICK_RANKS.setflags(write=False)
+_TRICK_RANKS = TRICK_RANKS.tolist()
+
 
 def cards2list(cards: Union[TarotCard, List[TarotCard]]) -> List[str]:
     """
@@ -64,6 +89,100 @@ def cards2list(cards: Union[TarotCard, List[TarotCard]]) -> List[str]:
     return cards_list
 
 
+def cards2mask(cards: List[TarotCard]) -> int:
+    """
+    Get the bitmask representation of cards
+    :param cards: list of TarotCards objects
+    :return: int with the bit of each card id set
+    """
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.id
+    return mask
+
+
+def _decode_mask(mask: int, byte_tables: list) -> list:
+    """
+    Decode a bitmask byte by byte with precomputed tables
+    :param mask: bitmask representation of cards
+    :param byte_tables: one of _BYTE_IDS, _BYTE_CARDS or _BYTE_STRS
+    :return: list of the decoded items, in increasing card id order
+    """
+    items = []
+    for position, byte in enumerate(mask.to_bytes(MASK_BYTES, 'little')):
+        if byte:
+            items.extend(byte_tables[position][byte])
+    return items
+
+
+def mask2ids(mask: int) -> List[int]:
+    """
+    Get the card ids contained in a bitmask, in increasing order
+    :param mask: bitmask representation of cards
+    :return: List of card ids
+    """
+    return _decode_mask(mask, _BYTE_IDS)
+
+
+def mask2cards(mask: int) -> List[TarotCard]:
+    """
+    Get the TarotCards contained in a bitmask, in increasing id order
+    :param mask: bitmask representation of cards
+    :return: List of TarotCards
+    """
+    return _decode_mask(mask, _BYTE_CARDS)
+
+
+def mask2list(mask: int) -> List[str]:
+    """
+    Get the string representation of the cards contained in a bitmask
+    :param mask: bitmask representation of cards
+    :return: List of str-tarot-cards
+    """
+    return _decode_mask(mask, _BYTE_STRS)
+
+
+def count_cards(mask: int) -> int:
+    """
+    Count the cards contained in a bitmask
+    :param mask: bitmask representation of cards
+    :return: number of cards
+    """
+    return bin(mask).count('1')
+
+
+def mask2array(mask: int) -> np.ndarray:
+    """
+    Get the indicator vector of the cards contained in a bitmask
+    :param mask: bitmask representation of cards
+    :return: (78,) uint8 numpy array with 1 for each card in the mask
+    """
+    return np.unpackbits(np.frombuffer(mask.to_bytes(MASK_BYTES, 'little'), dtype=np.uint8),
+                         bitorder='little')[:NUM_CARDS]
+
+
+def array2mask(array: np.ndarray) -> int:
+    """
+    Get the bitmask of the cards set in an indicator vector, reverse of mask2array
+    :param array: (78,) numpy array with a non zero value for each card in the set
+    :return: bitmask representation of the cards
+    """
+    return int.from_bytes(np.packbits(np.asarray(array, dtype=bool), bitorder='little').tobytes(), 'little')
+
+
+def _get_card_ids(cards: Union[dict, List[TarotCard], int]) -> List[int]:
+    """
+    Get the card ids of a pot, a list of cards or a bitmask
+    :param cards: dict cards of all players + THE TARGET CARD NOT TO BE COUNTED, list of TarotCards or bitmask
+    :return: List of card ids
+    """
+    if isinstance(cards, dict):
+        return [card.id for player_id, card in cards.items() if player_id != 'target']
+    if isinstance(cards, int):
+        return mask2ids(cards)
+    return [card.id for card in cards]
+
+
 def hand2dict(hand: List[str]) -> dict:
     """
     Get the corresponding dict representation of hand
@@ -94,6 +213,20 @@ def encode_hand(plane: np.ndarray, hand: List[str], index_to_encode: int = 0) ->
     return plane
 
 
+def encode_mask(plane: np.ndarray, mask: int, index_to_encode: int = 0) -> np.ndarray:
+    """
+    Encode a bitmask of cards and represerve it into plane, same as encode_hand
+    :param plane: n*5*22 numpy ndarray
+    :param mask: bitmask representation of the cards
+    :param index_to_encode: see tarot extract state function
+    :return: n*5*22 numpy ndarray
+    """
+    plane[index_to_encode] = 0
+    card_ids = mask2ids(mask)
+    plane[index_to_encode][CARD_SUIT[card_ids], CARD_RANK[card_ids]] = 1
+    return plane
+
+
 def encode_info(plane: np.ndarray, cuts_color, has_trumps, max_trump, index_to_encode: int = 0) -> np.ndarray:
     """
     Encode hand and represerve it into plane
@@ -150,7 +283,7 @@ def encode_bid(plane: np.ndarray, bid: Union[int, TarotBid, List[TarotBid]],
         bid = [bid]
     if isinstance(bid, int):
         bid = [all_bids[bid]]
-    bid_values = [BID_SPACE[bid[i].get_str()] for i in range(len(bid)) if bid[i] is not None]
+    bid_values = [bid[i].id for i in range(len(bid)) if bid[i] is not None]
     indexs = [int(index_to_encode.split('-')[i]) for i in [0, 1]]
     plane[indexs[0]][indexs[1]] = np.zeros(22, dtype=int)
     for bid_value in bid_values:
@@ -160,32 +293,48 @@ def encode_bid(plane: np.ndarray, bid: Union[int, TarotBid, List[TarotBid]],
 
 def get_TarotCard_from_str(card: str) -> Union[None, TarotCard]:
     """
-    Transform a str representation of a card into TarotCard
+    Get the shared TarotCard corresponding to a str representation of a card
     :param card: str representation of the card
     :return: TarotCard object
     """
     if card is None:
         return None
     else:
-        color, value = card.split('-')
-        if color == 'TRUMP':
-            is_trump = True
-            return Card(is_trump, trump_value=int(value))
-        else:
-            is_trump = False
-            return Card(is_trump, color=color, color_value=int(value))
+        return CARDS[ACTION_SPACE[card]]
 
 
 def get_TarotBid_from_str(bid: str) -> Union[None, TarotBid]:
     """
-    Get a TarotBid object from a string representation of a bid
+    Get the shared TarotBid object corresponding to a string representation of a bid
     :param bid: str
     :return: TarotBid object
     """
     if bid is None:
         return None
     else:
-        return TarotBid(bid)
+        return BIDS[BID_SPACE[bid]]
+
+
+def resolve_trick(card_ids: List[int], led_suit: int) -> (int, float, int):
+    """
+    Resolve a complete pot from the card ids played by each player, using the precomputed TRICK_RANKS table
+    :param card_ids: list of the card ids played, indexed by player id
+    :param led_suit: suit index (see COLOR_MAP) of the target card of the pot
+    :return: (winner_id, pot_value, nb_bouts) tuple
+    """
+    ranks = _TRICK_RANKS[led_suit]
+    winner_id = 0
+    winner_rank = -1
+    pot_value = 0
+    nb_bouts = 0
+    for player_id, card_id in enumerate(card_ids):
+        rank = ranks[card_id]
+        if rank > winner_rank:
+            winner_id = player_id
+            winner_rank = rank
+        pot_value += _CARD_POINTS[card_id]
+        nb_bouts += _CARD_IS_BOUT[card_id]
+    return winner_id, pot_value, nb_bouts
 
 
 def get_end_pot_information(pot_cards: dict) -> (int, float, int):
@@ -195,92 +344,41 @@ def get_end_pot_information(pot_cards: dict) -> (int, float, int):
     :param pot_cards: dictionnary with target_card, and the cards of all players
     :return: (winner_id, pot_value, nb_bouts) tuple
     """
-    target_card = pot_cards['target']
-    trump_values = dict()
-    values = dict()
-    color_values = dict()
-    colors = dict()
-    for player_id in range(len(pot_cards) - 1):
-        if pot_cards[player_id].is_trump:
-            trump_values[player_id] = pot_cards[player_id].trump_value
-            values[player_id] = -1
-            colors[player_id] = 'TRUMP'
-        else:
-            trump_values[player_id] = -1
-            values[player_id] = pot_cards[player_id].color_value
-            colors[player_id] = pot_cards[player_id].color
-    # If target is trump :
-    if target_card.is_trump:
-        winner_id = max(trump_values, key=trump_values.get)
-    # If color is given in target card
-    else:
-        trump_used = False
-        for player_id in range(len(pot_cards) - 1):
-            if colors[player_id] == 'TRUMP' and trump_values[player_id] != 0:
-                trump_used = True
-        if trump_used:
-            winner_id = max(trump_values, key=trump_values.get)
-        else:
-            target_color = target_card.color
-            for player_id in range(len(pot_cards) - 1):
-                color_values[player_id] = (target_color == colors[player_id]) * values[player_id]
-            winner_id = max(color_values, key=color_values.get)
-
-    return winner_id, get_pot_value(pot_cards), get_nb_bouts(pot_cards)
+    card_ids = [pot_cards[player_id].id for player_id in range(len(pot_cards) - 1)]
+    return resolve_trick(card_ids, _CARD_SUIT[pot_cards['target'].id])
 
 
-def get_pot_value(pot_cards: dict) -> float:
+def get_pot_value(pot_cards: Union[dict, List[TarotCard], int, np.ndarray]) -> Union[float, np.ndarray]:
     """
     Get the pot value from 4 cards and the initial target
-    :param pot_cards: dict cards of all players + THE TARGET CARD NOT TO BE COUNTED
+    :param pot_cards: dict cards of all players + THE TARGET CARD NOT TO BE COUNTED, or any hand accepted by
+    get_hand_value
     :return: point value of this pot (float)
     """
-    total_points = 0
-    for player_id in range(len(pot_cards) - 1):
-        total_points += pot_cards[player_id].get_value()
+    return get_hand_value(pot_cards)
 
-    return total_points
 
-
-def get_hand_value(hand_cards: List[TarotCard]) -> float:
+def get_hand_value(hand_cards: Union[dict, List[TarotCard], int, np.ndarray]) -> Union[float, np.ndarray]:
     """
     Get the value of the cards in hand
-    :param hand_cards: list of TarotCards (from player.hand)
-    :return: a float value of all the cards in hand
-    """
-    total_points = 0
-    for card in hand_cards:
-        total_points += card.get_value()
-
-    return total_points
-
-
-def get_nb_bouts(hand_cards: List[TarotCard]) -> int:
-    """
-    Get the number of bouts in the hand
-    :param hand_cards: list of TarotCards (from player.hand)
-    :return: the int value of the number of bouts
+    :param hand_cards: list of TarotCards (from player.hand), bitmask (from player.hand_mask), or numpy indicator
+    array of shape (78,) or (N, 78) for a batch of N hands
+    :return: a float value of all the cards in hand, or a (N,) array of values for a batch
     """
-    total_bouts = 0
-    for card in hand_cards:
-        total_bouts += card.is_bout()
+    if isinstance(hand_cards, np.ndarray):
+        return hand_cards @ CARD_POINTS
+    return sum([_CARD_POINTS[card_id] for card_id in _get_card_ids(hand_cards)])
 
-    return total_bouts
 
-
-def get_nb_bouts(pot_cards: Union[dict, list]) -> int:
+def get_nb_bouts(pot_cards: Union[dict, List[TarotCard], int, np.ndarray]) -> Union[int, np.ndarray]:
     """
     Compute the number of bouts in the pot
-    :param pot_cards: dict cards of all players + THE TARGET CARD NOT TO BE COUNTED
-    :return: number of bouts in the pot (int)
-    """
-    if isinstance(pot_cards, dict):
-        total_bouts = 0
-        for player_id in range(len(pot_cards) - 1):
-            total_bouts += pot_cards[player_id].is_bout()
-    if isinstance(pot_cards, list):
-        total_bouts = 0
-        for card in pot_cards:
-            total_bouts += card.is_bout()
-
-    return total_bouts
+    :param pot_cards: dict cards of all players + THE TARGET CARD NOT TO BE COUNTED, list of TarotCards, bitmask, or
+    numpy indicator array of shape (78,) or (N, 78) for a batch of N hands
+    :return: number of bouts in the pot (int), or a (N,) array of numbers of bouts for a batch
+    """
+    if isinstance(pot_cards, np.ndarray):
+        return pot_cards @ CARD_IS_BOUT
+    if isinstance(pot_cards, int):
+        return count_cards(pot_cards & BOUTS_MASK)
+    return sum([_CARD_IS_BOUT[card_id] for card_id in _get_card_ids(pot_cards)])
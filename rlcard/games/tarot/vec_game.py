@@ -0,0 +1,409 @@
+from typing import Union
+
+import numpy as np
+
+from rlcard.games.tarot.alpha_and_omega.dealer import TarotDealer as Dealer, permutations2hands
+from rlcard.games.tarot.bid.bid import BIDS, TarotBid
+from rlcard.games.tarot.utils import BOUTS_MASK, CARD_IS_BOUT, CARD_POINTS, CARD_RANK, CARD_SUIT, CARD_TRUMP_VALUE, \
+    COLOR_MAP, COLOR_MASKS, EXCUSE_ID, KINGS_MASK, NUM_CARDS, TRICK_RANKS, TRUMP_MASK, TRUMPS_ABOVE_MASKS, mask2array
+
+# Game parts, stored as small integers in VecGame.game_parts
+BID, DOG, MAIN, OVER = range(4)
+GAME_PARTS = ('BID', 'DOG', 'MAIN', 'OVER')
+
+TRUMP = COLOR_MAP['TRUMP']
+PASSE_ID = TarotBid.order['PASSE']
+# Card sets used by the legal actions, as (78,) boolean planes
+COLOR_PLANES = np.array([mask2array(color_mask) for color_mask in COLOR_MASKS], dtype=bool)
+TRUMPS_ABOVE_PLANES = np.array([mask2array(trumps_mask) for trumps_mask in TRUMPS_ABOVE_MASKS], dtype=bool)
+DOG_PLANE = mask2array(~TRUMP_MASK & ~KINGS_MASK & ((1 << NUM_CARDS) - 1)).astype(bool)
+DOG_TRUMPS_PLANE = mask2array(TRUMP_MASK & ~BOUTS_MASK).astype(bool)
+# Scoring tables, indexed by bid order or by number of bouts (see TarotJudger and MainGame.get_payoffs)
+BID_VALUES = np.array([bid.get_bid_value() for bid in BIDS])
+WINNING_POINTS = np.array([61, 51, 41, 36])
+ASKED_CONTRACTS = np.array([56, 51, 41, 36])
+
+
+class VecGame(object):
+    """
+    Many tarot games held in arrays, one row per game, and advanced together with vectorized operations. The games
+    follow the same rules as GlobalGame (bids of BidRound, dog of DogRound, tricks of MainRound, scores of TarotJudger
+    and MainGame), each game being possibly in a different part. Hands are (num_games, num_players, 78) boolean planes.
+    """
+
+    def __init__(self, num_games: int, seed: Union[int, np.random.SeedSequence] = None):
+        """
+        Initialize the games
+        :param num_games: number of games played together
+        :param seed: seed of the random generator dealing the cards of all the games (see VecGame.seed)
+        """
+        self.num_games = num_games
+        self.num_players = 4
+        self.num_cards_per_player = 18
+        self.num_cards_dog = 6
+        self.np_random = None
+        self.dealer = None
+        self.starting_players = None
+        self.seed(seed)
+
+        shape = (num_games, self.num_players)
+        self.game_parts = np.full(num_games, OVER, dtype=np.int8)
+        self.current_player_ids = np.zeros(num_games, dtype=np.int64)
+        self.number_of_deals = np.zeros(num_games, dtype=np.int64)
+        # Cards of each player and of the dog, the dog being in the hand of the taking player during the dog part
+        self.hands = np.zeros(shape + (NUM_CARDS,), dtype=bool)
+        self.dogs = np.zeros((num_games, NUM_CARDS), dtype=bool)
+        # Hands dealt good enough to take, see get_legal_bids
+        self.good_hands = np.zeros(shape, dtype=bool)
+        self.new_dogs = np.zeros((num_games, NUM_CARDS), dtype=bool)
+        self.new_dog_sizes = np.zeros(num_games, dtype=np.int64)
+        # Bids, -1 for players that did not speak yet
+        self.bids = np.full(shape, -1, dtype=np.int64)
+        self.taking_player_ids = np.full(num_games, -1, dtype=np.int64)
+        self.taking_bid_orders = np.zeros(num_games, dtype=np.int64)
+        # Tricks: target card and suit (-1 before the first card of the pot), cards in the pot and already played
+        self.target_cards = np.full(num_games, -1, dtype=np.int64)
+        self.led_suits = np.full(num_games, -1, dtype=np.int64)
+        self.highest_trumps = np.full(num_games, -1, dtype=np.int64)
+        self.pot_card_ids = np.full(shape, EXCUSE_ID, dtype=np.int64)
+        self.pots = np.zeros((num_games, NUM_CARDS), dtype=bool)
+        self.played = np.zeros((num_games, NUM_CARDS), dtype=bool)
+        self.num_played = np.zeros(num_games, dtype=np.int64)
+        self.excuse_played = np.zeros(num_games, dtype=bool)
+        # Public information: colors cut (shared by all the players as in MainRound), trumps left, maximal trumps
+        self.cuts_color = np.zeros((num_games, 4), dtype=bool)
+        self.has_trumps = np.ones(shape, dtype=bool)
+        self.max_trump = np.full(shape, 21, dtype=np.int64)
+        # Scores
+        self.points = np.zeros(shape)
+        self.bouts = np.zeros(shape, dtype=np.int64)
+        self.payoffs = np.zeros(shape)
+
+    def seed(self, seed: Union[int, np.random.SeedSequence] = None) -> None:
+        """
+        Set a new random generator for the games, and draw their starting players with it
+        :param seed: int or SeedSequence used to build the generator (fresh entropy if None)
+        """
+        self.np_random = np.random.default_rng(seed)
+        self.dealer = Dealer(self.np_random)
+        self.starting_players = self.np_random.integers(4, size=self.num_games)
+
+    def init_game(self, indexes: np.ndarray = None) -> np.ndarray:
+        """
+        Deal new cards and start the bids in some games
+        :param indexes: indexes of the games to start, typically the games over, all the games if None
+        :return: (num_games,) ids of the players to play
+        """
+        if indexes is None:
+            indexes = np.arange(self.num_games)
+        self.number_of_deals[indexes] = 0
+        self._deal(indexes)
+        return self.current_player_ids
+
+    def step(self, actions: np.ndarray) -> np.ndarray:
+        """
+        Play one action in every game that is not over
+        :param actions: (num_games,) ids of the bids or cards chosen by the current players, ignored for the games over
+        :return: (num_games,) ids of the next players
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        # Games are split before stepping, a game moving to the next part must not be stepped twice
+        steps = [(step, np.flatnonzero(self.game_parts == game_part))
+                 for game_part, step in ((BID, self._step_bid), (DOG, self._step_dog), (MAIN, self._step_main))]
+        for step, indexes in steps:
+            if len(indexes):
+                step(indexes, actions[indexes])
+        return self.current_player_ids
+
+    def _deal(self, indexes: np.ndarray) -> None:
+        """
+        Deal new cards to some games, all players having to bid again from the starting player
+        :param indexes: indexes of the games
+        """
+        permutations = self.dealer.deal_permutations(len(indexes))
+        hands = permutations2hands(permutations, self.num_players, self.num_cards_per_player).astype(bool)
+        self.hands[indexes] = hands[:, :self.num_players]
+        self.dogs[indexes] = hands[:, self.num_players]
+        hand_cards = permutations[:, :self.num_players * self.num_cards_per_player].reshape(
+            len(indexes), self.num_players, self.num_cards_per_player)
+        points_in_hand = CARD_POINTS[hand_cards].sum(axis=2)
+        bouts_in_hand = CARD_IS_BOUT[hand_cards].sum(axis=2)
+        self.good_hands[indexes] = ((points_in_hand >= 35) & (bouts_in_hand >= 2)) | \
+                                   ((points_in_hand >= 30) & (bouts_in_hand == 3))
+        self.bids[indexes] = -1
+        self.taking_player_ids[indexes] = -1
+        self.taking_bid_orders[indexes] = 0
+        self.points[indexes] = 0
+        self.bouts[indexes] = 0
+        self.payoffs[indexes] = 0
+        self.game_parts[indexes] = BID
+        self.current_player_ids[indexes] = self.starting_players[indexes]
+
+    def _step_bid(self, indexes: np.ndarray, bids: np.ndarray) -> None:
+        """
+        Play bids, as BidRound.proceed_round: the first bid other than PASSE wins, and the cards are dealt again when
+        all the players passed
+        :param indexes: indexes of the games in the bid part
+        :param bids: ids of the bids said by their current players
+        """
+        player_ids = self.current_player_ids[indexes]
+        self.bids[indexes, player_ids] = bids
+        is_taking = bids != PASSE_ID
+
+        taking_indexes = indexes[is_taking]
+        self.taking_player_ids[taking_indexes] = player_ids[is_taking]
+        self.taking_bid_orders[taking_indexes] = bids[is_taking]
+        # The dog is shown and done by the taking player, except for GARDE_SANS and GARDE_CONTRE
+        with_dog = self.taking_bid_orders[taking_indexes] < 4
+        dog_indexes = taking_indexes[with_dog]
+        self.game_parts[dog_indexes] = DOG
+        self.current_player_ids[dog_indexes] = self.taking_player_ids[dog_indexes]
+        self.hands[dog_indexes, self.taking_player_ids[dog_indexes]] |= self.dogs[dog_indexes]
+        self.new_dogs[dog_indexes] = False
+        self.new_dog_sizes[dog_indexes] = 0
+        main_indexes = taking_indexes[~with_dog]
+        self.new_dogs[main_indexes] = self.dogs[main_indexes]
+        self._start_main(main_indexes)
+
+        passing_indexes = indexes[~is_taking]
+        is_dead = (self.bids[passing_indexes] == PASSE_ID).sum(axis=1) == self.num_players
+        dead_indexes = passing_indexes[is_dead]
+        self.number_of_deals[dead_indexes] += 1
+        self._deal(dead_indexes)
+        alive_indexes = passing_indexes[~is_dead]
+        self.current_player_ids[alive_indexes] = (self.current_player_ids[alive_indexes] + 1) % self.num_players
+
+    def _step_dog(self, indexes: np.ndarray, card_ids: np.ndarray) -> None:
+        """
+        Put cards in the dog, as DogRound.proceed_round
+        :param indexes: indexes of the games in the dog part
+        :param card_ids: ids of the cards chosen by the taking players
+        """
+        player_ids = self.taking_player_ids[indexes]
+        if not self.hands[indexes, player_ids, card_ids].all():
+            raise ValueError('Cards put in the dog should be in the hand of the taking player')
+        self.hands[indexes, player_ids, card_ids] = False
+        self.new_dogs[indexes, card_ids] = True
+        self.new_dog_sizes[indexes] += 1
+        self._start_main(indexes[self.new_dog_sizes[indexes] == self.num_cards_dog])
+
+    def _start_main(self, indexes: np.ndarray) -> None:
+        """
+        Start the tricks of some games, as MainRound.__init__
+        :param indexes: indexes of the games
+        """
+        self.game_parts[indexes] = MAIN
+        self.current_player_ids[indexes] = self.starting_players[indexes]
+        self.target_cards[indexes] = -1
+        self.led_suits[indexes] = -1
+        self.highest_trumps[indexes] = -1
+        self.pot_card_ids[indexes] = EXCUSE_ID
+        self.pots[indexes] = False
+        self.played[indexes] = False
+        self.num_played[indexes] = 0
+        self.excuse_played[indexes] = False
+        self.cuts_color[indexes] = False
+        self.has_trumps[indexes] = True
+        self.max_trump[indexes] = 21
+
+    def _step_main(self, indexes: np.ndarray, card_ids: np.ndarray) -> None:
+        """
+        Play cards, as MainRound.proceed_round
+        :param indexes: indexes of the games in the main part
+        :param card_ids: ids of the cards played by their current players
+        """
+        player_ids = self.current_player_ids[indexes]
+        if not self.hands[indexes, player_ids, card_ids].all():
+            raise ValueError('Played cards should be in the hand of the current player')
+
+        # The excuse stays with its player, its points being given back by the winner of the pot
+        is_excuse = card_ids == EXCUSE_ID
+        self.points[indexes[is_excuse], player_ids[is_excuse]] += 4
+        self.bouts[indexes[is_excuse], player_ids[is_excuse]] += 1
+        self.excuse_played[indexes[is_excuse]] = True
+        self.hands[indexes, player_ids, card_ids] = False
+
+        # When starting a new pot
+        is_target = (self.target_cards[indexes] < 0) & ~is_excuse
+        target_indexes = indexes[is_target]
+        self.highest_trumps[target_indexes] = -1
+        self.target_cards[target_indexes] = card_ids[is_target]
+        self.led_suits[target_indexes] = CARD_SUIT[card_ids[is_target]]
+
+        # Players cutting, or without trumps anymore
+        suits = CARD_SUIT[card_ids]
+        target_suits = CARD_SUIT[self.target_cards[indexes]]
+        is_trump = suits == TRUMP
+        is_other_color = (self.target_cards[indexes] >= 0) & (suits != target_suits)
+        is_cut = is_other_color & is_trump
+        self.cuts_color[indexes[is_cut], target_suits[is_cut]] = True
+        is_discard = is_other_color & ~is_trump
+        self.has_trumps[indexes[is_discard], player_ids[is_discard]] = False
+
+        # Players under-cutting
+        trump_values = CARD_TRUMP_VALUE[card_ids].astype(np.int64)
+        highest_trumps = self.highest_trumps[indexes]
+        is_under = is_trump & (highest_trumps > trump_values)
+        under_indexes, under_player_ids = indexes[is_under], player_ids[is_under]
+        self.max_trump[under_indexes, under_player_ids] = np.minimum(highest_trumps[is_under],
+                                                                     self.max_trump[under_indexes, under_player_ids])
+
+        self.played[indexes, card_ids] = True
+        self.pots[indexes, card_ids] = True
+        self.pot_card_ids[indexes, player_ids] = card_ids
+        self.num_played[indexes] += 1
+        self.highest_trumps[indexes] = np.where(is_trump, np.maximum(highest_trumps, trump_values), highest_trumps)
+        self.current_player_ids[indexes] = (player_ids + 1) % self.num_players
+
+        # When pot is over, the winner gets the points and starts the next pot
+        pot_indexes = indexes[self.num_played[indexes] % self.num_players == 0]
+        pot_card_ids = self.pot_card_ids[pot_indexes]
+        winner_ids = TRICK_RANKS[self.led_suits[pot_indexes][:, None], pot_card_ids].argmax(axis=1)
+        excuse_played = self.excuse_played[pot_indexes]
+        self.points[pot_indexes, winner_ids] += CARD_POINTS[pot_card_ids].sum(axis=1) - 4 * excuse_played
+        self.bouts[pot_indexes, winner_ids] += CARD_IS_BOUT[pot_card_ids].sum(axis=1) - excuse_played
+        self.excuse_played[pot_indexes] = False
+        self.target_cards[pot_indexes] = -1
+        self.led_suits[pot_indexes] = -1
+        self.pots[pot_indexes] = False
+        self.current_player_ids[pot_indexes] = winner_ids
+        self._end_games(pot_indexes[self.num_played[pot_indexes] == self.num_players * self.num_cards_per_player])
+
+    def _end_games(self, indexes: np.ndarray) -> None:
+        """
+        Judge the games whose cards have all been played and compute their payoffs, as TarotJudger.judge_winner and
+        MainGame.get_payoffs
+        :param indexes: indexes of the games
+        """
+        taking_player_ids = self.taking_player_ids[indexes]
+        taking_bid_orders = self.taking_bid_orders[indexes]
+        points = self.points[indexes, taking_player_ids]
+        bouts = self.bouts[indexes, taking_player_ids]
+        # The dog belongs to the taking player, except for GARDE_CONTRE
+        with_dog = taking_bid_orders <= 4
+        new_dogs = self.new_dogs[indexes]
+        counts = points + with_dog * (new_dogs @ CARD_POINTS)
+        number_bouts = bouts + with_dog * (new_dogs @ CARD_IS_BOUT.astype(np.int64))
+        taker_winner = np.where(counts >= WINNING_POINTS[number_bouts], 1, -1)
+        # Scores only count the points and bouts won during the tricks
+        additional_points = np.abs(np.trunc((points - ASKED_CONTRACTS[np.minimum(bouts, 3)]) / 10))
+        total_contract_points = BID_VALUES[taking_bid_orders] + additional_points
+        self.payoffs[indexes] = (- total_contract_points * taker_winner)[:, None]
+        self.payoffs[indexes, taking_player_ids] = 3 * total_contract_points * taker_winner
+        self.game_parts[indexes] = OVER
+
+    def get_legal_actions_mask(self) -> np.ndarray:
+        """
+        Get the legal actions of the current players, as the get_legal_actions_mask of each game part
+        :return: (num_games, 78) boolean array, with the legal bid or card ids set, and no action for the games over
+        """
+        legal_masks = np.zeros((self.num_games, NUM_CARDS), dtype=bool)
+        player_ids = self.current_player_ids
+
+        # Bids: PETITE is forced for the good hands, see get_legal_bids
+        indexes = np.flatnonzero(self.game_parts == BID)
+        is_good = self.good_hands[indexes, player_ids[indexes]]
+        legal_masks[indexes, np.where(is_good, TarotBid.order['PETITE'], PASSE_ID)] = True
+
+        # Dog: no trumps and no kings, or trumps except bouts otherwise, see get_legal_dog_mask
+        indexes = np.flatnonzero(self.game_parts == DOG)
+        hands = self.hands[indexes, player_ids[indexes]]
+        legal = hands & DOG_PLANE
+        legal_masks[indexes] = np.where(legal.any(axis=1)[:, None], legal, hands & DOG_TRUMPS_PLANE)
+
+        # Tricks: follow the target color, or overtrump, or undertrump, or play anything, see MainRound
+        indexes = np.flatnonzero(self.game_parts == MAIN)
+        hands = self.hands[indexes, player_ids[indexes]]
+        led_suits = self.led_suits[indexes]
+        legal = hands & COLOR_PLANES[led_suits] & (led_suits != TRUMP)[:, None]
+        for fallback in (hands & TRUMPS_ABOVE_PLANES[self.highest_trumps[indexes] + 1], hands & COLOR_PLANES[TRUMP],
+                         hands):
+            legal = np.where(legal.any(axis=1)[:, None], legal, fallback)
+        legal_masks[indexes] = np.where((led_suits < 0)[:, None], hands, legal)
+        return legal_masks
+
+    def get_obs(self) -> np.ndarray:
+        """
+        Encode the states of the current players, as TarotEnv.extract_state
+        :return: (num_games, 7, 5, 22) int array, zero for the games over
+        """
+        obs = np.zeros((self.num_games, 7, 5, 22), dtype=int)
+        player_ids = self.current_player_ids
+
+        # Bids: hand, own bid and number of each bid said by the other players
+        indexes = np.flatnonzero(self.game_parts == BID)
+        bid_player_ids = player_ids[indexes]
+        self._encode_cards(obs, indexes, 1, self.hands[indexes, bid_player_ids])
+        own_bids = self.bids[indexes, bid_player_ids]
+        obs[indexes[own_bids >= 0], 2, 0, own_bids[own_bids >= 0]] = 1
+        for offset in range(1, self.num_players):
+            other_bids = self.bids[indexes, (bid_player_ids + offset) % self.num_players]
+            np.add.at(obs, (indexes[other_bids >= 0], 2, 1, other_bids[other_bids >= 0]), 1)
+
+        # Dog: all the cards of the taking player, bid, new dog and hands of the other players
+        indexes = np.flatnonzero(self.game_parts == DOG)
+        obs[indexes, 0, 0, 0] = 1
+        hands = self.hands[indexes, player_ids[indexes]]
+        self._encode_cards(obs, indexes, 1, hands)
+        obs[indexes, 2, 0, self.taking_bid_orders[indexes]] = 1
+        self._encode_cards(obs, indexes, 3, self.new_dogs[indexes])
+        self._encode_cards(obs, indexes, 4, self.hands[indexes].any(axis=1) & ~hands)
+
+        # Tricks: hand, target card, pot, played cards, unknown cards and public information on the players
+        indexes = np.flatnonzero(self.game_parts == MAIN)
+        obs[indexes, 0, 0, 0] = 2
+        hands = self.hands[indexes, player_ids[indexes]]
+        self._encode_cards(obs, indexes, 1, hands)
+        target_cards = self.target_cards[indexes]
+        has_target = target_cards >= 0
+        obs[indexes[has_target], 2, CARD_SUIT[target_cards[has_target]], CARD_RANK[target_cards[has_target]]] = 1
+        self._encode_cards(obs, indexes, 3, self.pots[indexes])
+        self._encode_cards(obs, indexes, 4, self.played[indexes])
+        # The dog stays unknown when it has not been shown
+        hidden_dogs = self.dogs[indexes] & (self.taking_bid_orders[indexes] >= 4)[:, None]
+        self._encode_cards(obs, indexes, 5, (self.hands[indexes].any(axis=1) & ~hands) | hidden_dogs)
+        obs[indexes, 6, :self.num_players, 0:4] = self.cuts_color[indexes][:, None, :]
+        obs[indexes, 6, :self.num_players, 4] = self.has_trumps[indexes]
+        obs[indexes, 6, :self.num_players, 5] = self.max_trump[indexes]
+        return obs
+
+    @staticmethod
+    def _encode_cards(obs: np.ndarray, indexes: np.ndarray, index_to_encode: int, cards: np.ndarray) -> None:
+        """
+        Encode sets of cards into one plane of the observations, as encode_mask
+        :param obs: (num_games, 7, 5, 22) observations
+        :param indexes: indexes of the games to encode
+        :param index_to_encode: index of the plane
+        :param cards: (len(indexes), 78) boolean array of the cards to encode
+        """
+        obs[indexes[:, None], index_to_encode, CARD_SUIT, CARD_RANK] = cards
+
+    def is_over(self) -> np.ndarray:
+        """
+        :return: (num_games,) boolean array, True for the games over
+        """
+        return self.game_parts == OVER
+
+    def get_payoffs(self) -> np.ndarray:
+        """
+        :return: (num_games, num_players) payoffs of the games, 0 for the games not over
+        """
+        return self.payoffs
+
+    def get_player_num(self) -> int:
+        """
+        Return the number of players in Tarot
+        :return: (int): The number of players in the game
+        """
+        return self.num_players
+
+
+def sample_legal_actions(legal_masks: np.ndarray, np_random: np.random.Generator) -> np.ndarray:
+    """
+    Draw uniformly one legal action in each row of a legal actions mask, as a random agent would do
+    :param legal_masks: (N, num_actions) boolean array
+    :param np_random: random generator
+    :return: (N,) chosen action ids, 0 for the rows without legal actions
+    """
+    choices = (np_random.random(len(legal_masks)) * legal_masks.sum(axis=1)).astype(np.int64)
+    return (legal_masks.cumsum(axis=1, dtype=np.int8) > choices[:, None]).argmax(axis=1)
@@ -0,0 +1,88 @@
+""" Wrappers of pretrained models, run with NumPy only
+"""
+
+import os
+
+import numpy as np
+
+import rlcard
+from rlcard.agents.dqn_actor_learner import ActorAgent
+from rlcard.agents.random_agent import RandomAgent
+from rlcard.agents.replay_memory import Normalizer
+from rlcard.models.model import Model
+from rlcard.utils.checkpoint import latest_checkpoint, load_mlp_weights
+
+# Root path of pretrianed models
+ROOT_PATH = os.path.join(rlcard.__path__[0], 'models/pretrained')
+
+# Set the the number of steps for collecting normalization statistics, and the epsilon decay schedule of the agents,
+# as in pretrained_models_tarot_v_
+norm_step = 1000
+epsilons = np.linspace(1.0, 0.1, 20000)
+
+
+class TarotNumpyDQNModel(Model):
+    """ A pretrained model on Tarot with DQN, loaded from the checkpoints of the TensorFlow models of
+        pretrained_models_tarot_v_ without TensorFlow. The weights are memory-mapped: the processes loading the same
+        checkpoint share one copy of them.
+    """
+
+    def __init__(self, version, seed=None):
+        """ Load pretrained model
+
+        :param version: The version of the model, the checkpoint being in models/pretrained/tarot_v<version>
+        :param seed: The seed of the agent and of the random games setting its normalizer
+        """
+        super().__init__()
+        check_point_path = os.path.join(ROOT_PATH, 'tarot_v{}'.format(version))
+        checkpoint_prefix = latest_checkpoint(check_point_path)
+        if checkpoint_prefix is None:
+            raise ValueError('No checkpoint in {}'.format(check_point_path))
+        agent_seed, env_seed = np.random.SeedSequence(seed).spawn(2)
+
+        env = rlcard.make('tarot')
+        self.dqn_agent = ActorAgent(env.action_num, epsilons, seed=agent_seed)
+        self.dqn_agent.q_estimator.set_weights(load_mlp_weights(checkpoint_prefix, scope='dqn_q'))
+        normalize(env, self.dqn_agent, norm_step, env_seed)
+
+    @property
+    def agents(self) -> ActorAgent:
+        """
+         Get a list of agents for each position in a the game
+        :return: agents (list): A list of agents or an agent
+        Note: Each agent should be just like RL agent with step and eval_step
+              functioning well.
+        """
+        return self.dqn_agent
+
+    @property
+    def use_raw(self) -> bool:
+        """
+        Indicate whether use raw state and action
+        :return: (boolean): True if using raw state and action
+        """
+        return False
+
+
+def normalize(e, agent: ActorAgent, num: int, seed=None) -> None:
+    """
+    Set the normalizer of the agent with random games, like the normalize function of pretrained_models_tarot_v_ does
+    for a DQNAgent: the statistics are the ones of the first num states of the games, and the agent counts all the
+    transitions of the games
+    :param e: AN Env class
+    :param agent: An ActorAgent object
+    :param num: The number of steps to be normalized
+    :param seed: The seed of the environment and of the random agents
+    :return:
+    """
+    env_seed, agents_seed = np.random.SeedSequence(seed).spawn(2)
+    e.seed(env_seed)
+    e.set_agents([RandomAgent(e.action_num, seed=agent_seed) for agent_seed in agents_seed.spawn(e.player_num)])
+    states = []
+    while len(states) < num:
+        trajectories, _ = e.run(is_training=False)
+        states.extend(ts[0]['obs'] for tra in trajectories for ts in tra)
+    agent.total_t += len(states)
+    normalizer = Normalizer()
+    normalizer.append_batch(states[:num])
+    agent.mean, agent.std = normalizer.mean, normalizer.std
@@ -0,0 +1,206 @@
+""" Read TensorFlow checkpoints without TensorFlow
+
+A checkpoint saved by tf.compat.v1.train.Saver is made of an index, a table mapping the name of each variable to the
+position of its value, and of data shards holding the raw values. The index is read here with the standard library,
+and the values are memory-mapped, so that the processes loading the same checkpoint share one copy of it.
+"""
+
+import os
+import re
+import struct
+
+import numpy as np
+
+# Magic number ending the table of the index (LevelDB table format)
+TABLE_MAGIC = 0xdb4775248b80fb57
+
+# NumPy types of the TensorFlow DataType enum values
+DTYPES = {1: np.float32, 2: np.float64, 3: np.int32, 4: np.uint8, 5: np.int16, 6: np.int8, 9: np.int64,
+          10: np.bool_, 17: np.uint16, 19: np.float16}
+
+
+def latest_checkpoint(checkpoint_dir):
+    """ Get the prefix of the last checkpoint of a directory, like tf.train.latest_checkpoint
+
+    Args:
+        checkpoint_dir (str): the directory of the checkpoints
+
+    Returns:
+        (str): the path prefix of the checkpoint files, None if the directory has no checkpoint
+    """
+    state_path = os.path.join(checkpoint_dir, 'checkpoint')
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path) as state_file:
+        match = re.search(r'^model_checkpoint_path: "(.*)"$', state_file.read(), re.MULTILINE)
+    if match is None:
+        return None
+    return os.path.join(checkpoint_dir, match.group(1))
+
+
+def read_index(checkpoint_prefix):
+    """ Read the index of a checkpoint
+
+    Args:
+        checkpoint_prefix (str): the path prefix of the checkpoint files, see latest_checkpoint
+
+    Returns:
+        num_shards (int): the number of data shards
+        entries (dict): the (dtype, shape, shard_id, offset) of each variable, by name
+    """
+    with open(checkpoint_prefix + '.index', 'rb') as index_file:
+        table = index_file.read()
+    if len(table) < 48 or struct.unpack('<Q', table[-8:])[0] != TABLE_MAGIC:
+        raise ValueError('{}.index is not a checkpoint index'.format(checkpoint_prefix))
+    # The footer holds the handles of the metaindex and index blocks
+    _, position = _read_varint(table, len(table) - 48)
+    _, position = _read_varint(table, position)
+    index_offset, position = _read_varint(table, position)
+    index_size, _ = _read_varint(table, position)
+
+    num_shards = 1
+    entries = {}
+    for _, handle in _read_block(table, index_offset, index_size):
+        block_offset, position = _read_varint(handle, 0)
+        block_size, _ = _read_varint(handle, position)
+        for name, value in _read_block(table, block_offset, block_size):
+            fields = _read_proto(value)
+            if name == b'':
+                # Header of the bundle
+                num_shards = fields.get(1, [1])[0]
+                continue
+            if 7 in fields:
+                raise ValueError('Partitioned variables are not supported: {}'.format(name.decode()))
+            dtype = fields.get(1, [0])[0]
+            if dtype not in DTYPES:
+                raise ValueError('Unsupported type {} of {}'.format(dtype, name.decode()))
+            shape = tuple(_read_proto(dim).get(1, [0])[0] for dim in _read_proto(fields.get(2, [b''])[0]).get(2, []))
+            entries[name.decode()] = (np.dtype(DTYPES[dtype]), shape, fields.get(3, [0])[0], fields.get(4, [0])[0])
+    return num_shards, entries
+
+
+def load_variables(checkpoint_prefix, names):
+    """ Memory-map the values of variables of a checkpoint
+
+    Args:
+        checkpoint_prefix (str): the path prefix of the checkpoint files, see latest_checkpoint
+        names (list): the names of the variables
+
+    Returns:
+        (list): the read-only numpy.memmap values of the variables, in the order of names
+    """
+    num_shards, entries = read_index(checkpoint_prefix)
+    variables = []
+    for name in names:
+        if name not in entries:
+            raise KeyError('{} is not in the checkpoint {}'.format(name, checkpoint_prefix))
+        dtype, shape, shard_id, offset = entries[name]
+        data_path = '{}.data-{:05d}-of-{:05d}'.format(checkpoint_prefix, shard_id, num_shards)
+        variables.append(np.memmap(data_path, dtype=dtype, mode='r', offset=offset, shape=shape))
+    return variables
+
+
+def load_mlp_weights(checkpoint_prefix, scope):
+    """ Memory-map the weights of an MLP built with tf.contrib.layers.fully_connected, like the network of
+        rlcard.agents.dqn_agent.Estimator
+
+    Args:
+        checkpoint_prefix (str): the path prefix of the checkpoint files, see latest_checkpoint
+        scope (str): the variable scope of the network, for instance 'dqn_q' for the Q network of a DQNAgent of scope
+          'dqn'
+
+    Returns:
+        (list): kernel and bias of each layer, from the input to the output layer, see NumpyEstimator
+    """
+    _, entries = read_index(checkpoint_prefix)
+    pattern = re.compile(r'^{}/fully_connected(?:_(\d+))?/weights$'.format(re.escape(scope)))
+    layers = sorted((int(match.group(1) or 0), match.group(0)[:-len('/weights')])
+                    for match in map(pattern.match, entries) if match is not None)
+    if not layers:
+        raise KeyError('No fully connected layer in the scope {} of {}'.format(scope, checkpoint_prefix))
+    return load_variables(checkpoint_prefix, [layer + suffix for _, layer in layers
+                                              for suffix in ('/weights', '/biases')])
+
+
+def _read_varint(buffer, position):
+    """ Decode a base 128 varint
+
+    Args:
+        buffer (bytes): the encoded data
+        position (int): the position of the varint
+
+    Returns:
+        value (int): the decoded value
+        position (int): the position following the varint
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = buffer[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def _read_block(table, offset, size):
+    """ Decode the entries of a block of a table
+
+    Args:
+        table (bytes): the table
+        offset (int): the position of the block
+        size (int): the size of the block, without its trailer
+
+    Returns:
+        (list): the (key, value) entries of the block
+    """
+    if table[offset + size] != 0:
+        raise ValueError('Compressed checkpoint indexes are not supported')
+    block = table[offset:offset + size]
+    num_restarts = struct.unpack('<I', block[-4:])[0]
+    end = len(block) - 4 * (num_restarts + 1)
+    entries = []
+    key = b''
+    position = 0
+    while position < end:
+        shared, position = _read_varint(block, position)
+        non_shared, position = _read_varint(block, position)
+        value_size, position = _read_varint(block, position)
+        key = key[:shared] + block[position:position + non_shared]
+        position += non_shared
+        entries.append((key, block[position:position + value_size]))
+        position += value_size
+    return entries
+
+
+def _read_proto(buffer):
+    """ Decode the fields of a protocol buffer message
+
+    Args:
+        buffer (bytes): the encoded message
+
+    Returns:
+        (dict): the values of each field number, integers for scalar fields and bytes for the others
+    """
+    fields = {}
+    position = 0
+    while position < len(buffer):
+        tag, position = _read_varint(buffer, position)
+        wire_type = tag & 0x7
+        if wire_type == 0:
+            value, position = _read_varint(buffer, position)
+        elif wire_type == 1:
+            value = struct.unpack('<Q', buffer[position:position + 8])[0]
+            position += 8
+        elif wire_type == 2:
+            size, position = _read_varint(buffer, position)
+            value = buffer[position:position + size]
+            position += size
+        elif wire_type == 5:
+            value = struct.unpack('<I', buffer[position:position + 4])[0]
+            position += 4
+        else:
+            raise ValueError('Unsupported wire type {}'.format(wire_type))
+        fields.setdefault(tag >> 3, []).append(value)
+    return fields
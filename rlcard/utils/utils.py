@@ -68,6 +68,32 @@ def remove_illegal(action_probs: np.ndarray, legal_actions: List[int]) -> np.nda
     return probs
 
 
+def remove_illegal_batch(action_probs: np.ndarray, legal_masks: np.ndarray) -> np.ndarray:
+    """
+    Remove illegal actions and normalize the probability vectors of several states, like remove_illegal
+    :param action_probs: (numpy.array): A (N, action_num) array.
+    :param legal_masks: (numpy.array): A (N, action_num) boolean array, True for the legal actions.
+    :return: (numpy.array): The normalized probabilities, uniform over the legal actions of the rows whose legal
+        actions all had a probability of 0.
+    """
+    probs = np.where(legal_masks, action_probs, 0)
+    sums = probs.sum(axis=1, keepdims=True)
+    uniform_probs = legal_masks / legal_masks.sum(axis=1, keepdims=True)
+    return np.where(sums > 0, probs / np.where(sums > 0, sums, 1), uniform_probs)
+
+
+def sample_actions(action_probs: np.ndarray, np_random=np.random) -> np.ndarray:
+    """
+    Draw one action for each row of a probability array
+    :param action_probs: (numpy.array): A (N, action_num) array, each row summing to 1.
+    :param np_random: random generator (numpy.random.Generator or the numpy.random module)
+    :return: (numpy.array): The (N,) action ids.
+    """
+    cumulative_probs = action_probs.cumsum(axis=1)
+    values = np_random.random(len(action_probs)) * cumulative_probs[:, -1]
+    return (cumulative_probs > values[:, np.newaxis]).argmax(axis=1)
+
+
 def time_difference_good_format(t1: float, t2: float) -> str:
     """
     From two seconds time, compute the difference and give a relevant string of that time delta
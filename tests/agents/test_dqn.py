@@ -71,5 +71,39 @@ class TestDQN(unittest.TestCase):
         self.assertGreaterEqual(predicted_action, 0)
         self.assertLessEqual(predicted_action, 1)
 
+        legal_masks = np.array([[True, False], [False, True], [True, True]])
+        actions = agent.step_batch(np.random.random_sample((3, 2)), legal_masks)
+        self.assertTrue(legal_masks[np.arange(3), actions].all())
+        actions = agent.eval_step_batch(np.random.random_sample((3, 2)), legal_masks)
+        self.assertTrue(legal_masks[np.arange(3), actions].all())
+
+        sess.close()
+        tf.reset_default_graph()
+
+    def test_train_prioritized_replay(self):
+
+        sess = tf.InteractiveSession()
+        tf.Variable(0, name='global_step', trainable=False)
+        agent = DQNAgent(sess=sess,
+                         scope='dqn',
+                         replay_memory_size=500,
+                         replay_memory_init_size=100,
+                         update_target_estimator_every=100,
+                         norm_step=100,
+                         state_shape=[2],
+                         mlp_layers=[10, 10],
+                         prioritized_replay=True)
+        sess.run(tf.global_variables_initializer())
+
+        for step in range(300):
+            ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': [0, 1]}, np.random.randint(2), step % 2,
+                  {'obs': np.random.random_sample((2,)), 'legal_actions': [0, 1]}, True]
+            agent.feed(ts)
+            if step > 200:
+                agent.train()
+
+        self.assertGreater(agent.memory.max_priority, 0)
+        self.assertAlmostEqual(agent.memory.tree.total, agent.memory.tree[np.arange(200)].sum())
+
         sess.close()
         tf.reset_default_graph()
@@ -0,0 +1,118 @@
+import unittest
+import numpy as np
+
+from rlcard.agents.dqn_actor_learner import ActorAgent, ActorLearner, SharedWeights
+from rlcard.agents.replay_memory import Memory, Normalizer
+from rlcard.agents.numpy_estimator import NumpyEstimator
+
+
+class LinearAgent(object):
+    """ Learning agent with a linear Q network, whose training step only shifts the biases
+    """
+
+    def __init__(self, action_num, state_shape, norm_step, replay_memory_init_size):
+        self.action_num = action_num
+        self.norm_step = norm_step
+        self.replay_memory_init_size = replay_memory_init_size
+        self.epsilons = np.linspace(1.0, 0.1, 100)
+        self.normalizer = Normalizer()
+        self.weights = [np.zeros((int(np.prod(state_shape)), action_num), dtype=np.float32),
+                        np.zeros(action_num, dtype=np.float32)]
+        self.memory = Memory(1000, 4)
+        self.total_t = 0
+        self.train_t = 0
+
+    def get_weights(self):
+        return [weight.copy() for weight in self.weights]
+
+    def feed(self, ts):
+        if self.total_t < self.norm_step:
+            self.normalizer.append(ts[0]['obs'])
+        else:
+            self.memory.save(ts[0]['obs'], ts[1], ts[2], ts[3]['obs'], ts[4])
+        self.total_t += 1
+
+    def train(self):
+        self.weights[1] += 1
+        self.train_t += 1
+
+
+class TestDQNActorLearner(unittest.TestCase):
+
+    def test_numpy_estimator(self):
+        np_random = np.random.default_rng(0)
+        weights = [np_random.normal(size=(6, 4)), np_random.normal(size=4), np_random.normal(size=(4, 3)),
+                   np_random.normal(size=3)]
+        s = np_random.normal(size=(5, 2, 3))
+        expected = np.tanh(s.reshape(5, 6) @ weights[0] + weights[1]) @ weights[2] + weights[3]
+        self.assertTrue(np.allclose(NumpyEstimator(weights).predict(s), expected))
+
+    def test_shared_weights(self):
+        shared_weights = SharedWeights([(6, 3), (3,)], [2, 3])
+        agent = ActorAgent(3, np.linspace(1.0, 0.1, 10), seed=0)
+        self.assertFalse(agent.sync(shared_weights))
+        shared_weights.publish([np.ones((6, 3)), np.arange(3)], None, None, 0, 4)
+        self.assertTrue(agent.sync(shared_weights))
+        self.assertFalse(agent.sync(shared_weights))
+        self.assertEqual(agent.version, 1)
+        self.assertEqual(agent.total_t, 4)
+        self.assertIsNone(agent.mean)
+        self.assertEqual(agent.eval_step({'obs': np.ones((2, 3)), 'legal_actions': [0, 1, 2]}), 2)
+        self.assertEqual(agent.eval_step({'obs': np.ones((2, 3)), 'legal_actions': [0, 1]}), 1)
+
+        shared_weights.publish([np.ones((6, 3)), np.zeros(3)], np.full((2, 3), 2), np.ones((2, 3)), 1, 20)
+        self.assertTrue(agent.sync(shared_weights))
+        self.assertTrue(np.allclose(agent.normalize(np.full((2, 3), 3)), 1))
+        # Epsilon reached its final value: the greedy action is chosen with probability 0.9 + 0.1 / 3
+        self.assertAlmostEqual(agent.predict(np.ones((2, 3))).max(), 0.9 + 0.1 / 3)
+
+    def test_step_batch(self):
+        agent = ActorAgent(3, np.linspace(1.0, 0.0, 2), seed=0)
+        agent.q_estimator.set_weights([np.zeros((2, 3)), np.array([0., 2., 1.])])
+        obs = np.zeros((1000, 2))
+        legal_masks = np.tile([True, True, False], (1000, 1))
+        self.assertEqual(list(np.bincount(agent.eval_step_batch(obs, legal_masks), minlength=3)), [0, 1000, 0])
+        # Epsilon of 1: uniform over the legal actions
+        counts = np.bincount(agent.step_batch(obs, legal_masks), minlength=3)
+        self.assertEqual(counts[2], 0)
+        self.assertAlmostEqual(counts[0] / 1000, 0.5, delta=0.07)
+        # Epsilon of 0: greedy, uniform over the legal actions when the greedy action is illegal
+        agent.total_t = 1
+        self.assertEqual(list(np.bincount(agent.step_batch(obs, legal_masks), minlength=3)), [0, 1000, 0])
+        agent.q_estimator.set_weights([np.zeros((2, 3)), np.array([0., 1., 2.])])
+        self.assertEqual(list(np.bincount(agent.eval_step_batch(obs, legal_masks), minlength=3)), [0, 1000, 0])
+        counts = np.bincount(agent.step_batch(obs, legal_masks), minlength=3)
+        self.assertEqual(counts[2], 0)
+        self.assertAlmostEqual(counts[0] / 1000, 0.5, delta=0.07)
+
+    def test_run(self):
+        agent = LinearAgent(78, [7, 5, 22], norm_step=10, replay_memory_init_size=10)
+        with ActorLearner(agent, num_actors=2, publish_every=5, seed=0) as actor_learner:
+            payoffs = list(actor_learner.run(3))
+            self.assertEqual(len(payoffs), 3)
+            self.assertEqual(actor_learner.episode, 3)
+            self.assertEqual(actor_learner.timestep, agent.total_t)
+            self.assertEqual(agent.train_t, agent.total_t - 20)
+            self.assertEqual(len(agent.memory), agent.total_t - 10)
+            self.assertEqual(agent.memory.sample()[0].shape, (4, 7, 5, 22))
+            _, weights, mean, _, total_t = actor_learner.shared_weights.read()
+            self.assertEqual(weights[1][0], agent.train_t - agent.train_t % 5)
+            self.assertEqual(mean.shape, (7, 5, 22))
+        self.assertEqual(actor_learner.actors, [])
+
+    def test_run_shared_memory(self):
+        agent = LinearAgent(78, [7, 5, 22], norm_step=10, replay_memory_init_size=10)
+        with ActorLearner(agent, num_actors=2, publish_every=5, shared_memory=True, seed=0) as actor_learner:
+            list(actor_learner.run(4))
+            self.assertEqual(actor_learner.timestep, agent.total_t)
+            self.assertEqual(agent.train_t, agent.total_t - 20)
+            # The actors may have saved the transitions of games still in the queue
+            self.assertGreaterEqual(len(agent.memory), agent.total_t - 10)
+            state_batch, action_batch, _, _, _ = agent.memory.sample()
+            self.assertEqual(state_batch.shape, (4, 7, 5, 22))
+            self.assertTrue((action_batch < 78).all())
+        agent.memory.unlink()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import multiprocessing
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.dqn_actor_learner import ActorAgent
+from rlcard.agents.inference_server import InferenceServer
+
+
+def play(client, game_num, is_training, results):
+    env = rlcard.make('tarot')
+    env.set_agents([client] * env.player_num)
+    legal = True
+    for _ in range(game_num):
+        trajectories, _ = env.run(is_training=is_training)
+        legal &= all(action in state['legal_actions'] for trajectory in trajectories
+                     for state, action, _, _, _ in trajectory)
+    results.put(legal)
+
+
+class TestInferenceServer(unittest.TestCase):
+
+    def test_step(self):
+        agent = ActorAgent(3, np.linspace(1.0, 0.0, 2), seed=0)
+        agent.q_estimator.set_weights([np.zeros((2, 3)), np.array([0., 2., 1.])])
+        server = InferenceServer(agent, [2], num_clients=2)
+        with server:
+            client = server.client(1)
+            self.assertEqual(client.eval_step({'obs': np.zeros(2), 'legal_actions': [0, 1]}), 1)
+            self.assertEqual(client.eval_step({'obs': np.zeros(2), 'legal_actions': [0, 2]}), 2)
+            self.assertIn(client.step({'obs': np.zeros(2), 'legal_actions': [0, 2]}), [0, 2])
+        self.assertEqual(server.request_num, 3)
+        self.assertEqual(server.batch_num, 3)
+        with self.assertRaises(RuntimeError):
+            client.eval_step({'obs': np.zeros(2), 'legal_actions': [0, 1]})
+        with self.assertRaises(ValueError):
+            server.client(2)
+
+    def test_workers(self):
+        env = rlcard.make('tarot')
+        agent = ActorAgent(env.action_num, np.linspace(1.0, 0.1, 10), seed=0)
+        np_random = np.random.default_rng(0)
+        agent.q_estimator.set_weights([np_random.normal(size=(int(np.prod(env.state_shape)), 8)), np.zeros(8),
+                                       np_random.normal(size=(8, env.action_num)), np.zeros(env.action_num)])
+        num_workers = 3
+        results = multiprocessing.Queue()
+        with InferenceServer(agent, env.state_shape, num_clients=num_workers, max_wait=0.01) as server:
+            workers = [multiprocessing.Process(target=play, args=(server.client(index), 2, index % 2 == 0, results))
+                       for index in range(num_workers)]
+            for worker in workers:
+                worker.start()
+            self.assertEqual([results.get(timeout=60) for _ in workers], [True] * num_workers)
+            for worker in workers:
+                worker.join()
+        self.assertLessEqual(server.batch_num, server.request_num)
+        self.assertGreater(server.request_num, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
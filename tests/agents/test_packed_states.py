@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+
+from rlcard.agents.packed_states import PackedStates
+from rlcard.agents.random_agent import RandomAgent
+from rlcard.envs.tarot import TarotEnv
+
+
+class TestPackedStates(unittest.TestCase):
+
+    def test_tarot_observations(self):
+        env = TarotEnv(seed=0)
+        env.set_agents([RandomAgent(env.action_num, seed=player_id) for player_id in range(env.player_num)])
+        trajectories, _ = env.run(is_training=True)
+        observations = np.array([ts[0]['obs'] for ts in trajectories[0]])
+        packed_states = PackedStates(len(observations), env.state_shape)
+        self.assertEqual(packed_states.nbytes, 121 * len(observations))
+        packed_states[np.arange(len(observations))] = observations
+        unpacked = packed_states[np.arange(len(observations))]
+        self.assertEqual(unpacked.dtype, np.float32)
+        self.assertTrue(np.array_equal(unpacked, observations))
+        packed_states[0] = observations[-1]
+        self.assertTrue(np.array_equal(packed_states[[0, 1]], observations[[-1, 1]]))
+
+    def test_invalid_states(self):
+        packed_states = PackedStates(2, [3], max_overflow=1)
+        with self.assertRaises(ValueError):
+            packed_states[0] = np.array([0.5, 0, 1])
+        with self.assertRaises(ValueError):
+            packed_states[0] = np.array([256, 0, 1])
+        with self.assertRaises(ValueError):
+            packed_states[0] = np.array([2, 2, 1])
+        packed_states[1] = np.array([0, 255, 1])
+        self.assertEqual(list(packed_states[[1]][0]), [0, 255, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import numpy as np
+
+from rlcard.agents.replay_memory import Memory, Normalizer, PrioritizedMemory, SumTree
+
+
+class TestMemory(unittest.TestCase):
+
+    def test_save_and_sample(self):
+        memory = Memory(memory_size=5, batch_size=3)
+        for action in range(7):
+            memory.save(np.full(2, action), action, float(action), np.full(2, action + 1), action == 6)
+        self.assertEqual(len(memory), 5)
+        self.assertEqual(sorted(memory.actions), [2, 3, 4, 5, 6])
+        state_batch, action_batch, reward_batch, next_state_batch, done_batch = memory.sample()
+        self.assertEqual(state_batch.shape, (3, 2))
+        self.assertEqual(len(set(action_batch)), 3)
+        self.assertTrue((state_batch[:, 0] == action_batch).all())
+        self.assertTrue((next_state_batch[:, 0] == action_batch + 1).all())
+        self.assertTrue((reward_batch == action_batch).all())
+        self.assertTrue((done_batch == (action_batch == 6)).all())
+
+    def test_save_batch(self):
+        memory = Memory(memory_size=5, batch_size=2)
+        memory.save(np.zeros(2), 0, 0, np.zeros(2), False)
+        memory.save_batch(np.ones((3, 2)), [1, 2, 3], [0, 0, 1], np.ones((3, 2)), [False, False, True])
+        self.assertEqual(len(memory), 4)
+        self.assertEqual(list(memory.actions[:4]), [0, 1, 2, 3])
+        memory.save_batch(np.ones((7, 2)), np.arange(4, 11), np.zeros(7), np.ones((7, 2)), np.zeros(7, dtype=bool))
+        self.assertEqual(len(memory), 5)
+        self.assertEqual(sorted(memory.actions), [6, 7, 8, 9, 10])
+        self.assertEqual(memory.position, 1)
+
+    def test_packed_states(self):
+        memory = Memory(memory_size=5, batch_size=2)
+        memory.save_batch(np.array([[0, 1], [2, 0]]), [0, 1], [0, 1], np.array([[2, 0], [1, 1]]), [False, True])
+        state_batch, action_batch, _, next_state_batch, _ = memory.sample()
+        self.assertEqual(state_batch.dtype, np.float32)
+        self.assertEqual(state_batch[action_batch == 1].tolist(), [[2, 0]])
+        self.assertEqual(next_state_batch[action_batch == 0].tolist(), [[2, 0]])
+
+
+class TestPrioritizedMemory(unittest.TestCase):
+
+    def test_sum_tree(self):
+        tree = SumTree(5)
+        tree.update(np.arange(5), [1, 0, 2, 3, 4])
+        self.assertEqual(tree.total, 10)
+        self.assertEqual(list(tree.find([0, 0.99, 1, 2.99, 3, 5.99, 6, 9.99])), [0, 0, 2, 2, 3, 3, 4, 4])
+        tree.update([4, 4], 1)
+        self.assertEqual(tree.total, 7)
+        self.assertEqual(list(tree[[0, 4]]), [1, 1])
+
+    def test_sample(self):
+        memory = PrioritizedMemory(memory_size=4, batch_size=400, alpha=1, beta_start=1, beta_steps=1)
+        for action in range(4):
+            memory.save(np.full(2, action), action, 0, np.full(2, action), False)
+        memory.update_priorities(np.arange(4), [0, 1, 1, 2])
+        _, action_batch, _, _, _, weight_batch, index_batch = memory.sample()
+        self.assertTrue((action_batch == index_batch).all())
+        counts = np.bincount(action_batch, minlength=4)
+        self.assertEqual(counts[0], 0)
+        self.assertAlmostEqual(counts[3] / 400, 0.5, delta=0.05)
+        # The weights are inversely proportional to the probabilities
+        self.assertTrue(np.allclose(weight_batch[action_batch == 3], 0.5, atol=1e-5))
+        self.assertTrue(np.allclose(weight_batch[action_batch == 1], 1))
+        # A new transition gets the highest priority
+        memory.save(np.zeros(2, dtype=int), 4, 0, np.zeros(2, dtype=int), False)
+        self.assertAlmostEqual(memory.tree[0], 2 + 1e-6)
+
+
+class TestNormalizer(unittest.TestCase):
+
+    def test_append(self):
+        states = np.random.random_sample((50, 3, 2))
+        states[:, 0, 0] = 1
+        normalizer = Normalizer()
+        self.assertTrue(np.array_equal(normalizer.normalize(states[0]), states[0]))
+        for state in states:
+            normalizer.append(state)
+        self.assertEqual(normalizer.length, 50)
+        self.assertTrue(np.allclose(normalizer.mean, states.mean(axis=0)))
+        expected_std = states.std(axis=0)
+        expected_std[0, 0] = 1
+        self.assertTrue(np.allclose(normalizer.std, expected_std))
+        self.assertTrue(np.allclose(normalizer.normalize(states).mean(axis=0), 0))
+
+    def test_merge(self):
+        states = np.random.random_sample((30, 4))
+        normalizer = Normalizer()
+        normalizer.append_batch(states[:10])
+        other = Normalizer()
+        for state in states[10:]:
+            other.append(state)
+        normalizer.merge(other)
+        normalizer.merge(Normalizer())
+        self.assertEqual(normalizer.length, 30)
+        self.assertTrue(np.allclose(normalizer.mean, states.mean(axis=0)))
+        self.assertTrue(np.allclose(normalizer.std, states.std(axis=0)))
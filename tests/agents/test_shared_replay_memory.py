@@ -0,0 +1,62 @@
+import multiprocessing
+import unittest
+import numpy as np
+
+from rlcard.agents.packed_states import PackedStates
+from rlcard.agents.shared_replay_memory import SharedReplayMemory
+
+
+def save_transitions(memory, first_action, num):
+    for action in range(first_action, first_action + num):
+        memory.save(np.full((2, 3), action), action, float(action), np.full((2, 3), action + 1), action % 2 == 0)
+
+
+class TestSharedReplayMemory(unittest.TestCase):
+
+    def test_save_and_sample(self):
+        memory = SharedReplayMemory(5, 3, [2, 3])
+        save_transitions(memory, 0, 7)
+        self.assertEqual(len(memory), 5)
+        self.assertEqual(sorted(memory.actions), [2, 3, 4, 5, 6])
+        state_batch, action_batch, reward_batch, next_state_batch, done_batch = memory.sample()
+        self.assertEqual(state_batch.shape, (3, 2, 3))
+        self.assertEqual(len(set(action_batch)), 3)
+        for state, action, reward, next_state, done in zip(state_batch, action_batch, reward_batch,
+                                                          next_state_batch, done_batch):
+            self.assertTrue((state == action).all())
+            self.assertTrue((next_state == action + 1).all())
+            self.assertEqual(reward, action)
+            self.assertEqual(done, action % 2 == 0)
+        memory.unlink()
+
+    def test_producer_processes(self):
+        memory = SharedReplayMemory(100, 10, [2, 3])
+        producers = [multiprocessing.Process(target=save_transitions, args=(memory, 30 * index, 30))
+                     for index in range(3)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join()
+        self.assertEqual(len(memory), 90)
+        self.assertEqual(sorted(memory.actions[:90]), list(range(90)))
+        self.assertTrue((memory.states[:90, 0, 0] == memory.actions[:90]).all())
+        memory.unlink()
+
+    def test_packed_states(self):
+        memory = SharedReplayMemory(100, 10, [2, 3], state_dtype=int)
+        producers = [multiprocessing.Process(target=save_transitions, args=(memory, 30 * index, 30))
+                     for index in range(2)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join()
+        self.assertIsInstance(memory.states, PackedStates)
+        state_batch, action_batch, _, next_state_batch, _ = memory.sample()
+        self.assertEqual(state_batch.dtype, np.float32)
+        self.assertTrue((state_batch == action_batch[:, np.newaxis, np.newaxis]).all())
+        self.assertTrue((next_state_batch == action_batch[:, np.newaxis, np.newaxis] + 1).all())
+        memory.unlink()
+
+
+if __name__ == '__main__':
+    unittest.main()
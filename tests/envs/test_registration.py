@@ -1,3 +1,5 @@
+import subprocess
+import sys
 import unittest
 
 import rlcard
@@ -19,6 +21,12 @@ class TestRegistration(unittest.TestCase):
         with self.assertRaises(ValueError):
             make('test_random_make')
 
+    def test_make_without_tensorflow(self):
+        # In a new interpreter, since the tests of the agents import TensorFlow
+        code = "import sys, rlcard; rlcard.make('tarot'); print('tensorflow' in sys.modules, 'torch' in sys.modules)"
+        output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+        self.assertEqual(output.split(), ['False', 'False'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -38,6 +38,36 @@ class TestTarotEnv(unittest.TestCase):
             total += payoff
         self.assertEqual(total, 0)
 
+    def test_run_seed(self):
+        results = []
+        for _ in range(2):
+            env = Env()
+            env.set_agents([RandomAgent(env.action_num, seed=i) for i in range(env.player_num)])
+            trajectories, payoffs = env.run(is_training=True, seed=3)
+            results.append((payoffs, [[transition[1] for transition in player] for player in trajectories]))
+        self.assertEqual(results[0], results[1])
+
+    def test_run_multi(self):
+        env = Env()
+        env.set_agents([RandomAgent(env.action_num) for _ in range(env.player_num)])
+        results = list(env.run_multi(6, num_workers=2, seed=2))
+        self.assertEqual(len(results), 6)
+        for trajectories, payoffs in results:
+            self.assertEqual(len(trajectories), env.player_num)
+            self.assertEqual(sum(payoffs.values()), 0)
+        # Each game has its own seed, whatever the worker playing it
+        other_results = list(env.run_multi(6, num_workers=3, seed=2))
+        self.assertEqual(sorted(self._get_actions(trajectories) for trajectories, _ in results),
+                         sorted(self._get_actions(trajectories) for trajectories, _ in other_results))
+        # The mode is checked by the call, before the games are iterated
+        env.set_mode(single_agent_mode=True)
+        with self.assertRaises(ValueError):
+            env.run_multi(1)
+
+    @staticmethod
+    def _get_actions(trajectories):
+        return [[transition[1] for transition in player_trajectories] for player_trajectories in trajectories]
+
     def test_decode_action(self):
         env = Env()
         env.init_game()
@@ -46,6 +76,33 @@ class TestTarotEnv(unittest.TestCase):
             decoded = env.decode_action(legal_action)
             self.assertLessEqual(decoded.get_str(), ACTION_LIST[legal_action])
 
+    def test_decode_action_id(self):
+        env = Env()
+        env.init_game()
+        legal_actions = env.get_legal_actions()
+        for legal_action in legal_actions:
+            self.assertEqual(env.decode_action_id(legal_action), legal_action)
+        illegal_actions = [action_id for action_id in range(env.action_num) if action_id not in legal_actions]
+        self.assertIn(env.decode_action_id(illegal_actions[0]), legal_actions)
+
+    def test_step_back(self):
+        env = Env(allow_step_back=True)
+        state, player_id = env.init_game()
+        self.assertFalse(env.step_back())
+        states = [(state, player_id)]
+        while not env.is_over():
+            states.append(env.step(np.random.choice(state['legal_actions'])))
+            state = states[-1][0]
+        for previous_state, previous_player_id in reversed(states[:-1]):
+            state, player_id = env.step_back()
+            self.assertEqual(player_id, previous_player_id)
+            self.assertTrue(np.array_equal(state['obs'], previous_state['obs']))
+            self.assertEqual(state['legal_actions'], previous_state['legal_actions'])
+        self.assertFalse(env.step_back())
+        env = Env()
+        env.init_game()
+        self.assertRaises(Exception, env.step_back)
+
     def test_single_agent_mode(self):
         env = Env()
         env.set_mode(single_agent_mode=True)
@@ -0,0 +1,98 @@
+import unittest
+import numpy as np
+
+from rlcard.envs.vec_tarot import VecTarotEnv
+
+
+class FirstLegalAgent(object):
+    """ Agent playing the legal action with the lowest id, counting its batched decisions
+    """
+
+    def __init__(self):
+        self.num_batches = 0
+
+    def step_batch(self, obs, legal_masks):
+        self.num_batches += 1
+        return legal_masks.argmax(axis=1)
+
+    def eval_step_batch(self, obs, legal_masks):
+        return self.step_batch(obs, legal_masks)
+
+
+class TestVecTarotEnv(unittest.TestCase):
+
+    def test_reset(self):
+        env = VecTarotEnv(3)
+        obs, legal_masks, player_ids = env.reset()
+        self.assertEqual(obs.shape, (3, 7, 5, 22))
+        self.assertEqual(legal_masks.shape, (3, 78))
+        for index, sub_env in enumerate(env.envs):
+            self.assertEqual(player_ids[index], sub_env.get_player_id())
+            state = sub_env.get_state(player_ids[index])
+            self.assertTrue(np.array_equal(obs[index], state['obs']))
+            self.assertEqual(list(np.flatnonzero(legal_masks[index])), state['legal_actions'])
+
+    def test_step(self):
+        env = VecTarotEnv(4, seed=0)
+        rng = np.random.default_rng(0)
+        obs, legal_masks, player_ids = env.reset()
+        finished = 0
+        while finished < 6:
+            actions = [rng.choice(np.flatnonzero(legal_mask)) for legal_mask in legal_masks]
+            obs, legal_masks, player_ids, dones, payoffs = env.step(actions)
+            self.assertEqual(dones.shape, (4,))
+            self.assertEqual(payoffs.shape, (4, 4))
+            for index, sub_env in enumerate(env.envs):
+                self.assertFalse(sub_env.is_over())
+                state = sub_env.get_state(player_ids[index])
+                self.assertTrue(np.array_equal(obs[index], state['obs']))
+                self.assertEqual(list(np.flatnonzero(legal_masks[index])), state['legal_actions'])
+                if dones[index]:
+                    self.assertEqual(payoffs[index].sum(), 0)
+                    self.assertNotEqual(np.abs(payoffs[index]).sum(), 0)
+                else:
+                    self.assertFalse(payoffs[index].any())
+            finished += dones.sum()
+
+    def test_illegal_actions(self):
+        env = VecTarotEnv(2)
+        _, legal_masks, _ = env.reset()
+        illegal_actions = [np.flatnonzero(~legal_mask)[0] for legal_mask in legal_masks]
+        _, _, _, dones, _ = env.step(illegal_actions)
+        self.assertFalse(dones.any())
+        self.assertEqual(env.timestep, 2)
+
+    def test_seed(self):
+        results = []
+        for _ in range(2):
+            env = VecTarotEnv(2, seed=5)
+            obs, legal_masks, _ = env.reset()
+            for _ in range(30):
+                obs, legal_masks, _, _, _ = env.step([np.flatnonzero(legal_mask)[0] for legal_mask in legal_masks])
+            results.append(obs.copy())
+        self.assertTrue(np.array_equal(results[0], results[1]))
+
+    def test_run(self):
+        env = VecTarotEnv(3, seed=0)
+        agent = FirstLegalAgent()
+        games = list(env.run(agent, 5, is_training=True))
+        self.assertEqual(len(games), 5)
+        num_transitions = 0
+        for trajectories, payoffs in games:
+            self.assertEqual(len(trajectories), env.player_num)
+            self.assertEqual(sum(payoffs.values()), 0)
+            for player_id, transitions in enumerate(trajectories):
+                for state, action, reward, next_state, done in transitions:
+                    self.assertEqual(state['obs'].shape, (7, 5, 22))
+                    self.assertIn(action, state['legal_actions'])
+                    self.assertEqual(action, state['legal_actions'][0])
+                    self.assertEqual(next_state['obs'].shape, (7, 5, 22))
+                    num_transitions += 1
+                self.assertEqual([ts[4] for ts in transitions], [False] * (len(transitions) - 1) + [True])
+                self.assertEqual(transitions[-1][2], payoffs[player_id])
+        # The decisions of the 3 environments are taken together, until fewer than 3 games are left to be finished
+        self.assertLess(agent.num_batches, num_transitions / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,8 +6,10 @@ from rlcard.games.tarot.global_game import GlobalGame
 from rlcard.games.tarot.bid.bid_game import BidGame
 from rlcard.games.tarot.alpha_and_omega.player import TarotPlayer as Player
 from rlcard.games.tarot.dog.dog import TarotDog
-from rlcard.games.tarot.bid.bid import TarotBid
-from rlcard.games.tarot.utils import encode_hand, encode_target, encode_bid
+from rlcard.games.tarot.bid.bid import BIDS, TarotBid
+from rlcard.games.tarot.alpha_and_omega.dealer import TarotDealer, permutations2hands
+from rlcard.games.tarot.utils import encode_hand, encode_target, encode_bid, get_TarotBid_from_str, count_cards, \
+    FULL_MASK
 
 num_players = 4
 num_cards_per_player = 18
@@ -43,11 +45,39 @@ class TestTarotBidGameMethods(unittest.TestCase):
         state, _ = game.init_game()
         self.assertEqual(len(list(state['hand'])), game.num_cards_per_player)
 
+    def test_deal(self):
+        dealer = TarotDealer(np.random.default_rng(0))
+        hand_masks = dealer.deal_masks(num_players, num_cards_per_player)
+        self.assertEqual([count_cards(hand_mask) for hand_mask in hand_masks], [18, 18, 18, 18, 6])
+        union = 0
+        for hand_mask in hand_masks:
+            self.assertEqual(union & hand_mask, 0)
+            union |= hand_mask
+        self.assertEqual(union, FULL_MASK)
+        permutations = dealer.deal_permutations(100)
+        self.assertEqual(permutations.shape, (100, 78))
+        self.assertTrue((np.sort(permutations, axis=1) == np.arange(78)).all())
+        hands = permutations2hands(permutations, num_players, num_cards_per_player)
+        self.assertEqual(hands.shape, (100, 5, 78))
+        self.assertTrue((hands.sum(axis=1) == 1).all())
+        self.assertTrue((hands.sum(axis=2) == [18, 18, 18, 18, 6]).all())
+        self.assertTrue((hands[7][0][permutations[7][:18]] == 1).all())
+
     def test_bid(self):
         bid1 = TarotBid('PASSE')
         bid2 = TarotBid('PETITE')
         self.assertLess(bid1.get_bid_order(), bid2.get_bid_order())
 
+    def test_interned_bids(self):
+        for bid_id, bid in enumerate(BIDS):
+            self.assertEqual(bid.id, bid_id)
+            self.assertEqual(bid.get_bid_order(), bid_id)
+            self.assertIs(get_TarotBid_from_str(bid.get_str()), bid)
+        game = BidGame(players, num_players, starting_player, num_cards_per_player, num_cards_dog, dog)
+        game.init_game()
+        for bid in game.get_legal_actions():
+            self.assertIs(bid, BIDS[bid.id])
+
     def test_get_player_id(self):
         game = BidGame(players, num_players, starting_player, num_cards_per_player, num_cards_dog, dog)
         _, player_id = game.init_game()
@@ -2,9 +2,10 @@ import unittest
 import numpy as np
 import random
 
+from rlcard.games.tarot.alpha_and_omega.state import LazyState
 from rlcard.games.tarot.global_game import GlobalGame
 from rlcard.games.tarot.bid.bid import TarotBid
-from rlcard.games.tarot.utils import ACTION_LIST
+from rlcard.games.tarot.utils import ACTION_LIST, mask2ids
 
 
 class TestTarotMainGameMethods(unittest.TestCase):
@@ -56,6 +57,126 @@ class TestTarotMainGameMethods(unittest.TestCase):
             self.assertEqual(went_though_dog, 0)
         self.assertEqual(went_though_main, 72)
 
+    def test_global_game_with_ids(self):
+        game = GlobalGame()
+        game.init_game()
+        while not game.is_over():
+            legal_ids = mask2ids(game.get_legal_actions_mask())
+            self.assertEqual(legal_ids, sorted(action.id for action in game.get_legal_actions()))
+            game.step(np.random.choice(legal_ids))
+        self.assertEqual(sum(game.get_payoffs().values()), 0)
+
+    def test_lazy_states(self):
+        game = GlobalGame()
+        state, _ = game.init_game()
+        states = []
+        while not game.is_over():
+            self.assertIsInstance(state, LazyState)
+            legal_actions = game.get_legal_actions()
+            states.append((state, state.get('hand'), legal_actions))
+            state, _ = game.step(np.random.choice(legal_actions))
+        # States computed lazily after the end of the game still describe the step they were returned at
+        for state, hand, legal_actions in states:
+            self.assertEqual(state['legal_actions'], legal_actions)
+            self.assertEqual(state['hand'], hand)
+            self.assertEqual(dict(state), state)
+        self.assertNotIn('unknown_field', state)
+        self.assertIsNone(state.get('unknown_field'))
+
+    def test_lazy_state_pop(self):
+        state = LazyState({'a': 1}, {'b': lambda: 2})
+        self.assertEqual(state.pop('b', None), 2)
+        self.assertNotIn('b', state)
+        self.assertEqual(state.pop('a'), 1)
+        self.assertEqual(state.pop('b', 3), 3)
+        with self.assertRaises(KeyError):
+            state.pop('b')
+        self.assertEqual(len(state), 0)
+
+    def test_lazy_state_setdefault(self):
+        state = LazyState({'a': 1}, {'b': lambda: 2})
+        self.assertEqual(state.setdefault('b', 9), 2)
+        self.assertEqual(state.setdefault('a', 9), 1)
+        self.assertEqual(state.setdefault('c', 9), 9)
+        self.assertEqual(state, {'a': 1, 'b': 2, 'c': 9})
+
+    def test_lazy_state_update(self):
+        state = LazyState({'a': 1}, {'b': lambda: 2, 'c': lambda: 3})
+        state.update({'b': 4}, d=5)
+        self.assertEqual(len(state), 4)
+        self.assertEqual(state, {'a': 1, 'b': 4, 'c': 3, 'd': 5})
+
+    def test_clone_and_restore(self):
+        game = GlobalGame()
+        game.init_game()
+        for _ in range(random.randint(0, 40)):
+            game.step(np.random.choice(mask2ids(game.get_legal_actions_mask())))
+        snapshot = game.snapshot()
+        hands = [player.hand_mask for player in game.players]
+        legal_mask = game.get_legal_actions_mask()
+        clone = game.clone()
+        actions = []
+        while not clone.is_over():
+            actions.append(np.random.choice(mask2ids(clone.get_legal_actions_mask())))
+            clone.step(actions[-1])
+        # The original game is left untouched by the clone
+        self.assertEqual([player.hand_mask for player in game.players], hands)
+        self.assertEqual(game.get_legal_actions_mask(), legal_mask)
+        # The same actions lead to the same result on the original game
+        for action in actions:
+            game.step(action)
+        self.assertEqual(game.get_payoffs(), clone.get_payoffs())
+        game.restore(snapshot)
+        self.assertEqual([player.hand_mask for player in game.players], hands)
+        self.assertEqual(game.get_legal_actions_mask(), legal_mask)
+        self.assertFalse(game.is_over())
+
+    def test_seed(self):
+        games = [GlobalGame(seed=7), GlobalGame(seed=7)]
+        for game in games:
+            game.init_game()
+        self.assertEqual(games[0].starting_player, games[1].starting_player)
+        while not games[0].is_over():
+            self.assertEqual([player.hand_mask for player in games[0].players],
+                             [player.hand_mask for player in games[1].players])
+            action = min(mask2ids(games[0].get_legal_actions_mask()))
+            for game in games:
+                game.step(action)
+        self.assertTrue(games[1].is_over())
+        self.assertEqual(games[0].get_payoffs(), games[1].get_payoffs())
+
+    def test_step_back(self):
+        game = GlobalGame(allow_step_back=True)
+        game.init_game()
+        self.assertFalse(game.step_back())
+        history = []
+        while not game.is_over():
+            history.append((game.current_game_part, game.get_player_id(), game.get_legal_actions_mask(),
+                            [player.hand_mask for player in game.players]))
+            game.step(np.random.choice(mask2ids(game.get_legal_actions_mask())))
+        while history:
+            self.assertTrue(game.step_back())
+            self.assertEqual((game.current_game_part, game.get_player_id(), game.get_legal_actions_mask(),
+                              [player.hand_mask for player in game.players]), history.pop())
+        self.assertFalse(game.step_back())
+        self.assertFalse(GlobalGame().step_back())
+
+    def test_step_back_new_deal(self):
+        game = GlobalGame(allow_step_back=True, seed=0)
+        game.init_game()
+        # All the players pass, the last pass deals new cards
+        for _ in range(game.num_players - 1):
+            game.step(0)
+        game.step(0)
+        self.assertEqual(game.number_of_deals, 1)
+        hands = [player.hand_mask for player in game.players]
+        self.assertTrue(game.step_back())
+        self.assertEqual(game.number_of_deals, 0)
+        # The random generator is rewound too: the same action deals the same cards again
+        game.step(0)
+        self.assertEqual(game.number_of_deals, 1)
+        self.assertEqual([player.hand_mask for player in game.players], hands)
+
     def test_final_payoff(self):
         game = GlobalGame()
         game.init_game()
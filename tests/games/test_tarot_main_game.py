@@ -3,15 +3,18 @@ import unittest
 
 import numpy as np
 
-from rlcard.games.tarot.alpha_and_omega.card import TarotCard as Card
+from rlcard.games.tarot.alpha_and_omega.card import CARDS, TarotCard as Card
 from rlcard.games.tarot.alpha_and_omega.player import TarotPlayer as Player
 from rlcard.games.tarot.bid.bid import TarotBid
 from rlcard.games.tarot.bid.bid_game import BidGame
 from rlcard.games.tarot.dog.dog import TarotDog
 from rlcard.games.tarot.global_game import GlobalGame
 from rlcard.games.tarot.main_game.main_game import MainGame
-from rlcard.games.tarot.utils import ACTION_LIST, get_end_pot_information, get_nb_bouts
-from rlcard.games.tarot.utils import hand2dict, encode_hand, encode_target, get_TarotCard_from_str
+from rlcard.games.tarot.main_game.main_round import MainRound
+from rlcard.games.tarot.utils import ACTION_LIST, EXCUSE_ID, TRUMPS_ABOVE_MASKS, array2mask, cards2mask, \
+    count_cards, get_end_pot_information, get_hand_value, get_nb_bouts, mask2array, mask2cards, mask2ids, mask2list, \
+    resolve_trick
+from rlcard.games.tarot.utils import hand2dict, encode_hand, encode_mask, encode_target, get_TarotCard_from_str, init_deck
 
 num_players = 4
 num_cards_per_player = 18
@@ -77,6 +80,104 @@ class TestTarotMainGameMethods(unittest.TestCase):
         for action in actions:
             self.assertIn(action.get_str(), ACTION_LIST)
 
+    def test_legal_actions_cache(self):
+        bid_game = BidGame(players, num_players, starting_player, num_cards_per_player, num_cards_dog, dog)
+        bid_game.init_game()
+        game = MainGame(num_players, num_cards_per_player, starting_player, players, taking_player_id, new_dog)
+        game.init_game()
+        main_round = game.main_round
+        actions = game.get_legal_actions()
+        cache = main_round.legal_actions_cache
+        self.assertEqual(game.get_legal_actions(), actions)
+        self.assertIs(main_round.legal_actions_cache, cache)
+        self.assertEqual(game.get_legal_actions_mask(), cards2mask(actions))
+        game.step(actions[0])
+        self.assertIsNot(main_round.legal_actions_cache, cache)
+
+    @staticmethod
+    def _make_round(hands):
+        """ Round whose player i holds the cards hands[i], player 0 leading """
+        round_players = [Player(i) for i in range(num_players)]
+        for player, hand in zip(round_players, hands):
+            player.hand = [get_TarotCard_from_str(card) for card in hand]
+        return MainRound(0, num_players, num_cards_per_player, 1, [], round_players), round_players
+
+    def _assert_legal(self, main_round, round_players, expected):
+        player_id = main_round.current_player_id
+        legal_mask = main_round.get_legal_actions_mask(round_players, player_id)
+        self.assertEqual(sorted(mask2list(legal_mask)), sorted(expected))
+        self.assertEqual(sorted(card.get_str() for card in main_round.get_legal_actions(round_players, player_id)),
+                         sorted(expected))
+
+    def _play(self, main_round, round_players, card):
+        main_round.current_player_id = main_round.proceed_round(round_players, get_TarotCard_from_str(card))
+
+    def test_legal_actions_lead(self):
+        main_round, round_players = self._make_round([['SPADE-5', 'HEART-2', 'TRUMP-7', 'TRUMP-0'], [], [], []])
+        self._assert_legal(main_round, round_players, ['SPADE-5', 'HEART-2', 'TRUMP-7', 'TRUMP-0'])
+
+    def test_legal_actions_follow_suit(self):
+        main_round, round_players = self._make_round([['SPADE-5'],
+                                                      ['SPADE-2', 'SPADE-14', 'HEART-3', 'TRUMP-4', 'TRUMP-0'],
+                                                      ['HEART-1', 'DIAMOND-7'], []])
+        self._play(main_round, round_players, 'SPADE-5')
+        # The color has to be followed, the excuse being a trump
+        self._assert_legal(main_round, round_players, ['SPADE-2', 'SPADE-14'])
+        self._play(main_round, round_players, 'SPADE-14')
+        # Neither the color nor trumps: anything
+        self._assert_legal(main_round, round_players, ['HEART-1', 'DIAMOND-7'])
+
+    def test_legal_actions_cut(self):
+        main_round, round_players = self._make_round([['SPADE-5'],
+                                                      ['HEART-3', 'TRUMP-4', 'TRUMP-12', 'TRUMP-0'],
+                                                      ['HEART-1', 'TRUMP-5', 'TRUMP-15', 'TRUMP-20'],
+                                                      ['HEART-2', 'TRUMP-3', 'TRUMP-1']])
+        self._play(main_round, round_players, 'SPADE-5')
+        # No spade: cutting with any trump, the excuse included since no trump was played yet
+        self._assert_legal(main_round, round_players, ['TRUMP-4', 'TRUMP-12', 'TRUMP-0'])
+        self._play(main_round, round_players, 'TRUMP-12')
+        # Overtrumping
+        self._assert_legal(main_round, round_players, ['TRUMP-15', 'TRUMP-20'])
+        self._play(main_round, round_players, 'TRUMP-20')
+        # No higher trump: undertrumping
+        self._assert_legal(main_round, round_players, ['TRUMP-3', 'TRUMP-1'])
+
+    def test_legal_actions_trump_led(self):
+        main_round, round_players = self._make_round([['TRUMP-10'],
+                                                      ['SPADE-1', 'TRUMP-7', 'TRUMP-11', 'TRUMP-14'],
+                                                      ['CLOVER-4', 'TRUMP-2', 'TRUMP-0'],
+                                                      ['HEART-5', 'DIAMOND-9']])
+        self._play(main_round, round_players, 'TRUMP-10')
+        self._assert_legal(main_round, round_players, ['TRUMP-11', 'TRUMP-14'])
+        self._play(main_round, round_players, 'TRUMP-14')
+        self._assert_legal(main_round, round_players, ['TRUMP-2', 'TRUMP-0'])
+        self._play(main_round, round_players, 'TRUMP-0')
+        self._assert_legal(main_round, round_players, ['HEART-5', 'DIAMOND-9'])
+
+    def test_legal_actions_excuse_led(self):
+        main_round, round_players = self._make_round([['TRUMP-0'], ['SPADE-3', 'TRUMP-6'],
+                                                      ['SPADE-9', 'TRUMP-2'], []])
+        self._play(main_round, round_players, 'TRUMP-0')
+        # The excuse does not set the color of the pot: the next card does
+        self._assert_legal(main_round, round_players, ['SPADE-3', 'TRUMP-6'])
+        self._play(main_round, round_players, 'SPADE-3')
+        self._assert_legal(main_round, round_players, ['SPADE-9'])
+
+    def test_mask_round_trip(self):
+        np_random = np.random.default_rng(0)
+        for size in [0, 1, 18, 78]:
+            ids = sorted(np_random.choice(78, size=size, replace=False).tolist())
+            cards = [CARDS[card_id] for card_id in ids]
+            mask = cards2mask(cards)
+            self.assertEqual(mask2ids(mask), ids)
+            self.assertEqual(mask2cards(mask), cards)
+            self.assertEqual(mask2list(mask), [ACTION_LIST[card_id] for card_id in ids])
+            self.assertEqual(count_cards(mask), size)
+            self.assertEqual(array2mask(mask2array(mask)), mask)
+        for highest_trump in range(-1, 22):
+            self.assertEqual(mask2ids(TRUMPS_ABOVE_MASKS[highest_trump + 1]),
+                             list(range(EXCUSE_ID + highest_trump + 1, EXCUSE_ID + 22)))
+
     def test_step(self):
         bid_game = BidGame(players, num_players, starting_player, num_cards_per_player, num_cards_dog, dog)
         bid_game.init_game()
@@ -137,6 +238,16 @@ class TestTarotMainGameMethods(unittest.TestCase):
         str_card = 'SPADE-10'
         self.assertEqual(get_TarotCard_from_str(str_card).get_str(), str_card)
 
+    def test_interned_cards(self):
+        self.assertEqual(len(CARDS), 78)
+        for card_id, card in enumerate(CARDS):
+            self.assertEqual(card.id, card_id)
+            self.assertEqual(ACTION_LIST[card_id], card.get_str())
+            self.assertIs(get_TarotCard_from_str(card.get_str()), card)
+        for card, shared_card in zip(init_deck(), CARDS):
+            self.assertIs(card, shared_card)
+        self.assertEqual(Card(False, color='HEART', color_value=3).id, CARDS[30].id)
+
     def test_encode_hand(self):
         hand1 = ['SPADE-1', 'TRUMP-3', 'DIAMOND-14', 'TRUMP-0', 'TRUMP-21']
         encoded_hand1 = np.zeros((3, 5, 22), dtype=int)
@@ -152,6 +263,28 @@ class TestTarotMainGameMethods(unittest.TestCase):
         self.assertEqual(encoded_hand2[2][0][1], 1)  # SPADE-1
         self.assertEqual(encoded_hand2[2][4][0], 1)  # TRUMP-0
 
+    def test_encode_mask(self):
+        hand = ['SPADE-1', 'TRUMP-3', 'DIAMOND-14', 'TRUMP-0', 'TRUMP-21']
+        encoded_hand = np.zeros((3, 5, 22), dtype=int)
+        encode_hand(encoded_hand, hand, index_to_encode=1)
+        encoded_mask = np.ones((3, 5, 22), dtype=int)
+        encode_mask(encoded_mask, cards2mask([get_TarotCard_from_str(card) for card in hand]), index_to_encode=1)
+        self.assertTrue(np.array_equal(encoded_hand[1], encoded_mask[1]))
+
+    def test_incremental_state(self):
+        bid_game = BidGame(players, num_players, starting_player, num_cards_per_player, num_cards_dog, dog)
+        bid_game.init_game()
+        game = MainGame(num_players, num_cards_per_player, starting_player, players, taking_player_id, new_dog)
+        state, player_id = game.init_game()
+        while not game.is_over:
+            others_hand = [card for other in players if other.player_id != player_id for card in other.hand]
+            if game.taking_bid >= 4:
+                others_hand += new_dog
+            self.assertEqual(sorted(state['others_hand']), sorted(card.get_str() for card in others_hand))
+            self.assertEqual(state['pot_cards'], state['played_cards'][state['pot_number'] * 4:])
+            self.assertEqual(state['played_mask'], cards2mask(game.main_round.played_cards))
+            state, player_id = game.step(np.random.choice(game.get_legal_actions()))
+
     def test_encode_target(self):
         encoded_target = np.zeros((6, 5, 22), dtype=int)
         target = 'TRUMP-1'
@@ -226,6 +359,38 @@ class TestTarotMainGameMethods(unittest.TestCase):
         self.assertEqual(nb_bout, 1)
         self.assertEqual(pot_value, 6)
 
+    def test_resolve_trick(self):
+        # Excuse played first, the pot color is given by the second card
+        card_ids = [get_TarotCard_from_str(card).id for card in ['TRUMP-0', 'HEART-2', 'HEART-13', 'DIAMOND-14']]
+        winner_id, pot_value, nb_bout = resolve_trick(card_ids, 2)
+        self.assertEqual(winner_id, 2)
+        self.assertEqual(nb_bout, 1)
+        self.assertEqual(pot_value, 13)
+        card_ids = [get_TarotCard_from_str(card).id for card in ['CLOVER-1', 'CLOVER-11', 'TRUMP-0', 'TRUMP-2']]
+        winner_id, _, _ = resolve_trick(card_ids, 1)
+        self.assertEqual(winner_id, 3)
+
+    def test_vectorized_hand_values(self):
+        deck = init_deck()
+        hands = np.zeros((4, 78), dtype=np.uint8)
+        for player_id in range(4):
+            for card in deck[player_id * 18:(player_id + 1) * 18]:
+                hands[player_id][card.id] = 1
+        hand_values = get_hand_value(hands)
+        nb_bouts = get_nb_bouts(hands)
+        self.assertEqual(hand_values.shape, (4,))
+        for player_id in range(4):
+            hand = deck[player_id * 18:(player_id + 1) * 18]
+            self.assertEqual(hand_values[player_id], sum([card.get_value() for card in hand]))
+            self.assertEqual(nb_bouts[player_id], sum([card.is_bout() for card in hand]))
+            self.assertEqual(get_hand_value(cards2mask(hand)), hand_values[player_id])
+            self.assertEqual(get_nb_bouts(cards2mask(hand)), nb_bouts[player_id])
+        self.assertEqual(get_hand_value(np.ones(78)), 91)
+        self.assertEqual(get_nb_bouts(mask2array(cards2mask(deck))), 3)
+        dog = TarotDog()
+        dog.hand = deck[72:]
+        self.assertEqual(dog.get_points_in_dog(), sum([card.get_value() for card in deck[72:]]))
+
 
 if __name__ == '__main__':
     unittest.main()
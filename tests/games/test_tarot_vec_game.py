@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+
+from rlcard.envs.tarot import TarotEnv
+from rlcard.games.tarot.utils import array2mask, mask2array
+from rlcard.games.tarot.vec_game import VecGame, GAME_PARTS, MAIN, OVER, sample_legal_actions
+
+
+def copy_deal(env: TarotEnv, vec_game: VecGame, index: int) -> None:
+    """
+    Give the cards of one game of a VecGame to the game of an environment
+    """
+    for player in env.game.players:
+        player.hand_mask = array2mask(vec_game.hands[index, player.player_id])
+    env.game.dog.hand_mask = array2mask(vec_game.dogs[index])
+
+
+class TestTarotVecGameMethods(unittest.TestCase):
+
+    def test_init_game(self):
+        vec_game = VecGame(10, seed=0)
+        player_ids = vec_game.init_game()
+        self.assertTrue((player_ids == vec_game.starting_players).all())
+        self.assertTrue((vec_game.hands.sum(axis=2) == 18).all())
+        self.assertTrue((vec_game.dogs.sum(axis=1) == 6).all())
+        self.assertTrue((vec_game.hands.sum(axis=1) + vec_game.dogs == 1).all())
+        legal_masks = vec_game.get_legal_actions_mask()
+        self.assertTrue((legal_masks[:, :2].sum(axis=1) == 1).all())
+        self.assertFalse(legal_masks[:, 2:].any())
+        self.assertFalse(vec_game.is_over().any())
+
+    def test_same_as_global_game(self):
+        num_games = 12
+        vec_game = VecGame(num_games, seed=1)
+        vec_game.init_game()
+        envs = [TarotEnv() for _ in range(num_games)]
+        for index, env in enumerate(envs):
+            env.game.starting_player = int(vec_game.starting_players[index])
+            env.game.init_game()
+            copy_deal(env, vec_game, index)
+        np_random = np.random.default_rng(1)
+        while not vec_game.is_over().all():
+            legal_masks = vec_game.get_legal_actions_mask()
+            obs = vec_game.get_obs()
+            for index, env in enumerate(envs):
+                if env.is_over():
+                    self.assertEqual(vec_game.game_parts[index], OVER)
+                    continue
+                self.assertEqual(GAME_PARTS[vec_game.game_parts[index]], env.game.current_game_part)
+                player_id = env.get_player_id()
+                self.assertEqual(vec_game.current_player_ids[index], player_id)
+                self.assertTrue(np.array_equal(legal_masks[index], mask2array(env.game.get_legal_actions_mask())))
+                self.assertTrue(np.array_equal(obs[index], env.get_state(player_id)['obs']))
+            actions = sample_legal_actions(legal_masks, np_random)
+            vec_game.step(actions)
+            for index, env in enumerate(envs):
+                if not env.is_over():
+                    number_of_deals = env.game.number_of_deals
+                    env.step(actions[index])
+                    if env.game.number_of_deals != number_of_deals:
+                        copy_deal(env, vec_game, index)
+        for index, env in enumerate(envs):
+            self.assertTrue(env.is_over())
+            self.assertEqual(list(vec_game.get_payoffs()[index]), list(env.get_payoffs().values()))
+            self.assertEqual(vec_game.number_of_deals[index], env.game.number_of_deals)
+
+    def test_illegal_card(self):
+        vec_game = VecGame(1, seed=0)
+        vec_game.init_game()
+        while vec_game.game_parts[0] != MAIN:
+            vec_game.step(sample_legal_actions(vec_game.get_legal_actions_mask(), vec_game.np_random))
+        player_id = vec_game.current_player_ids[0]
+        with self.assertRaises(ValueError):
+            vec_game.step([np.flatnonzero(~vec_game.hands[0, player_id])[0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,11 @@
 import unittest
 
+import numpy as np
+
+import rlcard
+from rlcard.agents.dqn_actor_learner import ActorAgent
 from rlcard.models.model import Model
+from rlcard.models.pretrained_models_tarot_numpy import normalize
 from rlcard.models.pretrained_models_tarot_v_ import TarotDQNModelV1
 import tensorflow as tf
 
@@ -16,6 +21,14 @@ class TestModel(unittest.TestCase):
             model = TarotDQNModelV1(sess.graph, sess)
             self.assertIsInstance(model, TarotDQNModelV1)
 
+    def test_numpy_normalize(self):
+        env = rlcard.make('tarot')
+        agent = ActorAgent(env.action_num, np.linspace(1.0, 0.1, 20000), seed=0)
+        normalize(env, agent, 100, seed=0)
+        self.assertEqual(agent.mean.shape, (7, 5, 22))
+        self.assertTrue((agent.std > 0).all())
+        self.assertGreaterEqual(agent.total_t, 100)
+
 
 if __name__ == '__main__':
     unittest.main()
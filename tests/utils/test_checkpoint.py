@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.numpy_estimator import NumpyEstimator
+from rlcard.utils.checkpoint import latest_checkpoint, load_mlp_weights, load_variables, read_index
+
+CHECKPOINT_DIR = os.path.join(rlcard.__path__[0], 'models/pretrained/tarot_v250007')
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def test_read_index(self):
+        checkpoint_prefix = latest_checkpoint(CHECKPOINT_DIR)
+        self.assertEqual(checkpoint_prefix, os.path.join(CHECKPOINT_DIR, 'model'))
+        num_shards, entries = read_index(checkpoint_prefix)
+        self.assertEqual(num_shards, 1)
+        dtype, shape, shard_id, _ = entries['dqn_q/fully_connected/weights']
+        self.assertEqual((dtype, shape, shard_id), (np.float32, (770, 512), 0))
+        self.assertEqual(entries['dqn_q/fully_connected_3/biases'][1], (78,))
+        self.assertEqual(entries['global_step'][:2], (np.int32, ()))
+        self.assertIsNone(latest_checkpoint(os.path.dirname(CHECKPOINT_DIR)))
+
+    def test_load_mlp_weights(self):
+        checkpoint_dir = tempfile.mkdtemp()
+        try:
+            for name in ('checkpoint', 'model.index'):
+                shutil.copy(os.path.join(CHECKPOINT_DIR, name), checkpoint_dir)
+            checkpoint_prefix = latest_checkpoint(checkpoint_dir)
+            _, entries = read_index(checkpoint_prefix)
+            # Data shard with the values of the Q network only
+            np_random = np.random.default_rng(0)
+            expected = {}
+            with open(checkpoint_prefix + '.data-00000-of-00001', 'wb') as data_file:
+                data_file.truncate(max(offset + dtype.itemsize * int(np.prod(shape))
+                                       for dtype, shape, _, offset in entries.values()))
+                for name, (dtype, shape, _, offset) in entries.items():
+                    if name.startswith('dqn_q/'):
+                        expected[name] = np_random.normal(size=shape).astype(dtype)
+                        data_file.seek(offset)
+                        data_file.write(expected[name].tobytes())
+
+            weights = load_mlp_weights(checkpoint_prefix, scope='dqn_q')
+            self.assertEqual([weight.shape for weight in weights],
+                             [(770, 512), (512,), (512, 1024), (1024,), (1024, 512), (512,), (512, 78), (78,)])
+            self.assertIsInstance(weights[0], np.memmap)
+            self.assertTrue(np.array_equal(weights[2], expected['dqn_q/fully_connected_1/weights']))
+            self.assertTrue(np.array_equal(weights[7], expected['dqn_q/fully_connected_3/biases']))
+            self.assertEqual(NumpyEstimator(weights).predict(np.zeros((2, 7, 5, 22))).shape, (2, 78))
+            self.assertEqual(load_variables(checkpoint_prefix, ['global_step'])[0], 0)
+            with self.assertRaises(KeyError):
+                load_mlp_weights(checkpoint_prefix, scope='dqn')
+            with self.assertRaises(KeyError):
+                load_variables(checkpoint_prefix, ['dqn_q/fully_connected_4/weights'])
+            del weights
+        finally:
+            shutil.rmtree(checkpoint_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()